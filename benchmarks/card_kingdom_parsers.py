@@ -0,0 +1,95 @@
+"""Compare Card Kingdom parsing backends on saved preorder pages.
+
+Usage:
+    poetry run python benchmarks/card_kingdom_parsers.py path/to/preorder.html ...
+    poetry run python benchmarks/card_kingdom_parsers.py --synthetic 2000
+
+Reports the best-of-N parse time and the tracemalloc peak for each installed
+backend. tracemalloc only sees Python-level allocations, so the C tree held
+by lxml/selectolax is under-reported relative to bs4 and the stream parser.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Tuple
+
+from mtgbot.watchers.card_kingdom_parsers import available_backends
+
+
+def synthetic_page(products: int) -> str:
+    rows = []
+    for index in range(products):
+        status = "Out of Stock" if index % 7 == 0 else "In Stock"
+        rows.append(
+            f'<div class="productItemWrapper" data-product-id="{index}" '
+            f'data-product-sku="SKU{index}" data-price="{index % 90 + 0.99:.2f}" '
+            f'data-edition="TST" data-collector-number="{index}" data-finish="foil">'
+            f'<div class="productCardHeader"><a href="/mtg/test/card-{index}">'
+            f"Test Card {index}</a></div>"
+            '<div class="itemContentWrapper"><table><tr><td>NM</td>'
+            f'<td class="stylePrice">${index % 90 + 0.99:.2f}</td></tr></table>'
+            f'<span class="productStatus">{status}</span>'
+            '<button class="btn addToCart">Add to Cart</button></div></div>'
+        )
+    nav = "<li><a href='/x'>Nav</a></li>" * 300
+    filler = f"<div class='nav'><ul>{nav}</ul></div>"
+    listing = "".join(rows)
+    return (
+        "<html><head><title>Preorders</title><script>var cfg = {};</script></head>"
+        f"<body>{filler}<div class='mainListing'>{listing}</div>{filler}</body>"
+        "</html>"
+    )
+
+
+def measure(parse, html: str, repeat: int) -> Tuple[float, int, int]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        count = len(parse(html))
+        best = min(best, time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path, help="Saved HTML pages")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=1000,
+        help="Products in the generated page when no files are given",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fixtures: List[Tuple[str, str]] = [
+        (path.name, path.read_text(encoding="utf-8", errors="replace"))
+        for path in args.pages
+    ]
+    if not fixtures:
+        fixtures.append((f"synthetic-{args.synthetic}", synthetic_page(args.synthetic)))
+
+    for label, html in fixtures:
+        print(f"{label} ({len(html) / 1024:.0f} KiB)")
+        for name, parse in available_backends().items():
+            seconds, peak, count = measure(parse, html, args.repeat)
+            print(
+                f"  {name:<11} {seconds * 1000:8.2f} ms  "
+                f"peak {peak / 1024 / 1024:7.2f} MiB  {count} products"
+            )
+
+
+if __name__ == "__main__":
+    main()
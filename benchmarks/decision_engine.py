@@ -0,0 +1,144 @@
+"""Micro-benchmark DecisionEngine.evaluate on a hot card.
+
+Usage:
+    poetry run python benchmarks/decision_engine.py --entries 100000
+
+Registers N wishlist entries for one oracle_id with mixed vendor
+preferences and price caps. It then times evaluate() for events at
+several prices against a linear scan that mirrors the original engine.
+It also times the startup load: reset() over N entries spread across
+--cards oracle_ids, followed by single-user register/unregister edits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List
+
+from mtgbot.bot import DecisionEngine
+from mtgbot.models import (
+    ActionType,
+    CardSku,
+    Decision,
+    InventoryEvent,
+    ListingSnapshot,
+    Vendor,
+    WishlistEntry,
+)
+
+ORACLE_ID = "hot-card"
+VENDORS = [Vendor.TCGPLAYER, Vendor.CARD_KINGDOM, Vendor.LOCAL_STORE, Vendor.AMAZON]
+
+
+def build_entries(
+    count: int, seed: int = 7, *, cards: int = 1
+) -> List[WishlistEntry]:
+    rng = random.Random(seed)
+    entries = []
+    for user_id in range(count):
+        oracle_id = ORACLE_ID if cards == 1 else f"card-{user_id % cards}"
+        roll = rng.random()
+        vendors = [] if roll < 0.4 else rng.sample(VENDORS, rng.randint(1, 2))
+        max_price = None if rng.random() < 0.1 else round(rng.uniform(1, 200), 2)
+        entries.append(
+            WishlistEntry(
+                discord_user_id=user_id,
+                sku=CardSku(oracle_id=oracle_id, product_code=oracle_id, finish="any"),
+                max_price=max_price,
+                action_preference=ActionType.NOTIFY,
+                preferred_vendors=vendors,
+            )
+        )
+    return entries
+
+
+def make_event(price: float, vendor: Vendor) -> InventoryEvent:
+    snapshot = ListingSnapshot(
+        vendor=vendor,
+        sku=CardSku(oracle_id=ORACLE_ID, product_code=ORACLE_ID, finish="any"),
+        title="Hot Card",
+        url="https://example.com",
+        price=price,
+        currency="USD",
+        available=True,
+        observed_at=datetime.now(timezone.utc),
+    )
+    return InventoryEvent(snapshot=snapshot, previous_snapshot=None, event_type="restock")
+
+
+def linear_evaluate(
+    entries: List[WishlistEntry], event: InventoryEvent
+) -> Iterable[Decision]:
+    snap = event.snapshot
+    for wishlist in entries:
+        if wishlist.preferred_vendors and snap.vendor not in wishlist.preferred_vendors:
+            continue
+        if wishlist.max_price is not None and snap.price > wishlist.max_price:
+            continue
+        yield Decision(
+            event=event,
+            wishlist=wishlist,
+            action=wishlist.action_preference,
+            rationale=f"Price {snap.price:.2f} within threshold",
+        )
+
+
+def best_of(func: Callable[[], int], repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    result = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--cards", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    startup = build_entries(args.entries, cards=args.cards)
+    engine = DecisionEngine()
+    started = time.perf_counter()
+    engine.reset(startup)
+    print(
+        f"startup reset({args.entries} entries, {args.cards} cards) "
+        f"{(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    edits = startup[: min(len(startup), 10_000)]
+    started = time.perf_counter()
+    for entry in edits:
+        engine.unregister(entry.discord_user_id, entry.sku.oracle_id)
+        engine.register(entry)
+    per_edit = (time.perf_counter() - started) / max(len(edits), 1)
+    print(f"register/unregister pair {per_edit * 1e6:.2f} us")
+
+    entries = build_entries(args.entries)
+    engine = DecisionEngine()
+    started = time.perf_counter()
+    engine.reset(entries)
+    print(f"hot-card reset({args.entries}) {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for price in (5.0, 100.0, 190.0, 500.0):
+        event = make_event(price, Vendor.TCGPLAYER)
+        linear, expected = best_of(
+            lambda: sum(1 for _ in linear_evaluate(entries, event)), args.repeat
+        )
+        indexed, matched = best_of(
+            lambda: sum(1 for _ in engine.evaluate(event)), args.repeat
+        )
+        assert matched == expected, (matched, expected)
+        print(
+            f"price {price:>6.2f}: {matched:>6} matches  "
+            f"linear {linear * 1000:8.2f} ms  indexed {indexed * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Time gamers_guild_feed.fetch_products against a local Shopify-style server.
+
+Usage:
+    poetry run python benchmarks/gamers_guild_fetch.py --products 3000 --latency 0.08
+
+The fixture server serves ``/collections/new-arrivals/products.json`` with
+Shopify's ``page``/``limit`` pagination and a fixed per-request latency.
+Each configuration runs a cold fetch and then a warm one that reuses the
+normalized-product cache, so unchanged ``updated_at`` values skip
+normalization. Concurrency 1 matches the old one-page-at-a-time crawl.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from mtgbot.tools import gamers_guild_feed
+from mtgbot.tools.gamers_guild_feed import NormalizedCache, fetch_products
+
+
+def build_catalog(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": 7_000_000 + index,
+            "title": f"Booster Box {index}",
+            "handle": f"booster-box-{index}",
+            "product_type": "Magic: The Gathering Sealed",
+            "tags": "Magic, Preorder, Sealed",
+            "updated_at": "2026-10-01T12:00:00-07:00",
+            "variants": [
+                {
+                    "id": 9_000_000 + index,
+                    "sku": f"GG-{index}",
+                    "price": f"{index % 200 + 99.99:.2f}",
+                    "available": index % 4 != 0,
+                }
+            ],
+            "images": [{"src": f"https://cdn.example/{index}.jpg"}],
+            "body_html": "<p>" + "Sealed product description. " * 20 + "</p>",
+        }
+        for index in range(count)
+    ]
+
+
+async def start_fixture(
+    catalog: List[Dict[str, Any]], latency: float, port: int
+) -> web.AppRunner:
+    requests = {"count": 0}
+
+    async def products(request: web.Request) -> web.Response:
+        requests["count"] += 1
+        page = int(request.query.get("page", "1"))
+        limit = min(int(request.query.get("limit", "30")), 250)
+        await asyncio.sleep(latency)
+        start = (page - 1) * limit
+        return web.json_response({"products": catalog[start : start + limit]})
+
+    app = web.Application()
+    app["requests"] = requests
+    app.router.add_get(gamers_guild_feed.COLLECTION_PATH, products)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def run(args: argparse.Namespace) -> None:
+    catalog = build_catalog(args.products)
+    runner = await start_fixture(catalog, args.latency, args.port)
+    requests = runner.app["requests"]
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(
+        f"{args.products} products, {args.latency * 1000:.0f} ms per page, "
+        f"{gamers_guild_feed.PAGE_LIMIT} per page"
+    )
+    try:
+        async with aiohttp.ClientSession() as session:
+            for concurrency in args.concurrency:
+                normalized: NormalizedCache = {}
+                for label in ("cold", "warm"):
+                    requests["count"] = 0
+                    started = time.perf_counter()
+                    products = await fetch_products(
+                        session,
+                        concurrency=concurrency,
+                        normalized=normalized,
+                        base_url=base_url,
+                    )
+                    elapsed = time.perf_counter() - started
+                    print(
+                        f"  concurrency {concurrency:<2} {label}  "
+                        f"{elapsed * 1000:8.1f} ms  {len(products)} products  "
+                        f"{requests['count']} requests"
+                    )
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.08)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Compare stdlib json against mtgbot.codec on watcher-shaped payloads.
+
+Usage:
+    poetry run python benchmarks/json_codec.py --items 5000
+    poetry run python benchmarks/json_codec.py --payload recorded/scryfall_sets.json
+
+Without ``--payload`` it builds a TCGplayer pricing response, a Scryfall
+sets page and a Gamers Guild feed of ``--items`` entries each. A recorded
+body passed with ``--payload`` is timed for decode and re-encode only. The
+typed row decodes the Scryfall page into the watcher's dataclasses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from mtgbot import codec
+from mtgbot.tools.gamers_guild_feed import Product, build_payload
+from mtgbot.watchers.scryfall_sets import _PAGE_DECODER
+
+
+def tcgplayer_pricing(count: int) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "errors": [],
+        "results": [
+            {
+                "skuId": 100000 + index,
+                "lowPrice": round(index % 300 + 0.25, 2),
+                "lowestShipping": 0.99,
+                "lowestListingPrice": round(index % 300 + 0.49, 2),
+                "marketPrice": round(index % 300 + 0.5, 2),
+                "directLowPrice": None,
+                "quantity": index % 20,
+            }
+            for index in range(count)
+        ],
+    }
+
+
+def scryfall_sets(count: int) -> Dict[str, Any]:
+    return {
+        "object": "list",
+        "has_more": False,
+        "data": [
+            {
+                "object": "set",
+                "id": f"{index:08x}-1111-2222-3333-444455556666",
+                "code": f"s{index:03d}",
+                "name": f"Set {index}",
+                "uri": f"https://api.scryfall.com/sets/s{index:03d}",
+                "scryfall_uri": f"https://scryfall.com/sets/s{index:03d}",
+                "released_at": "2025-11-14",
+                "set_type": "expansion",
+                "card_count": 280,
+                "digital": False,
+                "nonfoil_only": False,
+                "foil_only": False,
+                "icon_svg_uri": f"https://svgs.scryfall.io/sets/s{index:03d}.svg",
+            }
+            for index in range(count)
+        ],
+    }
+
+
+def gamers_guild_feed(count: int) -> Dict[str, Any]:
+    return build_payload(
+        [
+            Product(
+                product_id=str(index),
+                name=f"Booster Box {index}",
+                price=round(index % 200 + 99.99, 2),
+                available=index % 4 != 0,
+                url=f"https://gamersguildaz.com/products/box-{index}",
+                tags=["Magic: The Gathering", "Preorder"],
+                image=None,
+            )
+            for index in range(count)
+        ]
+    )
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--payload", type=Path, help="recorded JSON body to time")
+    args = parser.parse_args()
+
+    if args.payload:
+        payloads = {args.payload.name: json.loads(args.payload.read_bytes())}
+    else:
+        payloads = {
+            "tcgplayer pricing": tcgplayer_pricing(args.items),
+            "scryfall sets": scryfall_sets(args.items),
+            "gamers guild feed": gamers_guild_feed(args.items),
+        }
+
+    print(f"codec backend: {codec.BACKEND}")
+    for label, payload in payloads.items():
+        body = json.dumps(payload).encode()
+        print(f"{label} ({len(body) / 1024:.0f} KiB)")
+        rows = {
+            "decode json": best_of(args.repeat, lambda: json.loads(body)),
+            "decode codec": best_of(args.repeat, lambda: codec.loads(body)),
+            "encode json": best_of(args.repeat, lambda: json.dumps(payload).encode()),
+            "encode codec": best_of(args.repeat, lambda: codec.dumps(payload)),
+        }
+        if label == "scryfall sets":
+            rows["typed decode"] = best_of(
+                args.repeat, lambda: _PAGE_DECODER.decode(body)
+            )
+        for name, elapsed in rows.items():
+            print(f"  {name:<14} {elapsed:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Compare watcher diff-cache memory: dict of snapshots vs SnapshotCache.
+
+Usage:
+    poetry run python benchmarks/snapshot_cache.py --listings 50000
+
+Builds TCGplayer-shaped ListingSnapshots and reports the tracemalloc
+footprint of holding them in a plain dict (the old watcher caches) against
+the compact SnapshotCache. It also times one full diff pass over each.
+The snapshots for a poll cycle are allocated in both cases; only what
+outlives the cycle is measured.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from mtgbot.models import CardSku, ListingSnapshot, Vendor
+from mtgbot.watchers.snapshot_cache import SnapshotCache
+
+T = TypeVar("T")
+
+
+def build_snapshots(count: int, *, bump: float = 0.0) -> List[ListingSnapshot]:
+    observed = datetime.now(timezone.utc)
+    snapshots = []
+    for index in range(count):
+        oracle_id = f"{index:08d}-4c2e-9d1a-b7f0-{index:012x}"
+        snapshots.append(
+            ListingSnapshot(
+                vendor=Vendor.TCGPLAYER,
+                sku=CardSku(
+                    oracle_id=oracle_id,
+                    product_code=str(100000 + index),
+                    finish="Foil" if index % 3 == 0 else "Normal",
+                    vendor_sku=str(100000 + index),
+                ),
+                title=f"TCGplayer SKU {100000 + index}",
+                url=f"https://www.tcgplayer.com/product/{100000 + index}",
+                price=round(index % 500 + 0.49 + (bump if index % 10 == 0 else 0), 2),
+                currency="USD",
+                available=index % 7 != 0,
+                observed_at=observed,
+                metadata={
+                    "marketPrice": round(index % 500 + 0.5, 2),
+                    "directLowPrice": None,
+                    "quantity": index % 20,
+                },
+            )
+        )
+    return snapshots
+
+
+def measure(build: Callable[[], T]) -> Tuple[T, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def diff(cache, snapshots: List[ListingSnapshot]) -> int:
+    changed = 0
+    for snapshot in snapshots:
+        key = snapshot.sku.oracle_id
+        previous = cache.get(key)
+        if previous is None or (
+            previous.available != snapshot.available
+            or abs(snapshot.price - previous.price) >= 0.01
+        ):
+            changed += 1
+        cache[key] = snapshot
+    return changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--listings", type=int, default=50_000)
+    args = parser.parse_args()
+
+    def dict_cache() -> Dict[str, ListingSnapshot]:
+        return {
+            snapshot.sku.oracle_id: snapshot
+            for snapshot in build_snapshots(args.listings)
+        }
+
+    def compact_cache() -> SnapshotCache:
+        cache = SnapshotCache("benchmark")
+        for snapshot in build_snapshots(args.listings):
+            cache[snapshot.sku.oracle_id] = snapshot
+        return cache
+
+    print(f"{args.listings} listings")
+    next_cycle = build_snapshots(args.listings, bump=1.0)
+    builders = (("dict[ListingSnapshot]", dict_cache), ("SnapshotCache", compact_cache))
+    for label, build in builders:
+        cache, retained = measure(build)
+        started = time.perf_counter()
+        changed = diff(cache, next_cycle)
+        elapsed = time.perf_counter() - started
+        print(
+            f"  {label:<22} retained {retained / 1024 / 1024:8.2f} MiB "
+            f"({retained / args.listings:6.0f} B/listing)  "
+            f"diff {elapsed * 1000:7.1f} ms ({changed} changed)"
+        )
+
+
+if __name__ == "__main__":
+    main()
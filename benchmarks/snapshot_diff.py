@@ -0,0 +1,52 @@
+"""Time SnapshotDiffer's scalar and NumPy paths on a warm cache.
+
+Usage:
+    poetry run python benchmarks/snapshot_diff.py --listings 50000
+
+Seeds a SnapshotCache with one cycle of TCGplayer-shaped snapshots, then
+diffs a second cycle where roughly 10% of prices moved, once through each
+path, and checks both emit the same events.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from mtgbot.watchers.diff import EventNames, SnapshotDiffer
+from mtgbot.watchers.snapshot_cache import SnapshotCache
+
+from snapshot_cache import build_snapshots
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--listings", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed = build_snapshots(args.listings)
+    changed = build_snapshots(args.listings, bump=1.0)
+    results = {}
+    for label, vectorize_min in (("scalar", 10**12), ("numpy", 1)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            cache = SnapshotCache("benchmark")
+            differ = SnapshotDiffer(
+                cache,
+                EventNames.prefixed("tcgplayer"),
+                key=lambda snapshot: snapshot.sku.oracle_id,
+                wants=lambda snapshot: True,
+                vectorize_min=vectorize_min,
+            )
+            differ.diff(seed)
+            started = time.perf_counter()
+            events = differ.diff(changed)
+            best = min(best, time.perf_counter() - started)
+        results[label] = [(e.snapshot.sku.oracle_id, e.event_type) for e in events]
+        print(f"  {label:<7} {best * 1000:8.2f} ms  {len(events)} events")
+    assert results["scalar"] == results["numpy"]
+
+
+if __name__ == "__main__":
+    main()
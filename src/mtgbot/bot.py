@@ -4,100 +4,208 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from bisect import bisect_left
 from collections import defaultdict
-from typing import Iterable, List, Sequence
+from typing import Iterable, List, Optional, Sequence
 
 import aiohttp
 from datetime import datetime, time, timedelta, timezone
 
+from mtgbot import codec
 from mtgbot.config import load_settings
-from mtgbot.models import Decision, InventoryEvent, WishlistEntry
+from mtgbot.metrics import LatencyRecorder, ThroughputMeter, monitor_loop_lag
+from mtgbot.models import (
+    ActionType,
+    Decision,
+    InventoryEvent,
+    Vendor,
+    WishlistEntry,
+)
 from mtgbot.notifications.discord_bot import MtgDiscordBot, start_bot
+from mtgbot.notifications.outbound import OutboundScheduler
+from mtgbot.queues import ShardedEventQueue
 from mtgbot.services.set_schedule import SetScheduleService
 from mtgbot.services.tcgplayer_cart import TcgplayerCartService
 from mtgbot.services.tcgplayer_listings import TcgplayerListingsService
 from mtgbot.services.tcgplayer_sales import TcgplayerSalesService
 from mtgbot.services.wishlist import WishlistService
+from mtgbot.storage.database import Database
 from mtgbot.storage.sets import SetRepository
+from mtgbot.storage.snapshots import SnapshotRepository
 from mtgbot.storage.tcgplayer_cart import TcgplayerCartRepository
 from mtgbot.storage.tcgplayer_sales import TcgplayerSalesRepository
 from mtgbot.storage.wishlist import RoleMappingRepository, WishlistRepository
 from mtgbot.watchers.base import Watcher
 from mtgbot.watchers.card_kingdom import CardKingdomWatcher
+from mtgbot.watchers.diff import PriceThresholds
+from mtgbot.watchers.executor import ParseExecutor
 from mtgbot.watchers.local_store import PhoenixLocalStoreWatcher
 from mtgbot.watchers.tcgplayer import TcgplayerWatcher
 from mtgbot.watchers.big_box import BigBoxWatcher
+from mtgbot.watchers.limits import FetchLimiter
+from mtgbot.watchers.scheduling import AdaptivePollScheduler, ReleaseCalendar
 from mtgbot.watchers.scryfall_sets import ScryfallSetWatcher
 
 log = logging.getLogger(__name__)
 
+METRICS_LOG_INTERVAL_SECONDS = 900
+DISPATCH_STATS_INTERVAL_SECONDS = 60
+CART_DEMAND_WEIGHT = 5.0
+# Most events a decision worker drains from its shard into one Discord batch.
+DECISION_BATCH_MAX_EVENTS = 100
+
+
+_NO_PRICE_CAP = float("inf")
+
+
+def _price_cap(entry: WishlistEntry) -> float:
+    return _NO_PRICE_CAP if entry.max_price is None else entry.max_price
+
+
+class _PriceBucket:
+    """Wishlist entries kept sorted by ``max_price`` (no cap sorts last)."""
+
+    __slots__ = ("prices", "entries")
+
+    def __init__(self, entries: Iterable[WishlistEntry]) -> None:
+        ordered = sorted(entries, key=_price_cap)
+        self.prices: List[float] = [_price_cap(entry) for entry in ordered]
+        self.entries: List[WishlistEntry] = ordered
+
+    def at_or_above(self, price: float) -> List[WishlistEntry]:
+        return self.entries[bisect_left(self.prices, price) :]
+
 
 class DecisionEngine:
-    """Matches inventory events against wishlists and selects actions."""
+    """Matches inventory events against wishlists and selects actions.
+
+    Entries live in ``{oracle_id: {discord_user_id: entry}}`` so register and
+    unregister are constant time. Each oracle_id also has a lazily rebuilt
+    index by preferred vendor (``None`` is the any-vendor bucket), sorted by
+    price cap, so evaluating an event is a bisect plus a slice per bucket.
+    Weighted demand per oracle_id is kept up to date alongside the entries.
+    """
 
     def __init__(self) -> None:
-        self._wishlists: dict[str, List[WishlistEntry]] = defaultdict(list)
+        self._wishlists: dict[str, dict[int, WishlistEntry]] = {}
+        self._index: dict[str, dict[Optional[Vendor], _PriceBucket]] = {}
+        self._dirty: set[str] = set()
+        self._demand: dict[str, float] = {}
 
     def register(self, wishlist: WishlistEntry) -> None:
         key = wishlist.sku.oracle_id
-        entries = self._wishlists[key]
-        for index, existing in enumerate(entries):
-            if existing.discord_user_id == wishlist.discord_user_id:
-                entries[index] = wishlist
-                break
-        else:
-            entries.append(wishlist)
+        entries = self._wishlists.get(key)
+        if entries is None:
+            entries = self._wishlists[key] = {}
+        replaced = entries.get(wishlist.discord_user_id)
+        entries[wishlist.discord_user_id] = wishlist
+        demand = self._demand.get(key, 0.0) + _demand_weight(wishlist)
+        if replaced is not None:
+            demand -= _demand_weight(replaced)
+        self._demand[key] = demand
+        self._dirty.add(key)
 
     def unregister(self, discord_user_id: int, oracle_id: str) -> None:
         entries = self._wishlists.get(oracle_id)
         if not entries:
             return
-        self._wishlists[oracle_id] = [
-            entry
-            for entry in entries
-            if entry.discord_user_id != discord_user_id
-        ]
-        if not self._wishlists[oracle_id]:
+        removed = entries.pop(discord_user_id, None)
+        if removed is None:
+            return
+        if entries:
+            self._demand[oracle_id] -= _demand_weight(removed)
+            self._dirty.add(oracle_id)
+        else:
             del self._wishlists[oracle_id]
+            del self._demand[oracle_id]
+            self._index.pop(oracle_id, None)
+            self._dirty.discard(oracle_id)
+
+    def watches(self, oracle_id: str) -> bool:
+        """Cheap membership check watchers use to skip unwatched cards."""
+        return oracle_id in self._wishlists
+
+    def demand(self, oracle_id: str) -> float:
+        """Weighted wishlist count for ``oracle_id``; cart wishlists count extra."""
+        return self._demand.get(oracle_id, 0.0)
 
     def reset(self, entries: Sequence[WishlistEntry]) -> None:
         self._wishlists.clear()
+        self._index.clear()
+        self._dirty.clear()
+        self._demand.clear()
         for entry in entries:
             self.register(entry)
 
     def evaluate(self, event: InventoryEvent) -> Iterable[Decision]:
         snap = event.snapshot
-        matches = self._wishlists.get(snap.sku.oracle_id, [])
-        for wishlist in matches:
-            if wishlist.preferred_vendors and snap.vendor not in wishlist.preferred_vendors:
-                continue
-            if (
-                wishlist.max_price is not None
-                and snap.price > wishlist.max_price
-            ):
+        buckets = self._buckets(snap.sku.oracle_id)
+        if not buckets:
+            return
+        for vendor_key in (snap.vendor, None):
+            bucket = buckets.get(vendor_key)
+            if bucket is None:
                 continue
-            yield Decision(
-                event=event,
-                wishlist=wishlist,
-                action=wishlist.action_preference,
-                rationale=f"Price {snap.price:.2f} within threshold",
-            )
+            for wishlist in bucket.at_or_above(snap.price):
+                yield Decision(
+                    event=event,
+                    wishlist=wishlist,
+                    action=wishlist.action_preference,
+                    rationale=f"Price {snap.price:.2f} within threshold",
+                )
+
+    def _buckets(
+        self, oracle_id: str
+    ) -> Optional[dict[Optional[Vendor], _PriceBucket]]:
+        if oracle_id in self._dirty:
+            self._dirty.discard(oracle_id)
+            grouped: dict[Optional[Vendor], List[WishlistEntry]] = defaultdict(list)
+            for entry in self._wishlists.get(oracle_id, {}).values():
+                for vendor_key in _vendor_keys(entry):
+                    grouped[vendor_key].append(entry)
+            self._index[oracle_id] = {
+                vendor_key: _PriceBucket(group)
+                for vendor_key, group in grouped.items()
+            }
+        return self._index.get(oracle_id)
+
+
+def _demand_weight(entry: WishlistEntry) -> float:
+    return CART_DEMAND_WEIGHT if entry.action_preference == ActionType.CART else 1.0
+
+
+def _vendor_keys(entry: WishlistEntry) -> Sequence[Optional[Vendor]]:
+    if not entry.preferred_vendors:
+        return (None,)
+    return tuple(dict.fromkeys(entry.preferred_vendors))
 
 
 async def inventory_worker(
-    watcher: Watcher, queue: asyncio.Queue[InventoryEvent]
+    watcher: Watcher,
+    queue: ShardedEventQueue,
+    scheduler: AdaptivePollScheduler,
 ) -> None:
     try:
         while True:
             try:
-                event = await watcher.poll()
+                events = await watcher.poll_batch()
             except Exception as exc:
                 log.exception("Watcher %s failed: %s", watcher.vendor.value, exc)
                 await asyncio.sleep(min(300, watcher.poll_interval * 2))
                 continue
-            if event is not None:
+            if events:
+                log.debug(
+                    "Watcher %s produced %d events", watcher.vendor.value, len(events)
+                )
+            for event in events:
                 await queue.put(event)
-            await asyncio.sleep(watcher.poll_interval)
+            changed = watcher.changed_last_cycle or bool(events)
+            delay = scheduler.next_delay(watcher, changed=changed)
+            hint = watcher.next_poll_hint()
+            if hint is not None:
+                # Item-scheduled watchers wake when their next item is due.
+                delay = min(delay, max(hint, 1.0))
+            await asyncio.sleep(delay)
     except asyncio.CancelledError:
         log.info("Inventory worker for %s cancelled", watcher.vendor.value)
         raise
@@ -107,20 +215,82 @@ async def decision_worker(
     queue: asyncio.Queue[InventoryEvent],
     engine: DecisionEngine,
     discord_client: MtgDiscordBot,
+    throughput: ThroughputMeter,
+    *,
+    worker_id: int = 0,
+    max_batch: int = DECISION_BATCH_MAX_EVENTS,
 ) -> None:
+    """Evaluates events in batches so ``send_decisions`` can coalesce them.
+
+    After waking on one event the worker also takes whatever is already
+    waiting in its shard (up to ``max_batch``), then sends every resulting
+    decision in a single call.
+    """
     try:
         while True:
-            event = await queue.get()
+            events = [await queue.get()]
+            while len(events) < max_batch and not queue.empty():
+                events.append(queue.get_nowait())
             try:
-                decisions = list(engine.evaluate(event))
+                decisions = [
+                    decision
+                    for event in events
+                    for decision in engine.evaluate(event)
+                ]
                 if not decisions:
                     continue
-                log.info("Dispatching %d decisions", len(decisions))
+                log.info(
+                    "Worker %d dispatching %d decisions from %d events",
+                    worker_id,
+                    len(decisions),
+                    len(events),
+                )
                 await discord_client.send_decisions(decisions)
+                throughput.add(len(decisions))
+            except Exception as exc:
+                log.exception("Decision worker %d failed: %s", worker_id, exc)
             finally:
-                queue.task_done()
+                for _ in events:
+                    queue.task_done()
+    except asyncio.CancelledError:
+        log.info("Decision worker %d cancelled", worker_id)
+        raise
+
+
+def _log_latencies(label: str, recorder: LatencyRecorder) -> None:
+    for name, stats in sorted(recorder.snapshot().items()):
+        log.info("%s %s: %s", label, name, stats.describe())
+
+
+async def dispatch_stats_loop(
+    queue: ShardedEventQueue, throughput: ThroughputMeter
+) -> None:
+    try:
+        while True:
+            await asyncio.sleep(DISPATCH_STATS_INTERVAL_SECONDS)
+            rate = throughput.rate()
+            depth = queue.qsize()
+            if rate or depth:
+                log.info(
+                    "Dispatch: %.2f decisions/sec, queue depth %d (total %d, "
+                    "dropped %d, coalesced %d)",
+                    rate,
+                    depth,
+                    throughput.total,
+                    queue.dropped,
+                    queue.coalesced,
+                )
+    except asyncio.CancelledError:
+        raise
+
+
+async def metrics_loop(recorders: dict[str, LatencyRecorder]) -> None:
+    try:
+        while True:
+            await asyncio.sleep(METRICS_LOG_INTERVAL_SECONDS)
+            for label, recorder in recorders.items():
+                _log_latencies(label, recorder)
     except asyncio.CancelledError:
-        log.info("Decision worker cancelled")
         raise
 
 
@@ -128,38 +298,106 @@ async def app() -> None:
     logging.basicConfig(level=logging.INFO)
     settings = load_settings()
 
-    event_queue: asyncio.Queue[InventoryEvent] = asyncio.Queue()
+    event_queue = ShardedEventQueue(
+        settings.polling.decision_workers,
+        capacity=settings.polling.event_queue_capacity,
+        policy=settings.polling.event_queue_policy,
+    )
+    throughput = ThroughputMeter()
     engine = DecisionEngine()
 
-    wishlist_repo = WishlistRepository(settings.database.sqlite_path)
-    role_repo = RoleMappingRepository(settings.database.sqlite_path)
+    database = Database(
+        settings.database.sqlite_path,
+        reader_pool_size=settings.database.sqlite_reader_pool_size,
+    )
+    await database.open()
+
+    wishlist_repo = WishlistRepository(database)
+    role_repo = RoleMappingRepository(database)
     wishlist_service = WishlistService(wishlist_repo, role_repo, engine)
     await wishlist_service.initialize()
 
-    set_repo = SetRepository(settings.database.sqlite_path)
+    set_repo = SetRepository(database)
     set_schedule_service = SetScheduleService(set_repo)
     await set_schedule_service.initialize()
 
-    tcg_sales_repo = TcgplayerSalesRepository(settings.database.sqlite_path)
+    tcg_sales_repo = TcgplayerSalesRepository(database)
     await tcg_sales_repo.init()
     tcg_sales_service = TcgplayerSalesService(tcg_sales_repo, settings.vendors)
 
-    tcg_cart_repo = TcgplayerCartRepository(settings.database.sqlite_path)
+    tcg_cart_repo = TcgplayerCartRepository(database)
     await tcg_cart_repo.init()
     tcg_cart_service = TcgplayerCartService(tcg_cart_repo)
     tcg_listing_service = TcgplayerListingsService(settings.vendors)
 
+    snapshot_repo = SnapshotRepository(database)
+    await snapshot_repo.init()
+
+    runtime_metrics = LatencyRecorder()
+    parse_executor = ParseExecutor(
+        settings.polling.parse_executor,
+        max_workers=settings.polling.parse_workers,
+        metrics=runtime_metrics,
+    )
+
+    outbound = OutboundScheduler(
+        capacity=settings.discord.outbound_queue_size,
+        rate=settings.discord.outbound_rate,
+        per=settings.discord.outbound_per_seconds,
+        stale_after=settings.discord.stale_alert_seconds,
+    )
+
     timeout = aiohttp.ClientTimeout(total=30)
 
-    async with aiohttp.ClientSession(timeout=timeout) as session:
+    release_calendar = ReleaseCalendar(
+        window_days=settings.polling.release_window_days
+    )
+    release_calendar.update(await set_schedule_service.release_dates())
+    poll_scheduler = AdaptivePollScheduler(
+        release_calendar,
+        min_interval=settings.polling.min_poll_interval_seconds,
+        max_factor=settings.polling.max_poll_backoff,
+        enabled=settings.polling.adaptive_polling,
+    )
+
+    thresholds = PriceThresholds.from_settings(
+        settings.vendors.price_change_thresholds
+    )
+
+    def store_limiter() -> FetchLimiter:
+        return FetchLimiter(
+            settings.polling.max_tasks_per_store,
+            per_host=settings.polling.max_tasks_per_host,
+        )
+
+    async with aiohttp.ClientSession(
+        timeout=timeout, json_serialize=codec.dumps_text
+    ) as session:
         watchers: List[Watcher] = [
-            CardKingdomWatcher(session),
+            CardKingdomWatcher(
+                session,
+                parser=settings.vendors.card_kingdom_parser,
+                executor=parse_executor,
+                max_pages=settings.vendors.card_kingdom_max_pages,
+                page_concurrency=settings.vendors.card_kingdom_page_concurrency,
+                snapshot_store=snapshot_repo,
+                thresholds=thresholds,
+            ),
         ]
 
         if settings.vendors.phoenix_store_feeds:
             watchers.append(
                 PhoenixLocalStoreWatcher(
-                    session, settings.vendors.phoenix_store_feeds
+                    session,
+                    settings.vendors.phoenix_store_feeds,
+                    limiter=store_limiter(),
+                    snapshot_store=snapshot_repo,
+                    thresholds=thresholds,
+                    stream_min_bytes=(
+                        None
+                        if settings.vendors.phoenix_feed_stream_min_bytes < 0
+                        else settings.vendors.phoenix_feed_stream_min_bytes
+                    ),
                 )
             )
 
@@ -170,14 +408,32 @@ async def app() -> None:
                     public_key=settings.vendors.tcgplayer_public_key,
                     private_key=settings.vendors.tcgplayer_private_key,
                     sku_whitelist=settings.vendors.tcgplayer_skus,
+                    limiter=store_limiter(),
+                    batch_size=settings.vendors.tcgplayer_sku_batch_size,
+                    snapshot_store=snapshot_repo,
+                    thresholds=thresholds,
                 )
             )
 
         if settings.vendors.big_box_urls:
             watchers.append(
-                BigBoxWatcher(session, settings.vendors.big_box_urls)
+                BigBoxWatcher(
+                    session,
+                    settings.vendors.big_box_urls,
+                    limiter=store_limiter(),
+                    executor=parse_executor,
+                    snapshot_store=snapshot_repo,
+                    thresholds=thresholds,
+                )
             )
 
+        # WishlistService keeps the engine's oracle_id keys in sync, so
+        # watchers drop unwatched listings before building events. Watchers
+        # that schedule per item also poll in-demand items more often.
+        for watcher in watchers:
+            watcher.set_interest(engine.watches)
+            watcher.set_demand(engine.demand, pace=poll_scheduler.pace)
+
         scryfall_watcher = ScryfallSetWatcher(session)
 
         tcg_sales_service.set_session(session)
@@ -191,19 +447,28 @@ async def app() -> None:
             tcg_sales_service,
             tcg_cart_service,
             tcg_listing_service,
+            outbound=outbound,
         )
         discord_client.register_commands()
 
         async def sync_sets_job() -> None:
             sets = await scryfall_watcher.fetch_sets()
             if sets:
-                await set_schedule_service.sync_sets(sets)
+                changed = await set_schedule_service.sync_sets(sets)
+                log.info("Synced %d sets (%d changed)", len(sets), changed)
+                if changed:
+                    release_calendar.update(
+                        await set_schedule_service.release_dates()
+                    )
             alerts = await set_schedule_service.pending_alerts()
             if not alerts:
                 return
-            await discord_client.send_set_alerts(alerts)
-            for alert in alerts:
-                await set_schedule_service.mark_alert_sent(alert)
+            deliveries = await discord_client.send_set_alerts(alerts)
+            results = await asyncio.gather(*deliveries, return_exceptions=True)
+            for alert, result in zip(alerts, results):
+                # None means the scheduler dropped it; retry on the next sync.
+                if result is not None and not isinstance(result, BaseException):
+                    await set_schedule_service.mark_alert_sent(alert)
 
         async def digest_job() -> None:
             upcoming = await set_schedule_service.upcoming_sets(within_days=90)
@@ -245,15 +510,35 @@ async def app() -> None:
 
         tasks = [
             asyncio.create_task(start_bot(discord_client)),
-            asyncio.create_task(
-                decision_worker(event_queue, engine, discord_client)
-            ),
+            asyncio.create_task(outbound.run()),
+            asyncio.create_task(dispatch_stats_loop(event_queue, throughput)),
             asyncio.create_task(set_sync_loop()),
             asyncio.create_task(digest_loop()),
+            asyncio.create_task(monitor_loop_lag(runtime_metrics)),
+            asyncio.create_task(
+                metrics_loop(
+                    {
+                        "sqlite": database.metrics,
+                        "runtime": runtime_metrics,
+                        "discord": outbound.metrics,
+                        "queue": event_queue.metrics,
+                    }
+                )
+            ),
         ]
 
         tasks.extend(
-            asyncio.create_task(inventory_worker(watcher, event_queue))
+            asyncio.create_task(
+                decision_worker(
+                    shard, engine, discord_client, throughput, worker_id=index
+                )
+            )
+            for index, shard in enumerate(event_queue.shards)
+        )
+        tasks.extend(
+            asyncio.create_task(
+                inventory_worker(watcher, event_queue, poll_scheduler)
+            )
             for watcher in watchers
         )
 
@@ -263,6 +548,8 @@ async def app() -> None:
             for task in tasks:
                 task.cancel()
             await asyncio.gather(*tasks, return_exceptions=True)
+            parse_executor.shutdown()
+            await database.close()
 
 
 def main() -> None:
@@ -0,0 +1,265 @@
+"""JSON encoding/decoding shared by HTTP clients and the feed server.
+
+orjson is used when installed, then msgspec, then the stdlib ``json``
+module. ``BACKEND`` names the active one. ``Decoder`` decodes a body
+straight into a dataclass tree; with msgspec that happens natively,
+otherwise the decoded dict is converted field by field.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import types
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+import aiohttp
+from aiohttp import web
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _msgspec_loads(data: Union[bytes, str]) -> Any:
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+def _resolve() -> Tuple[str, Callable[..., Any], Callable[[Any], bytes]]:
+    if orjson is not None:
+        return "orjson", orjson.loads, orjson.dumps
+    if msgspec is not None:
+        return "msgspec", _msgspec_loads, msgspec.json.encode
+    return "json", _json_loads, _json_dumps
+
+
+BACKEND, _loads, _dumps = _resolve()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON; malformed input raises ``ValueError``."""
+    return _loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode compact UTF-8 JSON."""
+    return _dumps(obj)
+
+
+def dumps_text(obj: Any) -> str:
+    """``dumps`` as ``str``, for aiohttp's ``json_serialize``/``dumps`` hooks."""
+    return _dumps(obj).decode()
+
+
+async def read_json(resp: aiohttp.ClientResponse) -> Any:
+    """Drop-in for ``resp.json()`` that skips the content-type check."""
+    return loads(await resp.read())
+
+
+def json_response(data: Any, *, status: int = 200) -> web.Response:
+    return web.Response(
+        body=dumps(data), status=status, content_type="application/json"
+    )
+
+
+class Decoder(Generic[T]):
+    """Decodes JSON bodies into ``type_`` (a dataclass, or a list of them).
+
+    Dataclass fields are matched to JSON keys by name, unknown keys are
+    ignored, and fields with defaults may be missing. Anything that does
+    not fit raises ``ValueError``. Without msgspec the per-type converters
+    are built once, so decoding is one pass over the parsed tree.
+    """
+
+    __slots__ = ("type", "_native", "_convert")
+
+    def __init__(self, type_: Type[T]) -> None:
+        self.type = type_
+        self._native = msgspec.json.Decoder(type_) if msgspec is not None else None
+        self._convert = _converter(type_)
+
+    def decode(self, data: Union[bytes, str]) -> T:
+        if self._native is not None:
+            try:
+                return self._native.decode(data)
+            except msgspec.MsgspecError as exc:
+                raise ValueError(str(exc)) from exc
+        return self._convert(loads(data))
+
+    def convert(self, value: Any) -> T:
+        """Build ``type_`` from an already decoded JSON value."""
+        return self._convert(value)
+
+
+Converter = Callable[[Any], Any]
+
+_CONVERTERS: Dict[Any, Converter] = {}
+
+
+def _converter(tp: Any) -> Converter:
+    convert = _CONVERTERS.get(tp)
+    if convert is None:
+        convert = _CONVERTERS[tp] = _build_converter(tp)
+    return convert
+
+
+def _mismatch(expected: str, value: Any) -> ValueError:
+    return ValueError(f"Expected {expected}, got {type(value).__name__}")
+
+
+def _build_converter(tp: Any) -> Converter:
+    if tp is Any:
+        return _identity
+    origin = get_origin(tp)
+    if origin is Union or origin is types.UnionType:
+        return _union_converter(tp)
+    if origin is list:
+        (item_type,) = get_args(tp) or (Any,)
+        convert_item = _converter(item_type)
+
+        def convert_list(value: Any) -> List[Any]:
+            if not isinstance(value, list):
+                raise _mismatch("a JSON array", value)
+            return [convert_item(item) for item in value]
+
+        return convert_list
+    if origin is dict or tp is dict:
+        return _typed_check(dict, "a JSON object")
+    if dataclasses.is_dataclass(tp):
+        return _dataclass_converter(tp)
+    if tp is float:
+
+        def convert_float(value: Any) -> float:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return float(value)
+            raise _mismatch("float", value)
+
+        return convert_float
+    if tp is int:
+
+        def convert_int(value: Any) -> int:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+            raise _mismatch("int", value)
+
+        return convert_int
+    if tp in (str, bool):
+        return _typed_check(tp, tp.__name__)
+    if tp is type(None):
+        return _typed_check(type(None), "null")
+    return _identity
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _typed_check(tp: type, expected: str) -> Converter:
+    def check(value: Any) -> Any:
+        if isinstance(value, tp):
+            return value
+        raise _mismatch(expected, value)
+
+    return check
+
+
+def _union_converter(tp: Any) -> Converter:
+    args = get_args(tp)
+    nullable = type(None) in args
+    options = [_converter(arg) for arg in args if arg is not type(None)]
+    if len(options) == 1:
+        (only,) = options
+
+        def convert_optional(value: Any) -> Any:
+            if value is None and nullable:
+                return None
+            return only(value)
+
+        return convert_optional
+
+    def convert_union(value: Any) -> Any:
+        if value is None and nullable:
+            return None
+        for option in options:
+            try:
+                return option(value)
+            except ValueError:
+                continue
+        raise ValueError(f"{value!r} does not match {tp}")
+
+    return convert_union
+
+
+def _dataclass_converter(cls: type) -> Converter:
+    hints = get_type_hints(cls)
+    plan: List[Tuple[str, Converter, bool]] = []
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, dict):
+            raise _mismatch(f"a JSON object for {cls.__name__}", value)
+        kwargs = {}
+        for name, convert_field, required in plan:
+            if name in value:
+                kwargs[name] = convert_field(value[name])
+            elif required:
+                raise ValueError(f"{cls.__name__} is missing {name!r}")
+        return cls(**kwargs)
+
+    # Register before resolving fields so self-referencing types terminate.
+    _CONVERTERS[cls] = convert
+    for field in dataclasses.fields(cls):
+        required = (
+            field.default is dataclasses.MISSING
+            and field.default_factory is dataclasses.MISSING
+        )
+        plan.append((field.name, _converter(hints[field.name]), required))
+    return convert
+
+
+__all__ = [
+    "BACKEND",
+    "BACKENDS",
+    "Decoder",
+    "dumps",
+    "dumps_text",
+    "json_response",
+    "loads",
+    "read_json",
+]
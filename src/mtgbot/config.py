@@ -3,8 +3,8 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 
 def _getenv(key: str, default: Optional[str] = None) -> Optional[str]:
@@ -21,6 +21,11 @@ class DiscordSettings:
     application_id: Optional[int]
     guild_id: Optional[int]
     release_channel_id: Optional[int]
+    batch_alerts: bool = True
+    outbound_queue_size: int = 500
+    outbound_rate: int = 5
+    outbound_per_seconds: float = 5.0
+    stale_alert_seconds: float = 120.0
 
 
 @dataclass
@@ -28,12 +33,23 @@ class DatabaseSettings:
     postgres_dsn: Optional[str]
     redis_dsn: Optional[str]
     sqlite_path: str
+    sqlite_reader_pool_size: int = 3
 
 
 @dataclass
 class PollingSettings:
     default_interval_seconds: int = 300
     max_tasks_per_store: int = 10
+    max_tasks_per_host: int = 4
+    parse_executor: str = "thread"
+    parse_workers: int = 2
+    decision_workers: int = 4
+    event_queue_capacity: int = 5000
+    event_queue_policy: str = "block"
+    adaptive_polling: bool = True
+    min_poll_interval_seconds: int = 30
+    max_poll_backoff: float = 8.0
+    release_window_days: int = 1
 
 
 @dataclass
@@ -54,6 +70,14 @@ class VendorSettings:
     tcgplayer_private_key: Optional[str]
     tcgplayer_skus: List[str]
     tcgplayer_cookie: Optional[str]
+    tcgplayer_sku_batch_size: int = 100
+    card_kingdom_parser: str = "auto"
+    price_change_thresholds: Dict[str, Tuple[float, float]] = field(
+        default_factory=dict
+    )
+    card_kingdom_max_pages: int = 20
+    card_kingdom_page_concurrency: int = 4
+    phoenix_feed_stream_min_bytes: int = 262144
 
 
 @dataclass
@@ -83,12 +107,27 @@ def load_settings() -> Settings:
             _getenv("DISCORD_RELEASE_CHANNEL_ID", "0") or "0"
         )
         or None,
+        batch_alerts=(_getenv("DISCORD_BATCH_ALERTS", "true") or "true").lower()
+        not in {"0", "false", "no", "off"},
+        outbound_queue_size=int(
+            _getenv("DISCORD_OUTBOUND_QUEUE_SIZE", "500") or "500"
+        ),
+        outbound_rate=int(_getenv("DISCORD_OUTBOUND_RATE", "5") or "5"),
+        outbound_per_seconds=float(
+            _getenv("DISCORD_OUTBOUND_PER_SECONDS", "5") or "5"
+        ),
+        stale_alert_seconds=float(
+            _getenv("DISCORD_STALE_ALERT_SECONDS", "120") or "120"
+        ),
     )
 
     database = DatabaseSettings(
         postgres_dsn=_getenv("POSTGRES_DSN"),
         redis_dsn=_getenv("REDIS_DSN"),
         sqlite_path=_getenv("SQLITE_DB_PATH", "data/mtgbot.db") or "data/mtgbot.db",
+        sqlite_reader_pool_size=int(
+            _getenv("SQLITE_READER_POOL_SIZE", "3") or "3"
+        ),
     )
 
     polling = PollingSettings(
@@ -98,6 +137,25 @@ def load_settings() -> Settings:
         max_tasks_per_store=int(
             _getenv("MAX_TASKS_PER_STORE", "10") or "10"
         ),
+        max_tasks_per_host=int(
+            _getenv("MAX_TASKS_PER_HOST", "4") or "4"
+        ),
+        parse_executor=(_getenv("PARSE_EXECUTOR", "thread") or "thread").lower(),
+        parse_workers=int(_getenv("PARSE_WORKERS", "2") or "2"),
+        decision_workers=int(_getenv("DECISION_WORKERS", "4") or "4"),
+        event_queue_capacity=int(
+            _getenv("EVENT_QUEUE_CAPACITY", "5000") or "5000"
+        ),
+        event_queue_policy=(
+            _getenv("EVENT_QUEUE_POLICY", "block") or "block"
+        ).lower(),
+        adaptive_polling=(_getenv("ADAPTIVE_POLLING", "true") or "true").lower()
+        not in {"0", "false", "no", "off"},
+        min_poll_interval_seconds=int(
+            _getenv("MIN_POLL_INTERVAL_SECONDS", "30") or "30"
+        ),
+        max_poll_backoff=float(_getenv("MAX_POLL_BACKOFF", "8") or "8"),
+        release_window_days=int(_getenv("RELEASE_WINDOW_DAYS", "1") or "1"),
     )
 
     vendors = VendorSettings(
@@ -107,6 +165,22 @@ def load_settings() -> Settings:
         tcgplayer_private_key=_getenv("TCGPLAYER_PRIVATE_KEY"),
         tcgplayer_skus=_split_list(_getenv("TCGPLAYER_SKUS", "")),
         tcgplayer_cookie=_getenv("TCGPLAYER_COOKIE"),
+        tcgplayer_sku_batch_size=int(
+            _getenv("TCGPLAYER_SKU_BATCH_SIZE", "100") or "100"
+        ),
+        card_kingdom_parser=_getenv("CARD_KINGDOM_PARSER", "auto") or "auto",
+        price_change_thresholds=_parse_thresholds(
+            _getenv("PRICE_CHANGE_THRESHOLDS", "")
+        ),
+        card_kingdom_max_pages=int(
+            _getenv("CARD_KINGDOM_MAX_PAGES", "20") or "20"
+        ),
+        card_kingdom_page_concurrency=int(
+            _getenv("CARD_KINGDOM_PAGE_CONCURRENCY", "4") or "4"
+        ),
+        phoenix_feed_stream_min_bytes=int(
+            _getenv("PHOENIX_FEED_STREAM_MIN_BYTES", "262144") or "262144"
+        ),
     )
 
     schedule = ScheduleSettings(
@@ -142,3 +216,18 @@ def _split_list(value: Optional[str]) -> List[str]:
     if not value:
         return []
     return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_thresholds(value: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """Parse ``vendor=absolute[:percent]`` pairs (``default`` sets the fallback)."""
+    thresholds: Dict[str, Tuple[float, float]] = {}
+    for item in _split_list(value):
+        vendor, sep, limits = item.partition("=")
+        if not sep or not vendor.strip():
+            raise ValueError(f"Invalid PRICE_CHANGE_THRESHOLDS entry: {item!r}")
+        absolute, _, percent = limits.partition(":")
+        thresholds[vendor.strip().lower()] = (
+            float(absolute or 0.01),
+            float(percent or 0.0),
+        )
+    return thresholds
@@ -0,0 +1,108 @@
+"""Lightweight in-process metrics for latency and throughput tracking."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+
+@dataclass(slots=True)
+class LatencyStats:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total / self.count
+
+    def describe(self) -> str:
+        return (
+            f"n={self.count} avg={self.mean * 1000:.2f}ms "
+            f"max={self.max * 1000:.2f}ms"
+        )
+
+
+class LatencyRecorder:
+    """Collects named latency samples."""
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, LatencyStats] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = LatencyStats()
+        stats.record(seconds)
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, LatencyStats]:
+        return {
+            name: LatencyStats(stats.count, stats.total, stats.max)
+            for name, stats in self._stats.items()
+        }
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+class ThroughputMeter:
+    """Counts completed work items and reports the rate between reads."""
+
+    def __init__(self) -> None:
+        self.total = 0
+        self._window = 0
+        self._window_started = time.monotonic()
+
+    def add(self, count: int = 1) -> None:
+        self.total += count
+        self._window += count
+
+    def rate(self) -> float:
+        """Items per second since the previous call, then start a new window."""
+        now = time.monotonic()
+        elapsed = now - self._window_started
+        rate = self._window / elapsed if elapsed > 0 else 0.0
+        self._window = 0
+        self._window_started = now
+        return rate
+
+
+async def monitor_loop_lag(
+    recorder: LatencyRecorder,
+    *,
+    interval: float = 0.5,
+    name: str = "event_loop.lag",
+) -> None:
+    """Record how late the event loop wakes a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        recorder.record(name, max(0.0, loop.time() - started - interval))
+
+
+__all__ = [
+    "LatencyRecorder",
+    "LatencyStats",
+    "ThroughputMeter",
+    "monitor_loop_lag",
+]
@@ -2,9 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+from dataclasses import dataclass
 from datetime import date
-from typing import Iterable, Optional, Literal, Sequence
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Literal,
+    Sequence,
+    Tuple,
+)
 
 import discord
 from discord import app_commands
@@ -14,6 +27,7 @@ from mtgbot.config import Settings
 from mtgbot.models import (
     ActionType,
     Decision,
+    InventoryEvent,
     ListingSnapshot,
     MagicSet,
     SetAlert,
@@ -21,6 +35,7 @@ from mtgbot.models import (
     WishlistEntry,
     Vendor,
 )
+from mtgbot.notifications.outbound import OutboundScheduler, Priority
 from mtgbot.services.wishlist import WishlistService
 from mtgbot.services.set_schedule import SetScheduleService, UpcomingSet
 from mtgbot.services.tcgplayer_sales import (
@@ -40,6 +55,33 @@ from mtgbot.services.tcgplayer_listings import (
 log = logging.getLogger(__name__)
 _TEST_MILESTONE = SetMilestone.ANNOUNCEMENT
 
+# Discord per-message limits used when coalescing alerts.
+MAX_EMBEDS_PER_MESSAGE = 10
+_MAX_EMBED_CHARS_PER_MESSAGE = 6000
+_MAX_CONTENT_LENGTH = 2000
+_ALERT_HEADER = "New availability alert"
+
+
+@dataclass(slots=True)
+class _AlertGroup:
+    """One embed covering every decision raised by a single listing snapshot."""
+
+    embed: discord.Embed
+    mentions: List[str]
+    view: Optional[discord.ui.View] = None
+    priority: Priority = Priority.ALERT
+    merge_key: Optional[Hashable] = None
+
+
+@dataclass(slots=True)
+class _OutboundMessage:
+    """``channel.send`` keyword arguments plus their scheduling hints."""
+
+    kwargs: Dict[str, Any]
+    priority: Priority
+    merge_key: Optional[Hashable] = None
+    stale: bool = False
+
 
 class MtgDiscordBot(discord.Client):
     def __init__(
@@ -50,6 +92,7 @@ class MtgDiscordBot(discord.Client):
         tcgplayer_sales_service: Optional[TcgplayerSalesService] = None,
         tcgplayer_cart_service: Optional[TcgplayerCartService] = None,
         tcgplayer_listings_service: Optional[TcgplayerListingsService] = None,
+        outbound: Optional[OutboundScheduler] = None,
     ) -> None:
         intents = discord.Intents.default()
         intents.message_content = True
@@ -61,6 +104,7 @@ class MtgDiscordBot(discord.Client):
         self.tcgplayer_sales_service = tcgplayer_sales_service
         self.tcgplayer_cart_service = tcgplayer_cart_service
         self.tcgplayer_listings_service = tcgplayer_listings_service
+        self.outbound = outbound
         self.tree = app_commands.CommandTree(self)
 
     async def setup_hook(self) -> None:
@@ -74,7 +118,7 @@ class MtgDiscordBot(discord.Client):
 
     async def send_decisions(
         self, decisions: Iterable[Decision]
-    ) -> list[discord.Message]:
+    ) -> list[asyncio.Future]:
         await self.wait_until_ready()
         channel_id = self.settings.discord.release_channel_id
         if not channel_id:
@@ -85,20 +129,101 @@ class MtgDiscordBot(discord.Client):
         if channel is None:
             channel = await self.fetch_channel(channel_id)
 
-        messages: list[discord.Message] = []
-        for decision in decisions:
-            embed = _build_embed(decision.event.snapshot, decision)
-            mention = self.wishlist_service.resolve_role_mentions(
-                decision.wishlist.tags
+        requests: list[_OutboundMessage] = []
+        if not self.settings.discord.batch_alerts:
+            for decision in decisions:
+                embed = _build_embed(decision.event.snapshot, decision)
+                mention = self.wishlist_service.resolve_role_mentions(
+                    decision.wishlist.tags
+                )
+                content = f"{mention} New availability alert" if mention else None
+                view = _decision_link_view(decision)
+                key = _merge_key(decision.event)
+                requests.append(
+                    _OutboundMessage(
+                        kwargs={"content": content, "embed": embed, "view": view},
+                        priority=_decision_priority([decision]),
+                        merge_key=(
+                            (key, decision.wishlist.discord_user_id) if key else None
+                        ),
+                        stale=key is not None,
+                    )
+                )
+            return await self._send_messages(channel, requests)
+
+        groups = [
+            self._alert_group(group) for group in _group_by_snapshot(decisions)
+        ]
+        for batch in _pack_alert_groups(groups):
+            keys = [group.merge_key for group in batch]
+            mergeable = all(keys)
+            requests.append(
+                _OutboundMessage(
+                    kwargs={
+                        "content": _batch_content(batch),
+                        "embeds": [group.embed for group in batch],
+                        "view": _batch_link_view(batch),
+                    },
+                    priority=min(group.priority for group in batch),
+                    merge_key=tuple(keys) if mergeable else None,
+                    stale=mergeable,
+                )
             )
-            content = f"{mention} New availability alert" if mention else None
-            view = _decision_link_view(decision)
-            messages.append(
-                await channel.send(content=content, embed=embed, view=view)
+        return await self._send_messages(channel, requests)
+
+    async def _send_messages(
+        self,
+        channel: discord.abc.Messageable,
+        requests: Sequence[_OutboundMessage],
+    ) -> list[asyncio.Future]:
+        """Hand ``requests`` to the outbound scheduler without awaiting delivery.
+
+        Each future resolves to the sent message, or ``None`` when the
+        scheduler merged, evicted or dropped it; send errors are logged.
+        Without a scheduler the messages are sent before returning.
+        """
+        if self.outbound is None:
+            futures = []
+            for request in requests:
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(await channel.send(**request.kwargs))
+                futures.append(future)
+            return futures
+        route = f"channels/{getattr(channel, 'id', 0)}/messages"
+        futures = []
+        for request in requests:
+            future = await self.outbound.submit(
+                route,
+                functools.partial(channel.send, **request.kwargs),
+                priority=request.priority,
+                merge_key=request.merge_key,
+                stale=request.stale,
+            )
+            future.add_done_callback(_log_delivery_error)
+            futures.append(future)
+        return futures
+
+    def _alert_group(self, decisions: Sequence[Decision]) -> _AlertGroup:
+        tags = dict.fromkeys(
+            tag for decision in decisions for tag in decision.wishlist.tags
+        )
+        role_mentions = self.wishlist_service.resolve_role_mentions(list(tags))
+        mentions = role_mentions.split() if role_mentions else []
+        mentions.extend(
+            f"<@{user_id}>"
+            for user_id in dict.fromkeys(
+                decision.wishlist.discord_user_id for decision in decisions
             )
-        return messages
+        )
+        return _AlertGroup(
+            embed=_build_group_embed(decisions[0].event.snapshot, decisions),
+            mentions=_trim_mentions(mentions),
+            view=_decision_link_view(decisions[0]),
+            priority=_decision_priority(decisions),
+            merge_key=_merge_key(decisions[0].event),
+        )
 
-    async def send_set_alerts(self, alerts: Sequence[SetAlert]) -> list[discord.Message]:
+    async def send_set_alerts(self, alerts: Sequence[SetAlert]) -> list[asyncio.Future]:
         await self.wait_until_ready()
         channel_id = self.settings.discord.release_channel_id
         if not channel_id or not alerts:
@@ -106,19 +231,24 @@ class MtgDiscordBot(discord.Client):
         channel = self.get_channel(channel_id)
         if channel is None:
             channel = await self.fetch_channel(channel_id)
-        messages: list[discord.Message] = []
-        for alert in alerts:
-            embed = _set_alert_embed(alert)
-            view = _magic_set_link_view(alert.magic_set)
-            messages.append(await channel.send(embed=embed, view=view))
-        return messages
+        requests = [
+            _OutboundMessage(
+                kwargs={
+                    "embed": _set_alert_embed(alert),
+                    "view": _magic_set_link_view(alert.magic_set),
+                },
+                priority=Priority.SET_ALERT,
+            )
+            for alert in alerts
+        ]
+        return await self._send_messages(channel, requests)
 
     async def send_set_digest(
         self,
         upcoming_sets: Sequence[UpcomingSet],
         *,
         title: str = "Upcoming MTG Releases",
-    ) -> Optional[discord.Message]:
+    ) -> Optional[asyncio.Future]:
         await self.wait_until_ready()
         channel_id = self.settings.discord.release_channel_id
         if not channel_id:
@@ -127,7 +257,13 @@ class MtgDiscordBot(discord.Client):
         if channel is None:
             channel = await self.fetch_channel(channel_id)
         embed = _set_digest_embed(upcoming_sets, title=title)
-        return await channel.send(embed=embed)
+        request = _OutboundMessage(
+            kwargs={"embed": embed},
+            priority=Priority.DIGEST,
+            merge_key=("digest", title),
+        )
+        (future,) = await self._send_messages(channel, [request])
+        return future
 
     def register_commands(self) -> None:
         tree = self.tree
@@ -686,6 +822,141 @@ def _build_embed(snapshot: ListingSnapshot, decision: Decision) -> discord.Embed
     return embed
 
 
+def _build_group_embed(
+    snapshot: ListingSnapshot, decisions: Sequence[Decision]
+) -> discord.Embed:
+    embed = _build_embed(snapshot, decisions[0])
+    if len(decisions) > 1:
+        actions = ", ".join(
+            dict.fromkeys(decision.action.value for decision in decisions)
+        )
+        embed.set_field_at(
+            0,
+            name="Action",
+            value=f"{actions} — {decisions[0].rationale}",
+            inline=False,
+        )
+        embed.set_footer(text=f"Matched {len(decisions)} wishlist entries")
+    return embed
+
+
+def _log_delivery_error(future: asyncio.Future) -> None:
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        log.warning("Discord delivery failed: %s", exc, exc_info=exc)
+
+
+def _decision_priority(decisions: Sequence[Decision]) -> Priority:
+    if any(decision.action == ActionType.CART for decision in decisions):
+        return Priority.CART
+    return Priority.ALERT
+
+
+def _merge_key(event: InventoryEvent) -> Optional[Hashable]:
+    """Listing identity for price-change alerts, which newer prices supersede."""
+    if not event.event_type.endswith("price_change"):
+        return None
+    snapshot = event.snapshot
+    sku = snapshot.sku
+    return (
+        snapshot.vendor,
+        sku.oracle_id,
+        sku.product_code,
+        sku.finish,
+        snapshot.url,
+    )
+
+
+def _snapshot_key(snapshot: ListingSnapshot) -> Tuple[object, ...]:
+    sku = snapshot.sku
+    return (
+        snapshot.vendor,
+        sku.oracle_id,
+        sku.product_code,
+        sku.finish,
+        snapshot.url,
+        snapshot.price,
+        snapshot.available,
+    )
+
+
+def _group_by_snapshot(decisions: Iterable[Decision]) -> List[List[Decision]]:
+    groups: Dict[Tuple[object, ...], List[Decision]] = {}
+    for decision in decisions:
+        key = _snapshot_key(decision.event.snapshot)
+        groups.setdefault(key, []).append(decision)
+    return list(groups.values())
+
+
+def _trim_mentions(mentions: List[str]) -> List[str]:
+    budget = _MAX_CONTENT_LENGTH - len(_ALERT_HEADER) - 32
+    kept: List[str] = []
+    used = 0
+    for mention in mentions:
+        if used + len(mention) + 1 > budget:
+            kept.append(f"(+{len(mentions) - len(kept)} more)")
+            break
+        kept.append(mention)
+        used += len(mention) + 1
+    return kept
+
+
+def _batch_content(batch: Sequence[_AlertGroup]) -> Optional[str]:
+    mentions = list(
+        dict.fromkeys(mention for group in batch for mention in group.mentions)
+    )
+    if not mentions:
+        return None
+    header = _ALERT_HEADER if len(batch) == 1 else f"{_ALERT_HEADER}s ({len(batch)})"
+    return f"{' '.join(mentions)} {header}"
+
+
+def _content_length(batch: Sequence[_AlertGroup]) -> int:
+    content = _batch_content(batch)
+    return len(content) if content else 0
+
+
+def _pack_alert_groups(groups: Sequence[_AlertGroup]) -> List[List[_AlertGroup]]:
+    """Pack groups into messages within Discord's embed, size and content limits."""
+    batches: List[List[_AlertGroup]] = []
+    current: List[_AlertGroup] = []
+    embed_chars = 0
+    for group in groups:
+        size = len(group.embed)
+        if current and (
+            len(current) >= MAX_EMBEDS_PER_MESSAGE
+            or embed_chars + size > _MAX_EMBED_CHARS_PER_MESSAGE
+            or _content_length(current + [group]) > _MAX_CONTENT_LENGTH
+        ):
+            batches.append(current)
+            current = []
+            embed_chars = 0
+        current.append(group)
+        embed_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _batch_link_view(batch: Sequence[_AlertGroup]) -> Optional[discord.ui.View]:
+    urls: Dict[str, discord.ui.Item] = {}
+    for group in batch:
+        if group.view is None:
+            continue
+        for item in group.view.children:
+            url = getattr(item, "url", None)
+            if url and url not in urls:
+                urls[url] = item
+    if not urls:
+        return None
+    view = discord.ui.View(timeout=None)
+    for item in list(urls.values())[:25]:
+        view.add_item(item)
+    return view
+
+
 def _format_wishlist_entry(entry: WishlistEntry) -> str:
     parts = [f"`{entry.sku.oracle_id}` → {entry.action_preference.value}"]
     if entry.max_price is not None:
@@ -0,0 +1,291 @@
+"""Rate-limit-aware scheduler for outbound Discord messages."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from mtgbot.metrics import LatencyRecorder
+
+log = logging.getLogger(__name__)
+
+SendFn = Callable[[], Awaitable[Any]]
+
+
+class Priority(IntEnum):
+    """Dispatch order; lower values are sent first."""
+
+    CART = 0
+    ALERT = 1
+    SET_ALERT = 2
+    DIGEST = 3
+
+
+class TokenBucket:
+    """Allows ``rate`` sends per ``per`` seconds with bursts up to ``rate``."""
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.capacity = float(max(rate, 1))
+        self._refill_per_second = self.capacity / max(per, 0.001)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 when one is ready)."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated) * self._refill_per_second,
+        )
+        self._updated = now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self._refill_per_second
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+
+@dataclass(slots=True)
+class _Outbound:
+    priority: int
+    seq: int
+    route: str
+    send: SendFn
+    future: asyncio.Future
+    merge_key: Optional[Hashable]
+    stale: bool
+    enqueued_at: float = field(default_factory=time.monotonic)
+    cancelled: bool = False
+
+    def __lt__(self, other: "_Outbound") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class OutboundScheduler:
+    """Buffers sends per route and drains them in priority order.
+
+    Each route (one Discord channel) has its own queue and token bucket sized
+    to the channel message limit, so the dispatcher waits locally instead of
+    tripping 429s. A route whose bucket is empty never holds up the others:
+    the next send is the most urgent message on any idle route with a token.
+    Each route has at most one send in flight, so messages to one channel
+    arrive in priority order while different channels send concurrently.
+    The buffer holds at most ``capacity`` messages. When it is
+    full, a higher-priority submit evicts the oldest lowest-priority message;
+    otherwise the submitter waits for space. Messages submitted with a
+    ``merge_key`` replace any pending message with the same key, and
+    ``stale`` messages older than ``stale_after`` seconds are dropped rather
+    than sent. Dropped, merged or evicted submissions resolve to ``None``.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = 500,
+        rate: int = 5,
+        per: float = 5.0,
+        stale_after: float = 120.0,
+        metrics: Optional[LatencyRecorder] = None,
+    ) -> None:
+        self._capacity = max(capacity, 1)
+        self._rate = rate
+        self._per = per
+        self._stale_after = stale_after
+        self._routes: Dict[str, List[_Outbound]] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._by_key: Dict[Hashable, _Outbound] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._live = 0
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self.metrics = metrics or LatencyRecorder()
+        self.sent = 0
+        self.dropped = 0
+        self.merged = 0
+
+    @property
+    def pending(self) -> int:
+        return self._live
+
+    async def submit(
+        self,
+        route: str,
+        send: SendFn,
+        *,
+        priority: Priority = Priority.ALERT,
+        merge_key: Optional[Hashable] = None,
+        stale: bool = False,
+    ) -> asyncio.Future:
+        """Queue ``send`` and return a future resolving to its result."""
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        item = _Outbound(
+            priority=int(priority),
+            seq=next(self._seq),
+            route=route,
+            send=send,
+            future=future,
+            merge_key=merge_key,
+            stale=stale,
+        )
+        if merge_key is not None:
+            previous = self._by_key.get(merge_key)
+            if previous is not None and not previous.cancelled:
+                self._discard(previous)
+                self.merged += 1
+        while self._live >= self._capacity and not self._evict_for(item):
+            self._has_space.clear()
+            await self._has_space.wait()
+        heapq.heappush(self._routes.setdefault(route, []), item)
+        self._live += 1
+        if merge_key is not None:
+            self._by_key[merge_key] = item
+        self._wakeup.set()
+        return future
+
+    async def run(self) -> None:
+        try:
+            while True:
+                item, delay = self._next_ready()
+                if item is None:
+                    # Re-check on new submits so urgent messages jump ahead, and
+                    # when a send finishes and frees its route.
+                    self._wakeup.clear()
+                    if delay is None:
+                        await self._wakeup.wait()
+                        continue
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                heapq.heappop(self._routes[item.route])
+                self._release(item)
+                waited = time.monotonic() - item.enqueued_at
+                if item.stale and waited > self._stale_after:
+                    log.info(
+                        "Dropping stale %s message after %.1fs", item.route, waited
+                    )
+                    self.dropped += 1
+                    _resolve(item.future, None)
+                    continue
+                self._bucket(item.route).take()
+                self.metrics.record(
+                    f"outbound.wait.{Priority(item.priority).name.lower()}", waited
+                )
+                self._in_flight[item.route] = asyncio.create_task(
+                    self._dispatch(item)
+                )
+        except asyncio.CancelledError:
+            for task in list(self._in_flight.values()):
+                task.cancel()
+            for heap in self._routes.values():
+                for item in heap:
+                    if not item.cancelled:
+                        item.future.cancel()
+            raise
+
+    async def _dispatch(self, item: _Outbound) -> None:
+        started = time.perf_counter()
+        try:
+            result = await item.send()
+        except asyncio.CancelledError:
+            item.future.cancel()
+            raise
+        except Exception as exc:
+            if not item.future.done():
+                item.future.set_exception(exc)
+        else:
+            self.sent += 1
+            _resolve(item.future, result)
+        finally:
+            self.metrics.record("outbound.send", time.perf_counter() - started)
+            self._in_flight.pop(item.route, None)
+            self._wakeup.set()
+
+    def _next_ready(self) -> Tuple[Optional[_Outbound], Optional[float]]:
+        """The most urgent head among idle routes with a token, else the
+        shortest wait.
+
+        Returns ``(None, None)`` when nothing is ready and no bucket is
+        refilling; a finished send sets the wakeup for its route.
+        """
+        best: Optional[_Outbound] = None
+        wait: Optional[float] = None
+        for route, heap in list(self._routes.items()):
+            while heap and heap[0].cancelled:
+                heapq.heappop(heap)
+            if not heap:
+                del self._routes[route]
+                continue
+            if route in self._in_flight:
+                continue
+            delay = self._bucket(route).delay()
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+            elif best is None or heap[0] < best:
+                best = heap[0]
+        return best, wait
+
+    def _bucket(self, route: str) -> TokenBucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = TokenBucket(self._rate, self._per)
+        return bucket
+
+    def _evict_for(self, item: _Outbound) -> bool:
+        candidates = [
+            queued
+            for heap in self._routes.values()
+            for queued in heap
+            if not queued.cancelled
+        ]
+        if not candidates:
+            return False
+        worst = max(candidates, key=lambda queued: (queued.priority, -queued.seq))
+        if worst.priority <= item.priority:
+            return False
+        log.warning(
+            "Outbound buffer full; evicting %s message for %s",
+            Priority(worst.priority).name.lower(),
+            Priority(item.priority).name.lower(),
+        )
+        self._discard(worst)
+        self.dropped += 1
+        return True
+
+    def _discard(self, item: _Outbound) -> None:
+        item.cancelled = True
+        self._release(item)
+        _resolve(item.future, None)
+
+    def _release(self, item: _Outbound) -> None:
+        self._live -= 1
+        if item.merge_key is not None and self._by_key.get(item.merge_key) is item:
+            del self._by_key[item.merge_key]
+        self._has_space.set()
+
+
+def _resolve(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+__all__ = ["OutboundScheduler", "Priority", "TokenBucket"]
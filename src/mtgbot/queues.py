@@ -0,0 +1,222 @@
+"""Queues connecting watchers to decision workers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+
+from mtgbot.metrics import LatencyRecorder
+from mtgbot.models import InventoryEvent
+
+log = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+def _listing_key(event: InventoryEvent) -> Hashable:
+    snapshot = event.snapshot
+    sku = snapshot.sku
+    return (snapshot.vendor, sku.oracle_id, sku.product_code, sku.finish)
+
+
+def _is_flip(event: InventoryEvent) -> bool:
+    return event.event_type.endswith(("restock", "availability_change"))
+
+
+def _coalesce(
+    older: InventoryEvent, newer: InventoryEvent
+) -> Optional[InventoryEvent]:
+    """Fold two pending events for one listing into the latest snapshot.
+
+    Returns ``None`` when a restock and an availability change cancel out,
+    so the pair is dropped rather than alerting on a net no-op.
+    """
+    previous = older.previous_snapshot
+    event_type = newer.event_type
+    if previous is not None and _is_flip(older) and _is_flip(newer):
+        if previous.available == newer.snapshot.available:
+            return None
+        if older.event_type.endswith("restock"):
+            event_type = older.event_type
+    elif previous is None or event_type.endswith("price_change"):
+        # A pending restock/new listing is still the headline for the card.
+        event_type = older.event_type
+    delta = None
+    if (
+        previous is not None
+        and event_type.endswith("price_change")
+        and newer.snapshot.price is not None
+        and previous.price is not None
+    ):
+        delta = newer.snapshot.price - previous.price
+    return InventoryEvent(
+        snapshot=newer.snapshot,
+        previous_snapshot=previous,
+        event_type=event_type,
+        delta_price=delta,
+    )
+
+
+class _EventShard(asyncio.Queue):
+    """One shard's queue with the configured overflow policy applied on put."""
+
+    def __init__(
+        self, maxsize: int, *, policy: str, metrics: LatencyRecorder
+    ) -> None:
+        super().__init__(maxsize)
+        self.policy = policy
+        self.metrics = metrics
+        self.dropped = 0
+        self.coalesced = 0
+
+    def _init(self, maxsize: int) -> None:
+        # Keyed storage lets coalesce find a pending listing in O(1); other
+        # policies use a unique counter key so nothing merges.
+        self._queue: OrderedDict[Hashable, InventoryEvent] = OrderedDict()
+        self._serial = 0
+        # Coalesce: events whose put is blocked on a full shard, by listing.
+        # ``None`` marks a parked event that a later one cancelled out.
+        self._waiting: Dict[Hashable, Optional[InventoryEvent]] = {}
+        self._put_cancelled = False
+
+    def _put(self, item: InventoryEvent) -> None:
+        if self.policy == "coalesce":
+            key = _listing_key(item)
+            # A blocked put enqueues whatever its listing was merged into.
+            merged = self._waiting.pop(key, item)
+            if merged is None:
+                self._put_cancelled = True
+                return
+            item = merged
+        else:
+            self._serial += 1
+            key = self._serial
+        self._queue[key] = item
+
+    def _get(self) -> InventoryEvent:
+        return self._queue.popitem(last=False)[1]
+
+    def put_nowait(self, item: InventoryEvent) -> None:
+        if self.policy == "coalesce" and self._merge(item, self._queue):
+            return
+        super().put_nowait(item)
+
+    async def put(self, item: InventoryEvent) -> None:
+        if self.policy == "coalesce" and (
+            self._merge(item, self._queue) or self._merge(item, self._waiting)
+        ):
+            return
+        if self.policy == "drop_oldest" and self.full():
+            self.get_nowait()
+            self.task_done()
+            self.dropped += 1
+            self.put_nowait(item)
+            return
+        if not self.full():
+            self.put_nowait(item)
+            return
+        key = _listing_key(item) if self.policy == "coalesce" else None
+        if key is not None:
+            self._waiting[key] = item
+        started = time.perf_counter()
+        try:
+            await super().put(item)
+        finally:
+            if key is not None:
+                self._waiting.pop(key, None)
+        if self._put_cancelled:
+            # Nothing was enqueued, so undo the count and pass the slot on.
+            self._put_cancelled = False
+            self._release_slot()
+        self.metrics.record("queue.enqueue_wait", time.perf_counter() - started)
+
+    def _merge(
+        self,
+        item: InventoryEvent,
+        pending: Dict[Hashable, Optional[InventoryEvent]],
+    ) -> bool:
+        """Fold ``item`` into the event ``pending`` holds for its listing."""
+        key = _listing_key(item)
+        if key not in pending:
+            return False
+        older = pending[key]
+        if older is None:
+            # The parked event was cancelled out; this one takes its place.
+            pending[key] = item
+            return True
+        merged = _coalesce(older, item)
+        self.coalesced += 1
+        if merged is not None or pending is self._waiting:
+            pending[key] = merged
+        else:
+            del pending[key]
+            self._release_slot()
+        return True
+
+    def _release_slot(self) -> None:
+        self.task_done()
+        self._wakeup_next(self._putters)
+
+
+class ShardedEventQueue:
+    """Routes events to one of N shard queues by ``oracle_id``.
+
+    Each decision worker drains a single shard, so events for the same card
+    are always handled in order while different cards dispatch in parallel.
+    ``capacity`` bounds the total number of pending events (0 is unbounded)
+    and is split evenly across shards. When a shard is full, ``block`` makes
+    the watcher wait, and ``drop_oldest`` discards the oldest pending event.
+    ``coalesce`` keeps one pending event per listing holding the latest
+    snapshot and blocks only when distinct listings fill the shard; a restock
+    and availability change that cancel out are dropped together.
+    """
+
+    def __init__(
+        self,
+        shards: int = 1,
+        *,
+        capacity: int = 0,
+        policy: str = "block",
+        metrics: Optional[LatencyRecorder] = None,
+    ) -> None:
+        if policy not in OVERFLOW_POLICIES:
+            log.warning("Unknown event queue policy %r; using block", policy)
+            policy = "block"
+        count = max(shards, 1)
+        per_shard = math.ceil(capacity / count) if capacity > 0 else 0
+        self.policy = policy
+        self.metrics = metrics or LatencyRecorder()
+        self._shards: List[_EventShard] = [
+            _EventShard(per_shard, policy=policy, metrics=self.metrics)
+            for _ in range(count)
+        ]
+
+    @property
+    def shards(self) -> List[asyncio.Queue[InventoryEvent]]:
+        return list(self._shards)
+
+    @property
+    def dropped(self) -> int:
+        return sum(shard.dropped for shard in self._shards)
+
+    @property
+    def coalesced(self) -> int:
+        return sum(shard.coalesced for shard in self._shards)
+
+    def shard_for(self, oracle_id: str) -> asyncio.Queue[InventoryEvent]:
+        index = zlib.crc32(oracle_id.encode("utf-8")) % len(self._shards)
+        return self._shards[index]
+
+    async def put(self, event: InventoryEvent) -> None:
+        await self.shard_for(event.snapshot.sku.oracle_id).put(event)
+
+    def qsize(self) -> int:
+        return sum(shard.qsize() for shard in self._shards)
+
+
+__all__ = ["OVERFLOW_POLICIES", "ShardedEventQueue"]
@@ -23,9 +23,11 @@ class SetScheduleService:
     async def initialize(self) -> None:
         await self._repository.init()
 
-    async def sync_sets(self, sets: Iterable[MagicSet]) -> None:
-        for magic_set in sets:
-            await self._repository.upsert_set(magic_set)
+    async def sync_sets(self, sets: Iterable[MagicSet]) -> int:
+        return await self._repository.upsert_sets(sets)
+
+    async def release_dates(self) -> List[date]:
+        return await self._repository.release_dates()
 
     async def pending_alerts(self, today: date | None = None) -> List[SetAlert]:
         today = today or date.today()
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import re
 from dataclasses import dataclass
@@ -11,6 +10,7 @@ from typing import Optional
 
 import aiohttp
 
+from mtgbot import codec
 from mtgbot.storage.tcgplayer_cart import (
     CartCredentials,
     TcgplayerCartRepository,
@@ -114,7 +114,7 @@ class TcgplayerCartService:
                         message = f"TCGplayer returned HTTP {resp.status}"
                         extra_summary = None
                         try:
-                            data = json.loads(text)
+                            data = codec.loads(text)
                             errors = data.get("errors") if isinstance(data, dict) else None
                             if errors:
                                 message = ", ".join(
@@ -132,7 +132,7 @@ class TcgplayerCartService:
                                         message += (
                                             f" (Seller has {seller_qty}; you already have {cart_qty} in cart)"
                                         )
-                        except json.JSONDecodeError:
+                        except ValueError:
                             pass
                         log.warning("Add to cart failed (%s): %s", resp.status, text)
                         return CartResult(
@@ -142,8 +142,8 @@ class TcgplayerCartService:
                             summary=extra_summary,
                         )
                     try:
-                        data = json.loads(text)
-                    except json.JSONDecodeError:
+                        data = codec.loads(text)
+                    except ValueError:
                         data = {"raw": text}
             except aiohttp.ClientError as exc:
                 log.exception("TCGplayer cart request failed: %s", exc)
@@ -180,10 +180,13 @@ class TcgplayerCartService:
                 if resp.status != 200:
                     log.warning("Cart summary failed (%s)", resp.status)
                     return None
-                return await resp.json()
+                return await codec.read_json(resp)
         except aiohttp.ClientError as exc:
             log.warning("Cart summary request failed: %s", exc)
             return None
+        except ValueError:
+            log.warning("Cart summary response was not JSON")
+            return None
 
     def _extract_cart_key(self, cookie: str) -> str:
         match = _CART_KEY_PATTERN.search(cookie)
@@ -8,6 +8,7 @@ from typing import List, Optional
 
 import aiohttp
 
+from mtgbot import codec
 from mtgbot.config import VendorSettings
 
 
@@ -100,10 +101,13 @@ class TcgplayerListingsService:
                         text,
                     )
                     return []
-                data = await resp.json()
+                data = await codec.read_json(resp)
         except aiohttp.ClientError as exc:  # pragma: no cover - network failure
             log.warning("Listings request failed: %s", exc)
             return []
+        except ValueError:
+            log.warning("Listings response for product %s was not JSON", product_id)
+            return []
 
         results = data.get("results")
         if not isinstance(results, list):
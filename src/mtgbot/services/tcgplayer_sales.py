@@ -12,6 +12,7 @@ from typing import Iterable, List, Optional
 import aiohttp
 import matplotlib
 
+from mtgbot import codec
 from mtgbot.config import VendorSettings
 from mtgbot.storage.tcgplayer_sales import SaleRecord, TcgplayerSalesRepository
 
@@ -202,7 +203,7 @@ class TcgplayerSalesService:
                             headers.pop("Authorization")
                         continue
                     resp.raise_for_status()
-                    data = await resp.json()
+                    data = await codec.read_json(resp)
             except aiohttp.ClientResponseError as exc:
                 if exc.status == 403:
                     raise TcgSalesError(
@@ -214,6 +215,8 @@ class TcgplayerSalesService:
                 ) from exc
             except aiohttp.ClientError as exc:  # pragma: no cover - network failure
                 raise TcgSalesError("TCGplayer request failed") from exc
+            except ValueError as exc:
+                raise TcgSalesError("TCGplayer returned invalid JSON") from exc
 
             chunk = data.get("data", []) or []
             aggregated.extend(chunk)
@@ -254,10 +257,13 @@ class TcgplayerSalesService:
                     text = await resp.text()
                     log.warning("TCGplayer token request failed: %s", text)
                     return None
-                payload = await resp.json()
+                payload = await codec.read_json(resp)
         except aiohttp.ClientError as exc:  # pragma: no cover - network failure
             log.warning("TCGplayer token request error: %s", exc)
             return None
+        except ValueError:
+            log.warning("TCGplayer token response was not JSON")
+            return None
 
         token = payload.get("access_token")
         expires_in = int(payload.get("expires_in", 1200))
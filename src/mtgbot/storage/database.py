@@ -0,0 +1,115 @@
+"""Process-wide SQLite connection manager shared by all repositories."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+import aiosqlite
+
+from mtgbot.metrics import LatencyRecorder
+
+log = logging.getLogger(__name__)
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+
+class Database:
+    """One writer connection plus a small pool of reader connections.
+
+    Writes are serialized through an ``asyncio.Lock`` and committed when the
+    ``writer()`` block exits cleanly (rolled back otherwise). WAL mode lets the
+    reader pool run alongside the writer without blocking.
+    """
+
+    def __init__(self, sqlite_path: str, *, reader_pool_size: int = 3) -> None:
+        self._sqlite_path = sqlite_path
+        self._reader_pool_size = max(reader_pool_size, 1)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock = asyncio.Lock()
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._all_readers: List[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+        self.metrics = LatencyRecorder()
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def open(self) -> None:
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            if self._sqlite_path != ":memory:":
+                Path(self._sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+            self._writer = await self._connect()
+            for _ in range(self._reader_pool_size):
+                conn = await self._connect()
+                self._all_readers.append(conn)
+                self._readers.put_nowait(conn)
+            log.debug(
+                "Opened SQLite %s with %d readers",
+                self._sqlite_path,
+                self._reader_pool_size,
+            )
+
+    async def close(self) -> None:
+        async with self._open_lock:
+            if self._writer is None:
+                return
+            for conn in self._all_readers:
+                await conn.close()
+            self._all_readers.clear()
+            self._readers = asyncio.Queue()
+            await self._writer.close()
+            self._writer = None
+
+    @asynccontextmanager
+    async def writer(self, name: str) -> AsyncIterator[aiosqlite.Connection]:
+        """Exclusive access to the writer connection inside one transaction."""
+        await self.open()
+        started = time.perf_counter()
+        async with self._writer_lock:
+            conn = self._writer
+            assert conn is not None
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            else:
+                await conn.commit()
+            finally:
+                self.metrics.record(name, time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def reader(self, name: str) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection from the pool."""
+        await self.open()
+        started = time.perf_counter()
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+            self.metrics.record(name, time.perf_counter() - started)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self._sqlite_path)
+        conn.row_factory = aiosqlite.Row
+        for pragma in _PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+
+__all__ = ["Database"]
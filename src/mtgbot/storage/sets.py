@@ -9,6 +9,7 @@ from typing import Iterable, List
 import aiosqlite
 
 from mtgbot.models import MagicSet, SetMilestone
+from mtgbot.storage.database import Database
 
 
 @dataclass(slots=True)
@@ -23,11 +24,11 @@ class SetState:
 
 
 class SetRepository:
-    def __init__(self, sqlite_path: str) -> None:
-        self._sqlite_path = sqlite_path
+    def __init__(self, database: Database) -> None:
+        self._db = database
 
     async def init(self) -> None:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("sets.init") as db:
             await db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS mtg_sets (
@@ -49,49 +50,26 @@ class SetRepository:
                 )
                 """
             )
-            await db.commit()
 
     async def upsert_set(self, magic_set: MagicSet) -> None:
-        async with aiosqlite.connect(self._sqlite_path) as db:
-            await db.execute(
-                """
-                INSERT INTO mtg_sets (
-                    set_id,
-                    code,
-                    name,
-                    set_type,
-                    released_at,
-                    scryfall_uri,
-                    icon_svg_uri,
-                    observed_at,
-                    updated_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(set_id) DO UPDATE SET
-                    code = excluded.code,
-                    name = excluded.name,
-                    set_type = excluded.set_type,
-                    released_at = excluded.released_at,
-                    scryfall_uri = excluded.scryfall_uri,
-                    icon_svg_uri = excluded.icon_svg_uri,
-                    updated_at = CURRENT_TIMESTAMP
-                """,
-                (
-                    magic_set.set_id,
-                    magic_set.code,
-                    magic_set.name,
-                    magic_set.set_type,
-                    _date_to_str(magic_set.released_at),
-                    magic_set.scryfall_uri,
-                    magic_set.icon_svg_uri,
-                    _date_to_str(magic_set.observed_at),
-                ),
-            )
-            await db.commit()
+        await self.upsert_sets([magic_set])
+
+    async def upsert_sets(self, sets: Iterable[MagicSet]) -> int:
+        """Insert or update sets in one transaction; returns rows written.
+
+        Rows whose Scryfall fields are unchanged are skipped by the upsert's
+        WHERE clause so ``updated_at`` only moves when something changed.
+        """
+        rows = [_set_to_params(magic_set) for magic_set in sets]
+        if not rows:
+            return 0
+        async with self._db.writer("sets.upsert_sets") as db:
+            before = db.total_changes
+            await db.executemany(_UPSERT_SET_SQL, rows)
+            return db.total_changes - before
 
     async def list_sets(self) -> List[SetState]:
-        async with aiosqlite.connect(self._sqlite_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader("sets.list_sets") as db:
             cursor = await db.execute(
                 """
                 SELECT
@@ -115,9 +93,21 @@ class SetRepository:
             rows = await cursor.fetchall()
         return [_row_to_state(row) for row in rows]
 
+    async def release_dates(self) -> List[date]:
+        async with self._db.reader("sets.release_dates") as db:
+            cursor = await db.execute(
+                """
+                SELECT DISTINCT released_at
+                FROM mtg_sets
+                WHERE released_at IS NOT NULL
+                """
+            )
+            rows = await cursor.fetchall()
+        return [_str_to_date(row["released_at"]) for row in rows]
+
     async def mark_notified(self, set_id: str, milestone: SetMilestone) -> None:
         column = _milestone_column(milestone)
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("sets.mark_notified") as db:
             await db.execute(
                 f"""
                 UPDATE mtg_sets
@@ -127,7 +117,49 @@ class SetRepository:
                 """,
                 (set_id,),
             )
-            await db.commit()
+
+
+_UPSERT_SET_SQL = """
+    INSERT INTO mtg_sets (
+        set_id,
+        code,
+        name,
+        set_type,
+        released_at,
+        scryfall_uri,
+        icon_svg_uri,
+        observed_at,
+        updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(set_id) DO UPDATE SET
+        code = excluded.code,
+        name = excluded.name,
+        set_type = excluded.set_type,
+        released_at = excluded.released_at,
+        scryfall_uri = excluded.scryfall_uri,
+        icon_svg_uri = excluded.icon_svg_uri,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE code IS NOT excluded.code
+        OR name IS NOT excluded.name
+        OR set_type IS NOT excluded.set_type
+        OR released_at IS NOT excluded.released_at
+        OR scryfall_uri IS NOT excluded.scryfall_uri
+        OR icon_svg_uri IS NOT excluded.icon_svg_uri
+"""
+
+
+def _set_to_params(magic_set: MagicSet) -> tuple:
+    return (
+        magic_set.set_id,
+        magic_set.code,
+        magic_set.name,
+        magic_set.set_type,
+        _date_to_str(magic_set.released_at),
+        magic_set.scryfall_uri,
+        magic_set.icon_svg_uri,
+        _date_to_str(magic_set.observed_at),
+    )
 
 
 def _row_to_state(row: aiosqlite.Row) -> SetState:
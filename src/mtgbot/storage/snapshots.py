@@ -0,0 +1,71 @@
+"""SQLite storage for watcher snapshot caches."""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Tuple
+
+from mtgbot.storage.database import Database
+
+StateRow = Tuple[str, Optional[float], bool]
+
+
+class SnapshotRepository:
+    """Last-seen price and availability per ``(namespace, cache_key)``.
+
+    ``namespace`` names the watcher (``card_kingdom``, ``tcgplayer``...) and
+    ``cache_key`` is that watcher's own diff key, usually the oracle_id.
+    """
+
+    def __init__(self, database: Database) -> None:
+        self._db = database
+
+    async def init(self) -> None:
+        async with self._db.writer("snapshots.init") as db:
+            await db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS watcher_state (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    price REAL,
+                    available INTEGER NOT NULL,
+                    PRIMARY KEY (namespace, cache_key)
+                ) WITHOUT ROWID
+                """
+            )
+
+    async def load(self, namespace: str) -> List[StateRow]:
+        async with self._db.reader("snapshots.load") as db:
+            cursor = await db.execute(
+                """
+                SELECT cache_key, price, available
+                FROM watcher_state
+                WHERE namespace = ?
+                """,
+                (namespace,),
+            )
+            rows = await cursor.fetchall()
+        return [
+            (row["cache_key"], row["price"], bool(row["available"])) for row in rows
+        ]
+
+    async def save(self, namespace: str, rows: Iterable[StateRow]) -> int:
+        params = [
+            (namespace, key, price, int(available)) for key, price, available in rows
+        ]
+        if not params:
+            return 0
+        async with self._db.writer("snapshots.save") as db:
+            await db.executemany(
+                """
+                INSERT INTO watcher_state (namespace, cache_key, price, available)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(namespace, cache_key) DO UPDATE SET
+                    price = excluded.price,
+                    available = excluded.available
+                """,
+                params,
+            )
+        return len(params)
+
+
+__all__ = ["SnapshotRepository", "StateRow"]
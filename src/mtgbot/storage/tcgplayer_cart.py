@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-import aiosqlite
+from mtgbot.storage.database import Database
 
 
 @dataclass(slots=True)
@@ -18,11 +18,11 @@ class CartCredentials:
 
 
 class TcgplayerCartRepository:
-    def __init__(self, sqlite_path: str) -> None:
-        self._sqlite_path = sqlite_path
+    def __init__(self, database: Database) -> None:
+        self._db = database
 
     async def init(self) -> None:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("tcg_cart.init") as db:
             await db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tcg_cart_credentials (
@@ -33,12 +33,11 @@ class TcgplayerCartRepository:
                 )
                 """
             )
-            await db.commit()
 
     async def upsert_credentials(
         self, discord_user_id: int, cookie: str, cart_key: str
     ) -> None:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("tcg_cart.upsert_credentials") as db:
             await db.execute(
                 """
                 INSERT INTO tcg_cart_credentials (discord_user_id, cookie, cart_key)
@@ -50,22 +49,19 @@ class TcgplayerCartRepository:
                 """,
                 (discord_user_id, cookie, cart_key),
             )
-            await db.commit()
 
     async def remove_credentials(self, discord_user_id: int) -> bool:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("tcg_cart.remove_credentials") as db:
             cursor = await db.execute(
                 "DELETE FROM tcg_cart_credentials WHERE discord_user_id = ?",
                 (discord_user_id,),
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     async def fetch_credentials(
         self, discord_user_id: int
     ) -> Optional[CartCredentials]:
-        async with aiosqlite.connect(self._sqlite_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader("tcg_cart.fetch_credentials") as db:
             cursor = await db.execute(
                 """
                 SELECT discord_user_id, cookie, cart_key, updated_at
@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Iterable, List
 
-import aiosqlite
+from mtgbot.storage.database import Database
 
 
 @dataclass(slots=True)
@@ -19,11 +19,11 @@ class SaleRecord:
 
 
 class TcgplayerSalesRepository:
-    def __init__(self, sqlite_path: str) -> None:
-        self._sqlite_path = sqlite_path
+    def __init__(self, database: Database) -> None:
+        self._db = database
 
     async def init(self) -> None:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("tcg_sales.init") as db:
             await db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tcg_sales (
@@ -38,10 +38,9 @@ class TcgplayerSalesRepository:
                 )
                 """
             )
-            await db.commit()
 
     async def upsert_sales(self, records: Iterable[SaleRecord]) -> None:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("tcg_sales.upsert_sales") as db:
             await db.executemany(
                 """
                 INSERT OR IGNORE INTO tcg_sales (
@@ -63,7 +62,6 @@ class TcgplayerSalesRepository:
                     for record in records
                 ],
             )
-            await db.commit()
 
     async def list_sales(
         self,
@@ -83,8 +81,7 @@ class TcgplayerSalesRepository:
             query += " LIMIT ?"
             params.append(limit)
 
-        async with aiosqlite.connect(self._sqlite_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._db.reader("tcg_sales.list_sales") as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
 
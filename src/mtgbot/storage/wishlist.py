@@ -3,16 +3,12 @@
 from __future__ import annotations
 
 import json
-from pathlib import Path
 from typing import Iterable, List, Optional
 
 import aiosqlite
 
 from mtgbot.models import ActionType, CardSku, RoleMapping, WishlistEntry, Vendor
-
-
-def _ensure_directory(sqlite_path: str) -> None:
-    Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+from mtgbot.storage.database import Database
 
 
 def _encode_tags(tags: Iterable[str]) -> str:
@@ -54,12 +50,11 @@ def _decode_vendors(raw: Optional[str]) -> List[Vendor]:
 class WishlistRepository:
     """Persistence layer for wishlist entries."""
 
-    def __init__(self, sqlite_path: str) -> None:
-        self._sqlite_path = sqlite_path
+    def __init__(self, database: Database) -> None:
+        self._db = database
 
     async def init(self) -> None:
-        _ensure_directory(self._sqlite_path)
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("wishlist.init") as db:
             await db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS wishlist_entries (
@@ -78,11 +73,10 @@ class WishlistRepository:
                 )
                 """
             )
-            await db.commit()
 
     async def upsert_entry(self, entry: WishlistEntry) -> None:
         sku = entry.sku
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("wishlist.upsert_entry") as db:
             await db.execute(
                 """
                 INSERT INTO wishlist_entries (
@@ -124,10 +118,9 @@ class WishlistRepository:
                     _encode_vendors(entry.preferred_vendors),
                 ),
             )
-            await db.commit()
 
     async def remove_entry(self, discord_user_id: int, oracle_id: str) -> bool:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("wishlist.remove_entry") as db:
             cursor = await db.execute(
                 """
                 DELETE FROM wishlist_entries
@@ -135,11 +128,10 @@ class WishlistRepository:
                 """,
                 (discord_user_id, oracle_id),
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     async def list_entries_for_user(self, discord_user_id: int) -> List[WishlistEntry]:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.reader("wishlist.list_entries_for_user") as db:
             cursor = await db.execute(
                 """
                 SELECT discord_user_id,
@@ -163,7 +155,7 @@ class WishlistRepository:
         return [_row_to_entry(row) for row in rows]
 
     async def list_all_entries(self) -> List[WishlistEntry]:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.reader("wishlist.list_all_entries") as db:
             cursor = await db.execute(
                 """
                 SELECT discord_user_id,
@@ -187,12 +179,11 @@ class WishlistRepository:
 class RoleMappingRepository:
     """Persistence for tag -> Discord role ID mappings."""
 
-    def __init__(self, sqlite_path: str) -> None:
-        self._sqlite_path = sqlite_path
+    def __init__(self, database: Database) -> None:
+        self._db = database
 
     async def init(self) -> None:
-        _ensure_directory(self._sqlite_path)
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("role_mappings.init") as db:
             await db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS role_mappings (
@@ -201,10 +192,9 @@ class RoleMappingRepository:
                 )
                 """
             )
-            await db.commit()
 
     async def upsert_mapping(self, mapping: RoleMapping) -> None:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("role_mappings.upsert_mapping") as db:
             await db.execute(
                 """
                 INSERT INTO role_mappings (tag, role_id)
@@ -214,18 +204,16 @@ class RoleMappingRepository:
                 """,
                 (mapping.tag, mapping.role_id),
             )
-            await db.commit()
 
     async def remove_mapping(self, tag: str) -> bool:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.writer("role_mappings.remove_mapping") as db:
             cursor = await db.execute(
                 "DELETE FROM role_mappings WHERE tag = ?", (tag,)
             )
-            await db.commit()
             return cursor.rowcount > 0
 
     async def list_mappings(self) -> List[RoleMapping]:
-        async with aiosqlite.connect(self._sqlite_path) as db:
+        async with self._db.reader("role_mappings.list_mappings") as db:
             cursor = await db.execute(
                 "SELECT tag, role_id FROM role_mappings ORDER BY tag"
             )
@@ -3,24 +3,42 @@
 Usage:
     poetry run python -m mtgbot.tools.gamers_guild_feed --once
     poetry run python -m mtgbot.tools.gamers_guild_feed --serve --port 8081
+
+The server answers ``GET /feed`` with the full feed (pre-serialized and
+pre-compressed once per refresh, with ETag/Last-Modified revalidation) and
+``GET /feed?since=<version>`` with only the products changed since that
+feed version.
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import gzip
+import hashlib
 import json
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
 from aiohttp import web
 
+from mtgbot import codec
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
 log = logging.getLogger(__name__)
 
 BASE_URL = "https://gamersguildaz.com"
 COLLECTION_PATH = "/collections/new-arrivals/products.json"
+PAGE_LIMIT = 250
+DELTA_COMPRESS_MIN_BYTES = 1024
 
 
 @dataclass(slots=True)
@@ -45,28 +63,89 @@ class Product:
         }
 
 
-async def fetch_products(session: aiohttp.ClientSession) -> List[Product]:
+# Shopify product id -> (updated_at, normalized product or None if skipped).
+NormalizedCache = Dict[str, Tuple[Optional[str], Optional[Product]]]
+
+
+async def fetch_products(
+    session: aiohttp.ClientSession,
+    *,
+    concurrency: int = 4,
+    normalized: Optional[NormalizedCache] = None,
+    base_url: str = BASE_URL,
+) -> List[Product]:
+    """Fetch every collection page, ``concurrency`` pages at a time.
+
+    Pages are requested speculatively in windows and consumed in order; the
+    crawl ends at the first short, empty or failed page and cancels any
+    later pages still in flight. With a ``normalized`` cache carried across
+    calls, products whose ``updated_at`` has not changed are reused instead
+    of normalized again; the cache is pruned to the products seen.
+    """
+    concurrency = max(concurrency, 1)
+    cache: NormalizedCache = {} if normalized is None else normalized
+    seen: NormalizedCache = {}
     products: List[Product] = []
     page = 1
-    while True:
-        params = {"page": page, "limit": 250}
-        url = f"{BASE_URL}{COLLECTION_PATH}"
-        async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as resp:
-            if resp.status != 200:
-                log.warning("Gamers Guild feed returned HTTP %s", resp.status)
-                break
-            payload = await resp.json()
-        raw_products: List[Dict[str, Any]] = payload.get("products", [])
-        if not raw_products:
-            break
-        for raw in raw_products:
-            product = _normalize_product(raw)
-            if product:
-                products.append(product)
-        page += 1
+    done = False
+    while not done:
+        window = [
+            asyncio.ensure_future(_fetch_page(session, base_url, number))
+            for number in range(page, page + concurrency)
+        ]
+        page += concurrency
+        try:
+            for fetch in window:
+                raw_products = await fetch
+                if raw_products is None:
+                    done = True
+                    break
+                for raw in raw_products:
+                    product = _reuse_or_normalize(raw, cache, seen)
+                    if product:
+                        products.append(product)
+                if len(raw_products) < PAGE_LIMIT:
+                    done = True
+                    break
+        finally:
+            for fetch in window:
+                fetch.cancel()
+            # Collect cancelled/failed speculative pages so none go unretrieved.
+            await asyncio.gather(*window, return_exceptions=True)
+    if normalized is not None:
+        normalized.clear()
+        normalized.update(seen)
     return products
 
 
+async def _fetch_page(
+    session: aiohttp.ClientSession, base_url: str, page: int
+) -> Optional[List[Dict[str, Any]]]:
+    params = {"page": page, "limit": PAGE_LIMIT}
+    url = f"{base_url}{COLLECTION_PATH}"
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with session.get(url, params=params, timeout=timeout) as resp:
+        if resp.status != 200:
+            log.warning("Gamers Guild feed returned HTTP %s", resp.status)
+            return None
+        payload = await codec.read_json(resp)
+    return payload.get("products", [])
+
+
+def _reuse_or_normalize(
+    raw: Dict[str, Any], cache: NormalizedCache, seen: NormalizedCache
+) -> Optional[Product]:
+    key = str(raw.get("id"))
+    updated_at = raw.get("updated_at")
+    cached = cache.get(key)
+    if cached is not None and updated_at is not None and cached[0] == updated_at:
+        product = cached[1]
+    else:
+        product = _normalize_product(raw)
+    seen[key] = (updated_at, product)
+    return product
+
+
 def _normalize_product(raw: Dict[str, Any]) -> Optional[Product]:
     title = raw.get("title") or ""
     tags = [tag.strip() for tag in (raw.get("tags") or "").split(",") if tag.strip()]
@@ -107,6 +186,194 @@ def build_payload(products: List[Product]) -> Dict[str, Any]:
     }
 
 
+class FeedCache:
+    """The served feed, serialized and compressed once per change.
+
+    Every refresh that changes any product bumps ``version``; each product
+    remembers the version it last changed in, and removals are remembered
+    for ``history`` versions, which is what ``delta`` serves from. Refreshes
+    that change nothing keep the existing bytes, ETag and Last-Modified.
+    """
+
+    def __init__(self, *, history: int = 100) -> None:
+        self.history = max(history, 1)
+        self.version = 0
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.etag = ""
+        self.bodies: Dict[str, bytes] = {}
+        self._products: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._removed: Dict[str, int] = {}
+        self.update([])
+
+    def update(self, products: List[Product]) -> bool:
+        """Swap in a fresh product list; returns True when anything changed."""
+        version = self.version + 1
+        current: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        changed = self.version == 0
+        for product in products:
+            data = product.to_dict()
+            previous = self._products.get(product.product_id)
+            if previous is not None and previous[1] == data:
+                current[product.product_id] = previous
+            else:
+                current[product.product_id] = (version, data)
+                changed = True
+        removed = self._products.keys() - current.keys()
+        if not changed and not removed:
+            return False
+        for product_id in removed:
+            self._removed[product_id] = version
+        for product_id in current.keys() & self._removed.keys():
+            del self._removed[product_id]
+        self._removed = {
+            product_id: removed_in
+            for product_id, removed_in in self._removed.items()
+            if removed_in > version - self.history
+        }
+        self._products = current
+        self.version = version
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self._encode()
+        return True
+
+    def delta(self, since: int) -> Dict[str, Any]:
+        """Products changed and ids removed after ``since``.
+
+        Clients further behind than ``history``, or ahead of ``version``
+        (they saw a previous server process), get the full product list,
+        flagged with ``"full": true``.
+        """
+        full = since < self.version - self.history or since > self.version
+        removed: List[str] = []
+        if not full:
+            removed = [
+                product_id
+                for product_id, removed_in in self._removed.items()
+                if removed_in > since
+            ]
+        payload = self._header()
+        payload.update(
+            since=since,
+            full=full,
+            products=[
+                data
+                for changed_in, data in self._products.values()
+                if full or changed_in > since
+            ],
+            removed=removed,
+        )
+        return payload
+
+    def _header(self) -> Dict[str, Any]:
+        return {
+            "store": "Gamers Guild AZ",
+            "source": f"{BASE_URL}{COLLECTION_PATH}",
+            "contact_url": f"{BASE_URL}/pages/contact-us",
+            "version": self.version,
+        }
+
+    def _encode(self) -> None:
+        payload = self._header()
+        payload["products"] = [data for _, data in self._products.values()]
+        body = codec.dumps(payload)
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.bodies = _compressed_variants(body)
+
+
+def _compressed_variants(body: bytes) -> Dict[str, bytes]:
+    bodies = {"identity": body, "gzip": gzip.compress(body, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body)
+    return bodies
+
+
+def _pick_encoding(request: web.Request, available: Dict[str, bytes]) -> str:
+    accepted = {
+        token.split(";", 1)[0].strip().lower()
+        for token in request.headers.get("Accept-Encoding", "").split(",")
+        if token.strip() and not token.strip().endswith(";q=0")
+    }
+    for encoding in ("br", "gzip"):
+        if encoding in available and encoding in accepted:
+            return encoding
+    return "identity"
+
+
+def _variant_etag(etag: str, encoding: str) -> str:
+    # Strong ETags must differ per content-coding.
+    return etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    variants = {
+        _variant_etag(etag, encoding) for encoding in ("identity", "gzip", "br")
+    }
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate in variants:
+            return True
+    return False
+
+
+def _not_modified(request: web.Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _feed_response(
+    request: web.Request,
+    bodies: Dict[str, bytes],
+    etag: str,
+    last_modified: datetime,
+    version: int,
+) -> web.Response:
+    encoding = _pick_encoding(request, bodies)
+    headers = {
+        "ETag": _variant_etag(etag, encoding),
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Feed-Version": str(version),
+    }
+    if _not_modified(request, etag, last_modified):
+        return web.Response(status=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return web.Response(
+        body=bodies[encoding], content_type="application/json", headers=headers
+    )
+
+
+def _delta_response(
+    request: web.Request, cache: FeedCache, since: int
+) -> web.Response:
+    body = codec.dumps(cache.delta(since))
+    bodies = (
+        _compressed_variants(body)
+        if len(body) >= DELTA_COMPRESS_MIN_BYTES
+        else {"identity": body}
+    )
+    return _feed_response(
+        request,
+        bodies,
+        # The content hash ties the delta to this exact feed; the version
+        # keeps deltas apart across restarts that rebuild the same feed.
+        f'{cache.etag[:-1]}-v{cache.version}-since-{since}"',
+        cache.last_modified,
+        cache.version,
+    )
+
+
 async def run_once() -> None:
     async with aiohttp.ClientSession() as session:
         products = await fetch_products(session)
@@ -114,22 +381,41 @@ async def run_once() -> None:
     print(json.dumps(payload, indent=2))
 
 
-async def serve(host: str, port: int, interval: int) -> None:
-    cache: Dict[str, Any] = {"payload": build_payload([])}
+async def serve(
+    host: str, port: int, interval: int, *, page_concurrency: int = 4
+) -> None:
+    cache = FeedCache()
+    normalized: NormalizedCache = {}
 
     async def refresh_loop() -> None:
         async with aiohttp.ClientSession() as session:
             while True:
                 try:
-                    products = await fetch_products(session)
-                    cache["payload"] = build_payload(products)
-                    log.info("Fetched %d Gamers Guild products", len(products))
+                    products = await fetch_products(
+                        session, concurrency=page_concurrency, normalized=normalized
+                    )
+                    changed = cache.update(products)
+                    log.info(
+                        "Fetched %d Gamers Guild products (feed version %d%s)",
+                        len(products),
+                        cache.version,
+                        "" if changed else ", unchanged",
+                    )
                 except Exception as exc:  # noqa: BLE001
                     log.exception("Failed to refresh Gamers Guild feed: %s", exc)
                 await asyncio.sleep(max(interval, 60))
 
     async def handle(request: web.Request) -> web.Response:
-        return web.json_response(cache["payload"])
+        since = request.query.get("since")
+        if since is None:
+            return _feed_response(
+                request, cache.bodies, cache.etag, cache.last_modified, cache.version
+            )
+        try:
+            since_version = int(since)
+        except ValueError:
+            raise web.HTTPBadRequest(text="since must be a feed version number")
+        return _delta_response(request, cache, since_version)
 
     app = web.Application()
     app.router.add_get("/", handle)
@@ -167,6 +453,12 @@ def parse_args() -> argparse.Namespace:
         default=900,
         help="Refresh interval in seconds when serving (default 900)",
     )
+    parser.add_argument(
+        "--page-concurrency",
+        type=int,
+        default=4,
+        help="Collection pages fetched at once (default 4)",
+    )
     return parser.parse_args()
 
 
@@ -177,7 +469,14 @@ def main() -> None:
         asyncio.run(run_once())
         return
     if args.serve:
-        asyncio.run(serve(args.host, args.port, args.interval))
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                args.interval,
+                page_concurrency=args.page_concurrency,
+            )
+        )
         return
     print("Specify --once or --serve", flush=True)
 
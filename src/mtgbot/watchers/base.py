@@ -3,9 +3,15 @@
 from __future__ import annotations
 
 import abc
-from typing import AsyncIterator, Optional
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, List, Optional
 
-from mtgbot.models import InventoryEvent, Vendor
+from mtgbot.models import InventoryEvent, ListingSnapshot, Vendor
+from mtgbot.storage.snapshots import SnapshotRepository
+from mtgbot.watchers.snapshot_cache import SnapshotCache
+
+InterestFn = Callable[[str], bool]
+DemandFn = Callable[[str], float]
 
 
 class Watcher(abc.ABC):
@@ -13,14 +19,52 @@ class Watcher(abc.ABC):
 
     poll_interval: float = 60.0
     vendor: Vendor
+    interest: Optional[InterestFn] = None
 
     def __init__(self, vendor: Vendor):
         self.vendor = vendor
+        self.filtered_events = 0
+        self.changed_last_cycle = False
+
+    def set_interest(self, interest: Optional[InterestFn]) -> None:
+        """Only emit events for oracle_ids where ``interest`` returns True.
+
+        Snapshots for other cards are still diffed and cached, so a card that
+        becomes watched later starts from an up-to-date baseline.
+        """
+        self.interest = interest
+
+    def set_demand(
+        self,
+        demand: Optional[DemandFn],
+        *,
+        pace: Optional[Callable[[], float]] = None,
+    ) -> None:
+        """Feed per-oracle_id wishlist demand to watchers that schedule items.
+
+        ``pace`` scales item intervals (below 1.0 polls faster). Watchers that
+        fetch everything every cycle ignore both.
+        """
+
+    def next_poll_hint(self) -> Optional[float]:
+        """Seconds until this watcher next has work, when it knows better."""
+        return None
+
+    def _wants(self, snapshot: ListingSnapshot) -> bool:
+        if self.interest is None or self.interest(snapshot.sku.oracle_id):
+            return True
+        self.filtered_events += 1
+        return False
 
     @abc.abstractmethod
     async def poll(self) -> Optional[InventoryEvent]:
         """Return the next interesting event or None when idle."""
 
+    async def poll_batch(self) -> List[InventoryEvent]:
+        """Return every event available from one poll cycle."""
+        event = await self.poll()
+        return [event] if event is not None else []
+
     async def stream(self) -> AsyncIterator[InventoryEvent]:
         """Continuous stream of inventory events."""
         while True:
@@ -28,3 +72,50 @@ class Watcher(abc.ABC):
             if event is None:
                 return
             yield event
+
+
+class BufferedWatcher(Watcher):
+    """Watcher that diffs a whole fetch cycle into a pending event buffer."""
+
+    def __init__(self, vendor: Vendor):
+        super().__init__(vendor)
+        self._pending: Deque[InventoryEvent] = deque()
+        self._snapshot_caches: List[SnapshotCache] = []
+
+    def _snapshot_cache_for(
+        self, namespace: str, repository: Optional[SnapshotRepository]
+    ) -> SnapshotCache:
+        """Create a diff cache that is loaded and flushed around each cycle."""
+        cache = SnapshotCache(namespace, repository)
+        self._snapshot_caches.append(cache)
+        return cache
+
+    @abc.abstractmethod
+    async def _collect(self) -> List[InventoryEvent]:
+        """Fetch and diff one cycle, returning the new events."""
+
+    async def _collect_cycle(self) -> List[InventoryEvent]:
+        for cache in self._snapshot_caches:
+            await cache.load()
+        before = sum(cache.changes for cache in self._snapshot_caches)
+        try:
+            return await self._collect()
+        finally:
+            after = sum(cache.changes for cache in self._snapshot_caches)
+            self.changed_last_cycle = after != before
+            for cache in self._snapshot_caches:
+                await cache.flush()
+
+    async def poll(self) -> Optional[InventoryEvent]:
+        if not self._pending:
+            self._pending.extend(await self._collect_cycle())
+        if self._pending:
+            return self._pending.popleft()
+        return None
+
+    async def poll_batch(self) -> List[InventoryEvent]:
+        if not self._pending:
+            return await self._collect_cycle()
+        events = list(self._pending)
+        self._pending.clear()
+        return events
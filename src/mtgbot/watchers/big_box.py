@@ -2,48 +2,93 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from collections import deque
 from datetime import datetime, timezone
-from typing import Deque, Dict, Iterable, List, Optional
+from typing import Callable, Iterable, List, Optional
 
 import aiohttp
 
 from mtgbot.models import CardSku, InventoryEvent, ListingSnapshot, Vendor
-from mtgbot.watchers.base import Watcher
+from mtgbot.storage.snapshots import SnapshotRepository
+from mtgbot.watchers.base import BufferedWatcher, DemandFn
+from mtgbot.watchers.diff import EventNames, PriceThresholds, SnapshotDiffer
+from mtgbot.watchers.conditional import ConditionalFetcher
+from mtgbot.watchers.executor import ParseExecutor
+from mtgbot.watchers.limits import FetchLimiter
+from mtgbot.watchers.scheduling import ItemScheduler
 
 log = logging.getLogger(__name__)
 
 
-class BigBoxWatcher(Watcher):
+class BigBoxWatcher(BufferedWatcher):
     """Poll configured big-box product pages (Amazon, Target, etc.)."""
 
     def __init__(
-        self, session: aiohttp.ClientSession, product_urls: Iterable[str]
+        self,
+        session: aiohttp.ClientSession,
+        product_urls: Iterable[str],
+        *,
+        limiter: Optional[FetchLimiter] = None,
+        executor: Optional[ParseExecutor] = None,
+        snapshot_store: Optional[SnapshotRepository] = None,
+        thresholds: Optional[PriceThresholds] = None,
     ) -> None:
         super().__init__(Vendor.AMAZON)
         self._session = session
+        self._http = ConditionalFetcher(session)
         self._urls = [url for url in product_urls if url]
+        self._limiter = limiter or FetchLimiter()
+        self._executor = executor or ParseExecutor()
         self.poll_interval = 420.0
-        self._pending: Deque[InventoryEvent] = deque()
-        self._cache: Dict[str, ListingSnapshot] = {}
+        # Wishlists name oracle ids, never these URLs, so demand is always 0
+        # here; configured pages should not get the unwatched-item penalty.
+        self._schedule = ItemScheduler(self._urls, self.poll_interval, idle_factor=1.0)
+        self._cache = self._snapshot_cache_for("big_box", snapshot_store)
+        self._differ = SnapshotDiffer(
+            self._cache,
+            EventNames.prefixed("big_box"),
+            key=lambda snapshot: snapshot.url,
+            wants=self._wants,
+            thresholds=thresholds,
+        )
 
-    async def poll(self) -> Optional[InventoryEvent]:
-        if self._pending:
-            return self._pending.popleft()
+    def set_demand(
+        self,
+        demand: Optional[DemandFn],
+        *,
+        pace: Optional[Callable[[], float]] = None,
+    ) -> None:
+        self._schedule.demand = demand
+        self._schedule.pace = pace
 
-        for url in self._urls:
-            html = await self._fetch_page(url)
-            if not html:
-                continue
-            snapshot = self._snapshot_from_html(url, html)
-            events = self._diff_snapshot(snapshot)
-            self._pending.extend(events)
+    def next_poll_hint(self) -> Optional[float]:
+        return self._schedule.next_due_in()
 
-        if self._pending:
-            return self._pending.popleft()
-        return None
+    async def _collect(self) -> List[InventoryEvent]:
+        urls = self._schedule.take_due()
+        if not urls:
+            return []
+        before = {url: self._cache.get(url) for url in urls}
+        try:
+            pages = await self._limiter.gather(
+                urls, self._fetch_page, url=lambda url: url
+            )
+            fetched = [(url, html) for url, html in zip(urls, pages) if html]
+            snapshots = await asyncio.gather(
+                *(
+                    self._executor.run("parse.big_box", _snapshot_from_html, url, html)
+                    for url, html in fetched
+                )
+            )
+            events = self._differ.diff(snapshots)
+            for url, _ in fetched:
+                self._http.commit(url)
+            return events
+        finally:
+            for url in urls:
+                self._schedule.record(url, changed=self._cache.get(url) != before[url])
 
     async def _fetch_page(self, url: str) -> Optional[str]:
         headers = {
@@ -54,74 +99,37 @@ class BigBoxWatcher(Watcher):
             ),
         }
         try:
-            async with self._session.get(url, headers=headers) as resp:
-                if resp.status != 200:
-                    log.debug("Big-box url %s returned %s", url, resp.status)
-                    return None
-                return await resp.text()
+            resp = await self._http.get(url, headers=headers)
         except aiohttp.ClientError as exc:
             log.debug("Big-box fetch failed for %s: %s", url, exc)
             return None
-
-    def _snapshot_from_html(self, url: str, html: str) -> ListingSnapshot:
-        vendor = _vendor_from_url(url)
-        title = _extract_title(html) or f"{vendor.value.title()} listing"
-        price = _extract_price(html)
-        available = _is_in_stock(html)
-
-        return ListingSnapshot(
-            vendor=vendor,
-            sku=CardSku(
-                oracle_id=url,
-                product_code=url,
-                finish="any",
-            ),
-            title=title,
-            url=url,
-            price=price,
-            currency="USD",
-            available=available,
-            observed_at=datetime.now(timezone.utc),
-            metadata={"source": "big_box"},
-        )
-
-    def _diff_snapshot(self, snapshot: ListingSnapshot) -> List[InventoryEvent]:
-        key = snapshot.url
-        previous = self._cache.get(key)
-        events: List[InventoryEvent] = []
-
-        if previous is None:
-            events.append(
-                InventoryEvent(
-                    snapshot=snapshot,
-                    previous_snapshot=None,
-                    event_type="big_box_listing",
-                    delta_price=None,
-                )
-            )
-        else:
-            event_type = None
-            delta_price: Optional[float] = None
-            if snapshot.available and not previous.available:
-                event_type = "big_box_restock"
-            elif snapshot.available != previous.available:
-                event_type = "big_box_availability_change"
-            elif abs(snapshot.price - previous.price) >= 0.01:
-                event_type = "big_box_price_change"
-                delta_price = snapshot.price - previous.price
-
-            if event_type:
-                events.append(
-                    InventoryEvent(
-                        snapshot=snapshot,
-                        previous_snapshot=previous,
-                        event_type=event_type,
-                        delta_price=delta_price,
-                    )
-                )
-
-        self._cache[key] = snapshot
-        return events
+        if resp.status != 200 and not resp.not_modified:
+            log.debug("Big-box url %s returned %s", url, resp.status)
+        return resp.text
+
+
+def _snapshot_from_html(url: str, html: str) -> ListingSnapshot:
+    """Extract a snapshot from a product page; runs on the parse executor."""
+    vendor = _vendor_from_url(url)
+    title = _extract_title(html) or f"{vendor.value.title()} listing"
+    price = _extract_price(html)
+    available = _is_in_stock(html)
+
+    return ListingSnapshot(
+        vendor=vendor,
+        sku=CardSku(
+            oracle_id=url,
+            product_code=url,
+            finish="any",
+        ),
+        title=title,
+        url=url,
+        price=price,
+        currency="USD",
+        available=available,
+        observed_at=datetime.now(timezone.utc),
+        metadata={"source": "big_box"},
+    )
 
 
 def _vendor_from_url(url: str) -> Vendor:
@@ -2,176 +2,209 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from collections import deque
 from datetime import datetime, timezone
-from typing import Deque, Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
-from bs4 import BeautifulSoup
 
 from mtgbot.models import CardSku, InventoryEvent, ListingSnapshot, Vendor
-from mtgbot.watchers.base import Watcher
+from mtgbot.storage.snapshots import SnapshotRepository
+from mtgbot.watchers.base import BufferedWatcher
+from mtgbot.watchers.diff import EventNames, PriceThresholds, SnapshotDiffer
+from mtgbot.watchers.card_kingdom_parsers import (
+    ParseFn,
+    ProductNode,
+    resolve_backend,
+)
+from mtgbot.watchers.executor import ParseExecutor
+from mtgbot.watchers.conditional import ConditionalFetcher, ConditionalResponse
 
 log = logging.getLogger(__name__)
 
 
-class CardKingdomWatcher(Watcher):
-    """Polls Card Kingdom preorder listings for availability changes."""
+class CardKingdomWatcher(BufferedWatcher):
+    """Polls Card Kingdom preorder listings for availability changes.
+
+    Preorder pages are fetched ``page_concurrency`` at a time and each page
+    is parsed and diffed as soon as it arrives. The crawl stops after the
+    window that hits the end of the catalog (an empty or non-200 page) or a
+    page whose body is unchanged since the last cycle; every
+    ``FULL_SWEEP_CYCLES`` cycles it keeps going past unchanged pages so
+    changes deeper in the catalog are still picked up.
+    """
 
     BASE_URL = "https://www.cardkingdom.com"
     PREORDER_PATH = "/catalog/preorder"
-
-    def __init__(self, session: aiohttp.ClientSession) -> None:
+    FULL_SWEEP_CYCLES = 10
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        parser: str = "auto",
+        executor: Optional[ParseExecutor] = None,
+        snapshot_store: Optional[SnapshotRepository] = None,
+        thresholds: Optional[PriceThresholds] = None,
+        max_pages: int = 20,
+        page_concurrency: int = 4,
+    ) -> None:
         super().__init__(Vendor.CARD_KINGDOM)
         self._session = session
+        self.parser_name, self._parse_nodes = resolve_backend(parser)
+        self._executor = executor or ParseExecutor()
+        self._http = ConditionalFetcher(session)
+        self._max_pages = max(max_pages, 1)
+        self._page_concurrency = max(page_concurrency, 1)
+        self._cycles = 0
         self.poll_interval = 180.0
-        self._pending_events: Deque[InventoryEvent] = deque()
-        self._snapshot_cache: Dict[str, ListingSnapshot] = {}
-
-    async def poll(self) -> Optional[InventoryEvent]:
-        if self._pending_events:
-            return self._pending_events.popleft()
-
-        html = await self._fetch_preorders()
-        if html is None:
-            return None
-
-        snapshots = self._parse_listings(html)
-        events = self._diff_snapshots(snapshots)
-        self._pending_events.extend(events)
+        self._snapshot_cache = self._snapshot_cache_for("card_kingdom", snapshot_store)
+        self._differ = SnapshotDiffer(
+            self._snapshot_cache,
+            EventNames("new_listing", "restock", "availability_change", "price_change"),
+            key=lambda snapshot: snapshot.sku.oracle_id,
+            wants=self._wants,
+            thresholds=thresholds,
+        )
 
-        if self._pending_events:
-            return self._pending_events.popleft()
-        return None
+    async def _collect(self) -> List[InventoryEvent]:
+        full_sweep = self._cycles % self.FULL_SWEEP_CYCLES == 0
+        self._cycles += 1
+        events: List[InventoryEvent] = []
+        page = 1
+        done = False
+        while not done and page <= self._max_pages:
+            window = range(
+                page, min(page + self._page_concurrency, self._max_pages + 1)
+            )
+            page = window.stop
+            fetches = [asyncio.ensure_future(self._fetch_page(n)) for n in window]
+            try:
+                for fetch in asyncio.as_completed(fetches):
+                    try:
+                        fetched_page, resp = await fetch
+                        if resp is None or (
+                            resp.status != 200 and not resp.not_modified
+                        ):
+                            done = True
+                            continue
+                        if resp.not_modified:
+                            done = done or not full_sweep
+                            continue
+                        snapshots = await self._executor.run(
+                            "parse.card_kingdom",
+                            _parse_listings,
+                            resp.text,
+                            self._parse_nodes,
+                        )
+                    except Exception as exc:
+                        # Keep the events already diffed from this window;
+                        # the failed page stays uncommitted and is refetched.
+                        log.warning("Card Kingdom page failed: %s", exc)
+                        done = True
+                        continue
+                    if snapshots:
+                        events.extend(self._differ.diff(snapshots))
+                    else:
+                        done = True
+                    self._http.commit(self._page_url(fetched_page))
+            finally:
+                for fetch in fetches:
+                    fetch.cancel()
+        log.debug(
+            "Card Kingdom crawl stopped before page %d (full_sweep=%s)",
+            page,
+            full_sweep,
+        )
+        return events
 
-    async def _fetch_preorders(self) -> Optional[str]:
+    def _page_url(self, page: int) -> str:
         url = f"{self.BASE_URL}{self.PREORDER_PATH}"
+        return url if page == 1 else f"{url}?page={page}"
+
+    async def _fetch_page(
+        self, page: int
+    ) -> Tuple[int, Optional[ConditionalResponse]]:
+        url = self._page_url(page)
         try:
-            async with self._session.get(url, headers=_DEFAULT_HEADERS()) as resp:
-                if resp.status != 200:
-                    log.warning(
-                        "Card Kingdom returned HTTP %s for %s", resp.status, url
-                    )
-                    return None
-                return await resp.text()
+            resp = await self._http.get(url, headers=_DEFAULT_HEADERS())
         except aiohttp.ClientError as exc:
-            log.warning("Card Kingdom fetch failed: %s", exc)
-            return None
-
-    def _parse_listings(self, html: str) -> List[ListingSnapshot]:
-        soup = BeautifulSoup(html, "html.parser")
-        nodes = soup.select("[data-product-id]")
-        snapshots: List[ListingSnapshot] = []
-        if not nodes:
-            log.debug("Card Kingdom preorder markup missing product nodes")
-        for node in nodes:
-            try:
-                snapshot = self._snapshot_from_node(node)
-            except Exception as exc:  # pragma: no cover - defensive
-                log.debug("Failed to parse preorder node: %s", exc)
-                continue
-            snapshots.append(snapshot)
-        return snapshots
-
-    def _snapshot_from_node(self, node) -> ListingSnapshot:
-        product_id = node.get("data-product-id") or ""
-        product_code = node.get("data-product-sku") or product_id
-        link = node.select_one("a[href]")
-        url = self._resolve_url(link["href"] if link else "")
-        title_el = (
-            node.select_one(".productDetailTitle")
-            or node.select_one(".productCardHeader")
-            or node.select_one("h2")
-            or link
-        )
-        title = title_el.get_text(strip=True) if title_el else "Card Kingdom Listing"
-
-        price = _extract_price(
-            node.get("data-price")
-            or node.get("data-price-each")
-            or node.get_text(strip=True)
-        )
-        available = _is_available(node)
-        edition = node.get("data-edition")
-        collector = node.get("data-collector-number")
-        finish = (node.get("data-finish") or "nonfoil").lower()
-
-        snapshot = ListingSnapshot(
-            vendor=self.vendor,
-            sku=CardSku(
-                oracle_id=self._sku_key(product_code, collector, finish),
-                product_code=product_code,
-                finish=finish,
-                collector_number=collector,
-                set_code=edition,
-                vendor_sku=str(product_id),
-            ),
-            title=title,
-            url=url,
-            price=price,
-            currency="USD",
-            available=available,
-            observed_at=datetime.now(timezone.utc),
-            metadata={
-                "product_id": product_id,
-                "edition": edition or "",
-                "collector": collector or "",
-            },
-        )
-        return snapshot
+            log.warning("Card Kingdom fetch failed for page %d: %s", page, exc)
+            return page, None
+        if resp.not_modified:
+            log.debug("Card Kingdom preorder page %d unchanged since last poll", page)
+        elif resp.status != 200 and page == 1:
+            log.warning("Card Kingdom returned HTTP %s for %s", resp.status, url)
+        return page, resp
+
+
+def _parse_listings(html: str, parse_nodes: ParseFn) -> List[ListingSnapshot]:
+    """Parse a preorder page; module-level so it can run on a process pool."""
+    nodes = parse_nodes(html)
+    snapshots: List[ListingSnapshot] = []
+    if not nodes:
+        log.debug("Card Kingdom preorder markup missing product nodes")
+    for node in nodes:
+        try:
+            snapshot = _snapshot_from_node(node)
+        except Exception as exc:  # pragma: no cover - defensive
+            log.debug("Failed to parse preorder node: %s", exc)
+            continue
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def _snapshot_from_node(node: ProductNode) -> ListingSnapshot:
+    attrs = node.attrs
+    product_id = attrs.get("data-product-id") or ""
+    product_code = attrs.get("data-product-sku") or product_id
+    url = _resolve_url(node.href or "")
+    title = node.title if node.title is not None else "Card Kingdom Listing"
+
+    price = _extract_price(
+        attrs.get("data-price") or attrs.get("data-price-each") or node.text
+    )
+    available = _is_available(node)
+    edition = attrs.get("data-edition")
+    collector = attrs.get("data-collector-number")
+    finish = (attrs.get("data-finish") or "nonfoil").lower()
+
+    snapshot = ListingSnapshot(
+        vendor=Vendor.CARD_KINGDOM,
+        sku=CardSku(
+            oracle_id=_sku_key(product_code, collector, finish),
+            product_code=product_code,
+            finish=finish,
+            collector_number=collector,
+            set_code=edition,
+            vendor_sku=str(product_id),
+        ),
+        title=title,
+        url=url,
+        price=price,
+        currency="USD",
+        available=available,
+        observed_at=datetime.now(timezone.utc),
+        metadata={
+            "product_id": product_id,
+            "edition": edition or "",
+            "collector": collector or "",
+        },
+    )
+    return snapshot
 
-    def _diff_snapshots(self, snapshots: List[ListingSnapshot]) -> List[InventoryEvent]:
-        events: List[InventoryEvent] = []
-        for snapshot in snapshots:
-            key = snapshot.sku.oracle_id
-            previous = self._snapshot_cache.get(key)
-            if previous is None:
-                events.append(
-                    InventoryEvent(
-                        snapshot=snapshot,
-                        previous_snapshot=None,
-                        event_type="new_listing",
-                        delta_price=None,
-                    )
-                )
-                self._snapshot_cache[key] = snapshot
-                continue
-
-            event_type = None
-            delta_price: Optional[float] = None
-
-            if snapshot.available and not previous.available:
-                event_type = "restock"
-            elif snapshot.available != previous.available:
-                event_type = "availability_change"
-            elif abs(snapshot.price - previous.price) >= 0.01:
-                event_type = "price_change"
-                delta_price = snapshot.price - previous.price
-
-            if event_type:
-                events.append(
-                    InventoryEvent(
-                        snapshot=snapshot,
-                        previous_snapshot=previous,
-                        event_type=event_type,
-                        delta_price=delta_price,
-                    )
-                )
-
-            self._snapshot_cache[key] = snapshot
 
-        return events
+def _resolve_url(href: str) -> str:
+    if href.startswith("http"):
+        return href
+    return f"{CardKingdomWatcher.BASE_URL}{href}"
 
-    def _resolve_url(self, href: str) -> str:
-        if href.startswith("http"):
-            return href
-        return f"{self.BASE_URL}{href}"
 
-    def _sku_key(self, product_code: str, collector: Optional[str], finish: str) -> str:
-        parts = [part for part in [product_code, collector, finish] if part]
-        return "|".join(parts) if parts else product_code
+def _sku_key(product_code: str, collector: Optional[str], finish: str) -> str:
+    parts = [part for part in [product_code, collector, finish] if part]
+    return "|".join(parts) if parts else product_code
 
 
 def _extract_price(raw: Optional[str]) -> float:
@@ -186,17 +219,11 @@ def _extract_price(raw: Optional[str]) -> float:
     return 0.0
 
 
-def _is_available(node) -> bool:
-    availability_texts = [
-        element.get_text(strip=True).lower()
-        for element in node.select(".productDetailAvailability, .productStatus, .status")
-    ]
-    for text in availability_texts:
-        if "out of stock" in text or "sold out" in text:
+def _is_available(node: ProductNode) -> bool:
+    for text in node.status_texts:
+        lowered = text.lower()
+        if "out of stock" in lowered or "sold out" in lowered:
             return False
-    button = node.select_one("button, a.button")
-    if button and "add to cart" in button.get_text(strip=True).lower():
-        return True
     return True
 
 
@@ -0,0 +1,387 @@
+"""Pluggable HTML backends that extract Card Kingdom product nodes.
+
+Each backend only materializes ``[data-product-id]`` subtrees and reduces
+them to a ``ProductNode`` so the watcher never touches a parser-specific
+tree. ``selectolax`` and ``lxml`` are used when installed; otherwise a
+streaming tokenizer built on ``html.parser`` is the fallback.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:  # pragma: no cover - optional dependency
+    SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+except ModuleNotFoundError:  # pragma: no cover - optional dependency
+    lxml_html = None
+
+log = logging.getLogger(__name__)
+
+PRODUCT_ATTR = "data-product-id"
+_TITLE_CLASSES = ("productDetailTitle", "productCardHeader")
+_STATUS_CLASSES = frozenset({"productDetailAvailability", "productStatus", "status"})
+_VOID_TAGS = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+
+
+@dataclass(slots=True)
+class ProductNode:
+    """Parser-independent view of one ``[data-product-id]`` element."""
+
+    attrs: Dict[str, str]
+    href: Optional[str]
+    title: Optional[str]
+    text: str
+    status_texts: List[str] = field(default_factory=list)
+
+
+ParseFn = Callable[[str], List[ProductNode]]
+
+
+def _join_text(fragments: List[str]) -> str:
+    # Mirrors BeautifulSoup's get_text(strip=True).
+    return "".join(part.strip() for part in fragments)
+
+
+# --- streaming tokenizer --------------------------------------------------
+
+
+class _ProductBuilder:
+    __slots__ = (
+        "attrs",
+        "href",
+        "text",
+        "link_text",
+        "titles",
+        "h2_text",
+        "status",
+    )
+
+    def __init__(self, attrs: Dict[str, str]) -> None:
+        self.attrs = attrs
+        self.href: Optional[str] = None
+        self.text: List[str] = []
+        self.link_text: Optional[List[str]] = None
+        self.titles: Dict[str, List[str]] = {}
+        self.h2_text: Optional[List[str]] = None
+        self.status: List[List[str]] = []
+
+    def captures_for(self, tag: str, attrs: Dict[str, str]) -> List[List[str]]:
+        captures: List[List[str]] = []
+        classes = attrs.get("class", "").split()
+        for name in _TITLE_CLASSES:
+            if name in classes and name not in self.titles:
+                buffer = self.titles[name] = []
+                captures.append(buffer)
+        if tag == "h2" and self.h2_text is None:
+            self.h2_text = []
+            captures.append(self.h2_text)
+        if tag == "a" and "href" in attrs and self.href is None:
+            self.href = attrs["href"]
+            self.link_text = []
+            captures.append(self.link_text)
+        if _STATUS_CLASSES.intersection(classes):
+            buffer = []
+            self.status.append(buffer)
+            captures.append(buffer)
+        return captures
+
+    def build(self) -> ProductNode:
+        title_parts: Optional[List[str]] = None
+        for name in _TITLE_CLASSES:
+            if name in self.titles:
+                title_parts = self.titles[name]
+                break
+        if title_parts is None:
+            title_parts = self.h2_text if self.h2_text is not None else self.link_text
+        return ProductNode(
+            attrs=self.attrs,
+            href=self.href,
+            title=_join_text(title_parts) if title_parts is not None else None,
+            text=_join_text(self.text),
+            status_texts=[_join_text(parts) for parts in self.status],
+        )
+
+
+class _StreamProductParser(HTMLParser):
+    """Tokenizes the page and only buffers text inside product elements."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.products: List[ProductNode] = []
+        self._current: Optional[_ProductBuilder] = None
+        self._stack: List[Tuple[str, int]] = []
+        self._captures: List[List[str]] = []
+
+    def handle_starttag(
+        self, tag: str, attrs: List[Tuple[str, Optional[str]]]
+    ) -> None:
+        if self._current is None:
+            attr_map = {key: value or "" for key, value in attrs}
+            if PRODUCT_ATTR not in attr_map:
+                return
+            self._current = _ProductBuilder(attr_map)
+            self._stack = [(tag, 1)]
+            self._captures = [self._current.text]
+            if tag in _VOID_TAGS:
+                self._finish()
+            return
+        attr_map = {key: value or "" for key, value in attrs}
+        captures = self._current.captures_for(tag, attr_map)
+        if tag in _VOID_TAGS:
+            return
+        self._captures.extend(captures)
+        self._stack.append((tag, len(captures)))
+
+    def handle_startendtag(
+        self, tag: str, attrs: List[Tuple[str, Optional[str]]]
+    ) -> None:
+        if self._current is None:
+            self.handle_starttag(tag, attrs)
+            if self._current is not None:
+                self._finish()
+            return
+        self._current.captures_for(tag, {key: value or "" for key, value in attrs})
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._current is None:
+            return
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return  # stray close tag inside the product; ignore it
+        while len(self._stack) > index:
+            _, added = self._stack.pop()
+            if added:
+                del self._captures[-added:]
+        if not self._stack:
+            self._finish()
+
+    def handle_data(self, data: str) -> None:
+        for buffer in self._captures:
+            buffer.append(data)
+
+    def close(self) -> None:
+        super().close()
+        if self._current is not None:
+            self._finish()
+
+    def _finish(self) -> None:
+        assert self._current is not None
+        self.products.append(self._current.build())
+        self._current = None
+        self._stack = []
+        self._captures = []
+
+
+def parse_stream(html: str) -> List[ProductNode]:
+    parser = _StreamProductParser()
+    parser.feed(html)
+    parser.close()
+    return parser.products
+
+
+# --- BeautifulSoup --------------------------------------------------------
+
+
+def parse_bs4(html: str) -> List[ProductNode]:
+    strainer = SoupStrainer(attrs={PRODUCT_ATTR: True})
+    soup = BeautifulSoup(html, "html.parser", parse_only=strainer)
+    nodes: List[ProductNode] = []
+    for element in soup.find_all(attrs={PRODUCT_ATTR: True}, recursive=False):
+        link = element.select_one("a[href]")
+        title_el = (
+            element.select_one(".productDetailTitle")
+            or element.select_one(".productCardHeader")
+            or element.select_one("h2")
+            or link
+        )
+        nodes.append(
+            ProductNode(
+                attrs={
+                    key: " ".join(value) if isinstance(value, list) else value
+                    for key, value in element.attrs.items()
+                },
+                href=link["href"] if link else None,
+                title=title_el.get_text(strip=True) if title_el else None,
+                text=element.get_text(strip=True),
+                status_texts=[
+                    status.get_text(strip=True)
+                    for status in element.select(
+                        ".productDetailAvailability, .productStatus, .status"
+                    )
+                ],
+            )
+        )
+    return nodes
+
+
+# --- selectolax -----------------------------------------------------------
+
+
+def parse_selectolax(html: str) -> List[ProductNode]:
+    if SelectolaxParser is None:
+        raise RuntimeError("selectolax is not installed")
+    tree = SelectolaxParser(html)
+    nodes: List[ProductNode] = []
+    for element in tree.css(f"[{PRODUCT_ATTR}]"):
+        if _selectolax_has_product_ancestor(element):
+            continue
+        link = element.css_first("a[href]")
+        title_el = (
+            element.css_first(".productDetailTitle")
+            or element.css_first(".productCardHeader")
+            or element.css_first("h2")
+            or link
+        )
+        nodes.append(
+            ProductNode(
+                attrs={key: value or "" for key, value in element.attributes.items()},
+                href=link.attributes.get("href") if link else None,
+                title=title_el.text(strip=True) if title_el else None,
+                text=element.text(strip=True),
+                # A selector group yields an element once per matching class,
+                # so filter on class names to visit each element once.
+                status_texts=[
+                    status.text(strip=True)
+                    for status in element.css("[class]")
+                    if _STATUS_CLASSES.intersection(
+                        (status.attributes.get("class") or "").split()
+                    )
+                ],
+            )
+        )
+    return nodes
+
+
+def _selectolax_has_product_ancestor(element) -> bool:
+    parent = element.parent
+    while parent is not None:
+        if parent.attributes and PRODUCT_ATTR in parent.attributes:
+            return True
+        parent = parent.parent
+    return False
+
+
+# --- lxml -----------------------------------------------------------------
+
+
+def _xpath_class(name: str) -> str:
+    return f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+
+_LXML_STATUS_XPATH = " | ".join(
+    _xpath_class(name)
+    for name in ("productDetailAvailability", "productStatus", "status")
+)
+
+
+def _lxml_text(element) -> str:
+    return "".join(part.strip() for part in element.itertext())
+
+
+def parse_lxml(html: str) -> List[ProductNode]:
+    if lxml_html is None:
+        raise RuntimeError("lxml is not installed")
+    if not html.strip():
+        return []
+    root = lxml_html.fromstring(html)
+    nodes: List[ProductNode] = []
+    for element in root.xpath(
+        f"//*[@{PRODUCT_ATTR}][not(ancestor::*[@{PRODUCT_ATTR}])]"
+    ):
+        links = element.xpath(".//a[@href]")
+        link = links[0] if links else None
+        title_el = None
+        for query in (
+            _xpath_class("productDetailTitle"),
+            _xpath_class("productCardHeader"),
+            ".//h2",
+        ):
+            found = element.xpath(query)
+            if found:
+                title_el = found[0]
+                break
+        if title_el is None:
+            title_el = link
+        nodes.append(
+            ProductNode(
+                attrs={key: value or "" for key, value in element.attrib.items()},
+                href=link.get("href") if link is not None else None,
+                title=_lxml_text(title_el) if title_el is not None else None,
+                text=_lxml_text(element),
+                status_texts=[
+                    _lxml_text(status) for status in element.xpath(_LXML_STATUS_XPATH)
+                ],
+            )
+        )
+    return nodes
+
+
+# --- registry -------------------------------------------------------------
+
+
+def available_backends() -> Dict[str, ParseFn]:
+    """Installed backends in order of preference for ``auto``."""
+    backends: Dict[str, ParseFn] = {}
+    if SelectolaxParser is not None:
+        backends["selectolax"] = parse_selectolax
+    if lxml_html is not None:
+        backends["lxml"] = parse_lxml
+    backends["stream"] = parse_stream
+    backends["bs4"] = parse_bs4
+    return backends
+
+
+def resolve_backend(name: str = "auto") -> Tuple[str, ParseFn]:
+    backends = available_backends()
+    key = (name or "auto").lower()
+    if key == "auto":
+        return next(iter(backends.items()))
+    if key not in backends:
+        fallback = next(iter(backends.items()))
+        log.warning(
+            "Card Kingdom parser %r unavailable; falling back to %s",
+            name,
+            fallback[0],
+        )
+        return fallback
+    return key, backends[key]
+
+
+__all__ = [
+    "ProductNode",
+    "available_backends",
+    "parse_bs4",
+    "parse_lxml",
+    "parse_selectolax",
+    "parse_stream",
+    "resolve_backend",
+]
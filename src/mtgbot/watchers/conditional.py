@@ -0,0 +1,186 @@
+"""Conditional HTTP GETs (ETag / Last-Modified) with a content-hash fallback."""
+
+from __future__ import annotations
+
+import hashlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Mapping, Optional
+
+import aiohttp
+
+
+@dataclass(slots=True)
+class _Validators:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: bytes
+
+
+@dataclass(slots=True)
+class ConditionalResponse:
+    status: int
+    text: Optional[str]
+    not_modified: bool = False
+
+
+class StreamingResponse:
+    """A 200 body read chunk by chunk, hashing as it goes."""
+
+    __slots__ = (
+        "status",
+        "encoding",
+        "not_modified",
+        "complete",
+        "_content",
+        "_hasher",
+    )
+
+    def __init__(
+        self,
+        status: int,
+        content: Optional[aiohttp.StreamReader] = None,
+        *,
+        encoding: str = "utf-8",
+        not_modified: bool = False,
+    ) -> None:
+        self.status = status
+        self.encoding = encoding
+        self.not_modified = not_modified
+        self.complete = False
+        self._content = content
+        self._hasher = hashlib.blake2b(digest_size=16)
+
+    async def iter_chunks(self, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        if self._content is None:
+            return
+        async for chunk in self._content.iter_chunked(size):
+            self._hasher.update(chunk)
+            yield chunk
+        self.complete = True
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iter_chunks()])
+
+    def digest(self) -> bytes:
+        return self._hasher.digest()
+
+
+class ConditionalFetcher:
+    """Remembers validators per URL so unchanged bodies are never re-parsed.
+
+    ``get`` returns ``not_modified=True`` (and no text) when the server
+    answers 304, or when a 200 body hashes identically to the previous one.
+    Client errors propagate so callers keep their existing handling.
+
+    Validators for a new body are held back until the caller ``commit``s the
+    URL after parsing it; a body that fails to parse is fetched in full next
+    time instead of being answered with a 304.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self._session = session
+        self._validators: Dict[str, _Validators] = {}
+        self._pending: Dict[str, _Validators] = {}
+        self.not_modified_count = 0
+        self.unchanged_body_count = 0
+
+    async def get(
+        self, url: str, *, headers: Optional[Mapping[str, str]] = None
+    ) -> ConditionalResponse:
+        request_headers = dict(headers or {})
+        previous = self._validators.get(url)
+        if previous is not None:
+            if previous.etag:
+                request_headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                request_headers["If-Modified-Since"] = previous.last_modified
+
+        async with self._session.get(url, headers=request_headers) as resp:
+            if resp.status == 304 and previous is not None:
+                self.not_modified_count += 1
+                return ConditionalResponse(304, None, not_modified=True)
+            if resp.status != 200:
+                return ConditionalResponse(resp.status, None)
+            body = await resp.read()
+            encoding = resp.get_encoding()
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if self._hold(url, previous, _Validators(etag, last_modified, digest)):
+            return ConditionalResponse(200, None, not_modified=True)
+        return ConditionalResponse(200, body.decode(encoding, errors="replace"))
+
+    @asynccontextmanager
+    async def stream(
+        self, url: str, *, headers: Optional[Mapping[str, str]] = None
+    ) -> AsyncIterator[StreamingResponse]:
+        """Like ``get`` but hands the body over as it arrives.
+
+        Only a 304 sets ``not_modified`` up front. Validators are held once
+        the body has been read to the end, so an abandoned read is fetched in
+        full next time; ``commit`` after the context exits to keep them.
+        """
+        request_headers = dict(headers or {})
+        previous = self._validators.get(url)
+        if previous is not None:
+            if previous.etag:
+                request_headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                request_headers["If-Modified-Since"] = previous.last_modified
+
+        async with self._session.get(url, headers=request_headers) as resp:
+            if resp.status == 304 and previous is not None:
+                self.not_modified_count += 1
+                yield StreamingResponse(304, not_modified=True)
+                return
+            if resp.status != 200:
+                yield StreamingResponse(resp.status)
+                return
+            streamed = StreamingResponse(
+                200,
+                resp.content,
+                # get_encoding() would need the body to sniff a missing charset.
+                encoding=resp.charset or "utf-8",
+            )
+            yield streamed
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+
+        if streamed.complete:
+            validators = _Validators(etag, last_modified, streamed.digest())
+            self._hold(url, previous, validators)
+
+    def commit(self, url: str) -> None:
+        """Keep the validators of the last body fetched from ``url``.
+
+        Call once that body has been parsed; until then the next fetch is
+        sent without them.
+        """
+        validators = self._pending.pop(url, None)
+        if validators is not None:
+            self._validators[url] = validators
+
+    def forget(self, url: str) -> None:
+        """Drop stored validators so the next fetch downloads in full."""
+        self._validators.pop(url, None)
+        self._pending.pop(url, None)
+
+    def _hold(
+        self, url: str, previous: Optional[_Validators], validators: _Validators
+    ) -> bool:
+        """Stage ``validators``; True when the body matches the stored digest.
+
+        A matching body was already parsed, so its validators are kept at once.
+        """
+        if previous is not None and previous.digest == validators.digest:
+            self.unchanged_body_count += 1
+            self._pending.pop(url, None)
+            self._validators[url] = validators
+            return True
+        self._pending[url] = validators
+        return False
+
+
+__all__ = ["ConditionalFetcher", "ConditionalResponse", "StreamingResponse"]
@@ -0,0 +1,273 @@
+"""Shared snapshot diffing for retailer watchers."""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from mtgbot.models import InventoryEvent, ListingSnapshot
+from mtgbot.watchers.snapshot_cache import SnapshotCache
+
+try:  # numpy arrives with matplotlib; the scalar path covers its absence.
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+log = logging.getLogger(__name__)
+
+VECTORIZE_MIN_BATCH = 2048
+
+KeyFn = Callable[[ListingSnapshot], str]
+WantsFn = Callable[[ListingSnapshot], bool]
+
+
+@dataclass(slots=True, frozen=True)
+class PriceThreshold:
+    """Minimum move for a price-change event; both limits must be met."""
+
+    absolute: float = 0.01
+    percent: float = 0.0
+
+    def exceeded(self, previous: float, current: float) -> bool:
+        delta = abs(current - previous)
+        if delta < self.absolute:
+            return False
+        if self.percent <= 0 or previous <= 0:
+            return True
+        return delta * 100.0 >= self.percent * previous
+
+
+class PriceThresholds:
+    """Per-vendor PriceThreshold lookup with a default."""
+
+    def __init__(
+        self,
+        default: Optional[PriceThreshold] = None,
+        per_vendor: Optional[Mapping[str, PriceThreshold]] = None,
+    ) -> None:
+        self.default = default or PriceThreshold()
+        self._per_vendor: Dict[str, PriceThreshold] = dict(per_vendor or {})
+
+    @classmethod
+    def from_settings(
+        cls, values: Mapping[str, Tuple[float, float]]
+    ) -> "PriceThresholds":
+        """Build from ``{vendor or "default": (absolute, percent)}``."""
+        parsed = {key: PriceThreshold(*limits) for key, limits in values.items()}
+        return cls(parsed.pop("default", None), parsed)
+
+    def for_vendor(self, vendor: str) -> PriceThreshold:
+        return self._per_vendor.get(vendor, self.default)
+
+
+@dataclass(slots=True, frozen=True)
+class EventNames:
+    new: str
+    restock: str
+    availability: str
+    price: str
+
+    @classmethod
+    def prefixed(cls, prefix: str) -> "EventNames":
+        return cls(
+            new=f"{prefix}_listing",
+            restock=f"{prefix}_restock",
+            availability=f"{prefix}_availability_change",
+            price=f"{prefix}_price_change",
+        )
+
+
+class SnapshotDiffer:
+    """Diffs a batch of snapshots against a SnapshotCache and emits events.
+
+    A listing is new when its key is not cached. Otherwise it is a restock
+    when it became available, an availability change when it went away, and
+    a price change when both prices are known and the move clears the
+    vendor's PriceThreshold. The cache is updated for every snapshot, while
+    events are only built for snapshots ``wants`` accepts. Batches of at
+    least ``vectorize_min`` unique keys are compared with NumPy over the
+    cache's price/availability columns; smaller batches loop in Python.
+    """
+
+    def __init__(
+        self,
+        cache: SnapshotCache,
+        names: EventNames,
+        *,
+        key: KeyFn,
+        wants: WantsFn,
+        thresholds: Optional[PriceThresholds] = None,
+        vectorize_min: int = VECTORIZE_MIN_BATCH,
+    ) -> None:
+        self._cache = cache
+        self._names = names
+        self._key = key
+        self._wants = wants
+        self.thresholds = thresholds or PriceThresholds()
+        self._vectorize_min = vectorize_min
+
+    def diff(self, snapshots: Sequence[ListingSnapshot]) -> List[InventoryEvent]:
+        if np is not None and len(snapshots) >= self._vectorize_min:
+            keys = [self._key(snapshot) for snapshot in snapshots]
+            if len(set(keys)) == len(keys):
+                return self._diff_vectorized(snapshots, keys)
+        return self._diff_scalar(snapshots)
+
+    def _diff_scalar(
+        self, snapshots: Sequence[ListingSnapshot]
+    ) -> List[InventoryEvent]:
+        names = self._names
+        cache = self._cache
+        events: List[InventoryEvent] = []
+        for snapshot in snapshots:
+            key = self._key(snapshot)
+            previous = cache.get(key)
+            cache[key] = snapshot
+            if previous is None:
+                if self._wants(snapshot):
+                    events.append(_event(snapshot, None, names.new))
+                continue
+
+            event_type = None
+            if snapshot.available and not previous.available:
+                event_type = names.restock
+            elif snapshot.available != previous.available:
+                event_type = names.availability
+            elif (
+                snapshot.price is not None
+                and previous.price is not None
+                and self.thresholds.for_vendor(snapshot.vendor.value).exceeded(
+                    previous.price, snapshot.price
+                )
+            ):
+                event_type = names.price
+
+            if event_type and self._wants(snapshot):
+                events.append(
+                    _event(snapshot, previous.as_snapshot(snapshot), event_type)
+                )
+        return events
+
+    def _diff_vectorized(
+        self, snapshots: Sequence[ListingSnapshot], keys: List[str]
+    ) -> List[InventoryEvent]:
+        cache = self._cache
+        slots = np.fromiter(
+            (cache.slot(key) for key in keys), dtype=np.int64, count=len(keys)
+        )
+        price = np.fromiter(
+            (
+                math.nan if snapshot.price is None else snapshot.price
+                for snapshot in snapshots
+            ),
+            dtype=np.float64,
+            count=len(snapshots),
+        )
+        available = np.fromiter(
+            (snapshot.available for snapshot in snapshots),
+            dtype=np.bool_,
+            count=len(snapshots),
+        )
+        absolute, percent = self._threshold_columns(snapshots)
+
+        known = slots >= 0
+        lookup = np.where(known, slots, 0)
+        prices, flags = cache.columns()
+        if len(prices):
+            previous_price = np.frombuffer(prices, dtype=np.float64)[lookup]
+            previous_available = (
+                np.frombuffer(flags, dtype=np.uint8)[lookup].astype(np.bool_)
+            )
+        else:
+            previous_price = np.full(len(keys), math.nan)
+            previous_available = np.zeros(len(keys), dtype=np.bool_)
+        # Drop the buffer exports before the cache appends new slots.
+        del prices, flags
+
+        restock = known & available & ~previous_available
+        availability = known & ~available & previous_available
+        delta = np.abs(price - previous_price)
+        with np.errstate(invalid="ignore"):
+            moved = (
+                known
+                & (available == previous_available)
+                & (delta >= absolute)
+                & (
+                    (percent <= 0)
+                    | (previous_price <= 0)
+                    | (delta * 100.0 >= percent * previous_price)
+                )
+            )
+        changed = restock | availability | moved
+        # NaN on either side never compares >=, so unknown prices stay quiet.
+        touched = ~known | changed | (known & (price != previous_price))
+
+        names = self._names
+        events: List[InventoryEvent] = []
+        for index in np.flatnonzero(~known | changed).tolist():
+            snapshot = snapshots[index]
+            if not self._wants(snapshot):
+                continue
+            if not known[index]:
+                events.append(_event(snapshot, None, names.new))
+                continue
+            if restock[index]:
+                event_type = names.restock
+            elif availability[index]:
+                event_type = names.availability
+            else:
+                event_type = names.price
+            previous = cache.get(keys[index])
+            events.append(_event(snapshot, previous.as_snapshot(snapshot), event_type))
+
+        for index in np.flatnonzero(touched).tolist():
+            snapshot = snapshots[index]
+            cache[keys[index]] = snapshot
+        return events
+
+    def _threshold_columns(
+        self, snapshots: Sequence[ListingSnapshot]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        vendors = {snapshot.vendor.value for snapshot in snapshots}
+        if len(vendors) == 1:
+            limit = self.thresholds.for_vendor(vendors.pop())
+            return np.float64(limit.absolute), np.float64(limit.percent)
+        limits = [
+            self.thresholds.for_vendor(snapshot.vendor.value) for snapshot in snapshots
+        ]
+        return (
+            np.fromiter((limit.absolute for limit in limits), dtype=np.float64),
+            np.fromiter((limit.percent for limit in limits), dtype=np.float64),
+        )
+
+
+def _event(
+    snapshot: ListingSnapshot,
+    previous: Optional[ListingSnapshot],
+    event_type: str,
+) -> InventoryEvent:
+    delta = None
+    if (
+        previous is not None
+        and event_type.endswith("price_change")
+        and snapshot.price is not None
+        and previous.price is not None
+    ):
+        delta = snapshot.price - previous.price
+    return InventoryEvent(
+        snapshot=snapshot,
+        previous_snapshot=previous,
+        event_type=event_type,
+        delta_price=delta,
+    )
+
+
+__all__ = [
+    "EventNames",
+    "PriceThreshold",
+    "PriceThresholds",
+    "SnapshotDiffer",
+    "VECTORIZE_MIN_BATCH",
+]
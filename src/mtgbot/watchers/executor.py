@@ -0,0 +1,75 @@
+"""Executor-backed parse stage so heavy parsing stays off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from mtgbot.metrics import LatencyRecorder
+
+log = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+PARSE_MODES = ("inline", "thread", "process")
+
+
+class ParseExecutor:
+    """Runs parse functions inline, on a thread pool, or on a process pool.
+
+    Functions submitted in ``process`` mode must be module-level and take
+    picklable arguments (raw bodies, URLs) so they can cross the pool.
+    """
+
+    def __init__(
+        self,
+        mode: str = "inline",
+        *,
+        max_workers: int = 2,
+        metrics: Optional[LatencyRecorder] = None,
+    ) -> None:
+        if mode not in PARSE_MODES:
+            log.warning("Unknown parse executor mode %r; using inline", mode)
+            mode = "inline"
+        self.mode = mode
+        self._max_workers = max(max_workers, 1)
+        self._executor: Optional[Executor] = None
+        self.metrics = metrics or LatencyRecorder()
+
+    async def run(self, name: str, func: Callable[..., R], *args: Any) -> R:
+        started = time.perf_counter()
+        try:
+            executor = self._ensure_executor()
+            if executor is None:
+                return func(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, func, *args)
+        finally:
+            self.metrics.record(name, time.perf_counter() - started)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _ensure_executor(self) -> Optional[Executor]:
+        if self._executor is not None or self.mode == "inline":
+            return self._executor
+        if self.mode == "process":
+            # spawn avoids forking a process that already runs sqlite/aiohttp threads.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="mtgbot-parse"
+            )
+        return self._executor
+
+
+__all__ = ["PARSE_MODES", "ParseExecutor"]
@@ -0,0 +1,120 @@
+"""Incremental parsing of store feeds shaped ``{..., "products": [...]}``."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+_START, _KEY, _COLON, _VALUE, _ITEMS, _DONE = range(6)
+
+
+class FeedStreamParser:
+    """Pulls items out of one top-level array as the body arrives.
+
+    ``feed`` takes decoded text and returns the items of ``array_key`` that
+    completed in it; every other top-level key lands in ``header``. Only one
+    item is buffered as text at a time, so memory tracks the largest product
+    rather than the whole feed. Malformed JSON surfaces as ``ValueError``
+    from ``close`` (the parser keeps waiting for more text until then).
+    """
+
+    __slots__ = ("array_key", "header", "_buffer", "_state", "_key", "_decoder")
+
+    def __init__(self, array_key: str = "products") -> None:
+        self.array_key = array_key
+        self.header: Dict[str, Any] = {}
+        self._buffer = ""
+        self._state = _START
+        self._key = ""
+        self._decoder = json.JSONDecoder()
+
+    @property
+    def in_array(self) -> bool:
+        return self._state == _ITEMS
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, text: str) -> List[Any]:
+        buffer = self._buffer + text if self._buffer else text
+        items: List[Any] = []
+        pos = self._advance(buffer, items)
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self) -> None:
+        if self._state != _DONE or self._buffer.strip(_WHITESPACE):
+            raise ValueError("Feed ended before its JSON object was complete")
+
+    def _advance(self, buffer: str, items: List[Any]) -> int:
+        pos = 0
+        end = len(buffer)
+        while True:
+            while pos < end and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= end or self._state == _DONE:
+                return pos
+            char = buffer[pos]
+            state = self._state
+            if state == _START:
+                if char != "{":
+                    raise ValueError("Feed is not a JSON object")
+                self._state = _KEY
+                pos += 1
+            elif state == _KEY:
+                if char == ",":
+                    pos += 1
+                elif char == "}":
+                    self._state = _DONE
+                    pos += 1
+                else:
+                    decoded = self._decode(buffer, pos)
+                    if decoded is None:
+                        return pos
+                    self._key, pos = decoded
+                    if not isinstance(self._key, str):
+                        raise ValueError("Feed object key is not a string")
+                    self._state = _COLON
+            elif state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' after key {self._key!r}")
+                self._state = _VALUE
+                pos += 1
+            elif state == _VALUE:
+                if self._key == self.array_key and char == "[":
+                    self._state = _ITEMS
+                    pos += 1
+                    continue
+                decoded = self._decode(buffer, pos)
+                if decoded is None:
+                    return pos
+                self.header[self._key], pos = decoded
+                self._state = _KEY
+            else:  # _ITEMS
+                if char == ",":
+                    pos += 1
+                elif char == "]":
+                    self._state = _KEY
+                    pos += 1
+                else:
+                    decoded = self._decode(buffer, pos)
+                    if decoded is None:
+                        return pos
+                    item, pos = decoded
+                    items.append(item)
+
+    def _decode(self, buffer: str, pos: int) -> Optional[Tuple[Any, int]]:
+        try:
+            value, end = self._decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            return None
+        if end >= len(buffer):
+            # A number at the end of the buffer may continue in the next chunk.
+            return None
+        return value, end
+
+
+__all__ = ["FeedStreamParser"]
@@ -0,0 +1,89 @@
+"""Bounded-concurrency helpers for watchers that poll many URLs per cycle."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+log = logging.getLogger(__name__)
+
+
+class FetchLimiter:
+    """Caps in-flight fetches for one watcher, overall and per host."""
+
+    def __init__(
+        self, max_concurrency: int = 10, *, per_host: Optional[int] = None
+    ) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.per_host = max(per_host or self.max_concurrency, 1)
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self.failures = 0
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host_sem = self._host_semaphore(url)
+        async with host_sem:
+            async with self._global:
+                yield
+
+    async def gather(
+        self,
+        items: Sequence[T],
+        fetch: Callable[[T], Awaitable[R]],
+        *,
+        url: Callable[[T], str],
+    ) -> List[Optional[R]]:
+        """Run ``fetch`` over ``items`` concurrently, preserving input order.
+
+        A fetch that raises is logged and yields ``None`` in its slot, so one
+        bad SKU or URL does not cost the rest of the cycle.
+        """
+        if not items:
+            return []
+
+        async def run(item: T) -> R:
+            async with self.slot(url(item)):
+                return await fetch(item)
+
+        results = await asyncio.gather(
+            *(run(item) for item in items), return_exceptions=True
+        )
+        collected: List[Optional[R]] = []
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                self.failures += 1
+                log.warning(
+                    "Fetch for %s failed: %s", url(item), result, exc_info=result
+                )
+                collected.append(None)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                collected.append(result)
+        return collected
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+
+__all__ = ["FetchLimiter"]
@@ -2,116 +2,182 @@
 
 from __future__ import annotations
 
-import json
+import codecs
 import logging
-from collections import deque
 from datetime import datetime, timezone
-from typing import Deque, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import aiohttp
 
+from mtgbot import codec
 from mtgbot.models import CardSku, InventoryEvent, ListingSnapshot, Vendor
-from mtgbot.watchers.base import Watcher
+from mtgbot.storage.snapshots import SnapshotRepository
+from mtgbot.watchers.base import BufferedWatcher
+from mtgbot.watchers.diff import EventNames, PriceThresholds, SnapshotDiffer
+from mtgbot.watchers.conditional import ConditionalFetcher, StreamingResponse
+from mtgbot.watchers.feed_stream import FeedStreamParser
+from mtgbot.watchers.limits import FetchLimiter
 
 log = logging.getLogger(__name__)
 
 
-class PhoenixLocalStoreWatcher(Watcher):
-    """Polls configured Phoenix-area store feeds for product availability."""
+STREAM_MIN_BYTES = 256 * 1024
+
+
+class PhoenixLocalStoreWatcher(BufferedWatcher):
+    """Polls configured Phoenix-area store feeds for product availability.
+
+    Feeds whose decoded body stays within ``stream_min_bytes`` are decoded in
+    one go. Once more than that has been read, the rest is parsed product by
+    product as it arrives and diffed per network chunk, so the full body and
+    object tree are never held at once. Counting decoded bytes rather than
+    trusting Content-Length keeps gzip-encoded feeds on the right path.
+    ``stream_min_bytes=None`` always decodes whole; whole bodies go through
+    ``mtgbot.codec``.
+    """
 
     def __init__(
-        self, session: aiohttp.ClientSession, feed_urls: Iterable[str]
+        self,
+        session: aiohttp.ClientSession,
+        feed_urls: Iterable[str],
+        *,
+        limiter: Optional[FetchLimiter] = None,
+        snapshot_store: Optional[SnapshotRepository] = None,
+        thresholds: Optional[PriceThresholds] = None,
+        stream_min_bytes: Optional[int] = STREAM_MIN_BYTES,
     ) -> None:
         super().__init__(Vendor.LOCAL_STORE)
         self._session = session
+        self._http = ConditionalFetcher(session)
         self._feeds = [url for url in feed_urls if url]
+        self._limiter = limiter or FetchLimiter()
+        self._stream_min_bytes = stream_min_bytes
         self.poll_interval = 600.0
-        self._pending: Deque[InventoryEvent] = deque()
-        self._cache: Dict[str, ListingSnapshot] = {}
+        self._cache = self._snapshot_cache_for("local_store", snapshot_store)
+        self._differ = SnapshotDiffer(
+            self._cache,
+            EventNames.prefixed("store"),
+            key=lambda snapshot: snapshot.sku.oracle_id,
+            wants=self._wants,
+            thresholds=thresholds,
+        )
 
-    async def poll(self) -> Optional[InventoryEvent]:
-        if self._pending:
-            return self._pending.popleft()
+    async def _collect(self) -> List[InventoryEvent]:
+        if self._stream_min_bytes is not None:
+            results = await self._limiter.gather(
+                self._feeds, self._stream_feed, url=lambda url: url
+            )
+            return [event for events in results if events for event in events]
 
-        for feed_url in self._feeds:
-            payload = await self._fetch_feed(feed_url)
+        events: List[InventoryEvent] = []
+        payloads = await self._limiter.gather(
+            self._feeds, self._fetch_feed, url=lambda url: url
+        )
+        for feed_url, payload in zip(self._feeds, payloads):
             if not payload:
                 continue
-            events = self._diff_feed(feed_url, payload)
-            self._pending.extend(events)
-
-        if self._pending:
-            return self._pending.popleft()
-        return None
+            events.extend(self._diff_feed(feed_url, payload))
+            self._http.commit(feed_url)
+        return events
 
     async def _fetch_feed(self, url: str) -> Optional[dict]:
         try:
-            async with self._session.get(url) as resp:
-                if resp.status != 200:
-                    log.warning("Phoenix feed %s returned %s", url, resp.status)
-                    return None
-                text = await resp.text()
+            resp = await self._http.get(url)
         except aiohttp.ClientError as exc:
             log.warning("Phoenix feed fetch failed for %s: %s", url, exc)
             return None
+        if resp.not_modified:
+            return None
+        if resp.status != 200:
+            log.warning("Phoenix feed %s returned %s", url, resp.status)
+            return None
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return codec.loads(resp.text)
+        except ValueError:
             log.warning("Phoenix feed %s did not return valid JSON", url)
             return None
 
-    def _diff_feed(self, feed_url: str, payload: dict) -> List[InventoryEvent]:
-        products = payload.get("products", [])
-        store_name = payload.get("store", "Phoenix LGS")
-        contact_url = payload.get("contact_url")
+    async def _stream_feed(self, url: str) -> List[InventoryEvent]:
         events: List[InventoryEvent] = []
+        try:
+            async with self._http.stream(url) as resp:
+                if resp.not_modified:
+                    return events
+                if resp.status != 200:
+                    log.warning("Phoenix feed %s returned %s", url, resp.status)
+                    return events
+                await self._diff_stream(url, resp, events)
+            self._http.commit(url)
+        except aiohttp.ClientError as exc:
+            log.warning("Phoenix feed fetch failed for %s: %s", url, exc)
+        except ValueError:
+            log.warning("Phoenix feed %s did not return valid JSON", url)
+        except Exception as exc:
+            # Chunks diffed so far already moved the cache on, so their
+            # events must still be returned; the feed stays uncommitted.
+            log.warning("Phoenix feed %s failed mid-stream: %r", url, exc)
+        return events
+
+    async def _diff_stream(
+        self, url: str, resp: StreamingResponse, events: List[InventoryEvent]
+    ) -> None:
+        chunks = resp.iter_chunks()
+        head: List[bytes] = []
+        size = 0
+        async for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+            if size > self._stream_min_bytes:
+                break
+        else:
+            payload = codec.loads(b"".join(head))
+            if not isinstance(payload, dict):
+                raise ValueError("Feed is not a JSON object")
+            events.extend(self._diff_feed(url, payload))
+            return
+
+        parser = FeedStreamParser("products")
+        decoder = codecs.getincrementaldecoder(resp.encoding)(errors="replace")
+        # Product oracle_ids embed the store name, so products that arrive
+        # before the "store" key wait for it (or for the end of the feed).
+        held: List[Dict[str, Any]] = parser.feed(decoder.decode(b"".join(head)))
+        head.clear()
+        async for chunk in chunks:
+            products = parser.feed(decoder.decode(chunk))
+            if "store" not in parser.header:
+                held.extend(products)
+                continue
+            if held:
+                products, held = held + products, []
+            if products:
+                events.extend(self._diff_products(url, parser.header, products))
+        held.extend(parser.feed(decoder.decode(b"", final=True)))
+        parser.close()
+        if held:
+            events.extend(self._diff_products(url, parser.header, held))
+
+    def _diff_feed(self, feed_url: str, payload: dict) -> List[InventoryEvent]:
+        return self._diff_products(feed_url, payload, payload.get("products", []))
+
+    def _diff_products(
+        self,
+        feed_url: str,
+        header: Dict[str, Any],
+        products: List[Dict[str, Any]],
+    ) -> List[InventoryEvent]:
+        store_name = header.get("store", "Phoenix LGS")
+        contact_url = header.get("contact_url")
+        snapshots: List[ListingSnapshot] = []
         for product in products:
             try:
-                snapshot = self._snapshot_from_product(
-                    feed_url, store_name, product, contact_url
+                snapshots.append(
+                    self._snapshot_from_product(
+                        feed_url, store_name, product, contact_url
+                    )
                 )
             except ValueError as exc:
                 log.debug("Skipping local store product: %s", exc)
-                continue
-            key = snapshot.sku.oracle_id
-            previous = self._cache.get(key)
-
-            if previous is None:
-                events.append(
-                    InventoryEvent(
-                        snapshot=snapshot,
-                        previous_snapshot=None,
-                        event_type="store_listing",
-                        delta_price=None,
-                    )
-                )
-            else:
-                event_type = None
-                delta_price: Optional[float] = None
-                if snapshot.available and not previous.available:
-                    event_type = "store_restock"
-                elif snapshot.available != previous.available:
-                    event_type = "store_availability_change"
-                elif (
-                    snapshot.price is not None
-                    and previous.price is not None
-                    and abs(snapshot.price - previous.price) >= 0.01
-                ):
-                    event_type = "store_price_change"
-                    delta_price = snapshot.price - previous.price
-
-                if event_type:
-                    events.append(
-                        InventoryEvent(
-                            snapshot=snapshot,
-                            previous_snapshot=previous,
-                            event_type=event_type,
-                            delta_price=delta_price,
-                        )
-                    )
-
-            self._cache[key] = snapshot
-        return events
+        return self._differ.diff(snapshots)
 
     def _snapshot_from_product(
         self,
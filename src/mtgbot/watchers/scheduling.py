@@ -0,0 +1,200 @@
+"""Adaptive poll intervals for inventory watchers."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import math
+import time
+from datetime import date
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from mtgbot.watchers.base import DemandFn, Watcher
+
+log = logging.getLogger(__name__)
+
+
+class ReleaseCalendar:
+    """Known set release dates, used to detect drop-day windows.
+
+    A day is "hot" when it falls within ``window_days`` of any release, which
+    covers the eve of release (preorder stock moves) through the day after.
+    """
+
+    def __init__(self, *, window_days: int = 1) -> None:
+        self.window_days = max(window_days, 0)
+        self._dates: FrozenSet[date] = frozenset()
+        self._checked: Optional[date] = None
+        self._hot = False
+
+    def update(self, release_dates: Iterable[date]) -> None:
+        self._dates = frozenset(release_dates)
+        self._checked = None
+
+    def is_hot(self, today: Optional[date] = None) -> bool:
+        today = today or date.today()
+        if self._checked != today:
+            self._hot = any(
+                abs((release - today).days) <= self.window_days
+                for release in self._dates
+            )
+            self._checked = today
+        return self._hot
+
+
+class AdaptivePollScheduler:
+    """Picks each watcher's next sleep from its recent activity.
+
+    A cycle that changed cached listings drops the interval to half the
+    watcher's ``poll_interval``. Each quiet cycle multiplies it by
+    ``backoff``, up to ``max_factor`` times ``poll_interval``. Inside a
+    release window the delay is capped at a quarter of ``poll_interval``.
+    No delay goes below ``min_interval``.
+    """
+
+    def __init__(
+        self,
+        calendar: Optional[ReleaseCalendar] = None,
+        *,
+        min_interval: float = 30.0,
+        max_factor: float = 8.0,
+        backoff: float = 2.0,
+        enabled: bool = True,
+    ) -> None:
+        self.calendar = calendar or ReleaseCalendar()
+        self.min_interval = min_interval
+        self.max_factor = max(max_factor, 1.0)
+        self.backoff = max(backoff, 1.0)
+        self.enabled = enabled
+        self._intervals: Dict[int, float] = {}
+
+    def pace(self) -> float:
+        """Interval multiplier for the current day (shorter inside a release window)."""
+        if self.enabled and self.calendar.is_hot():
+            return 0.25
+        return 1.0
+
+    def next_delay(self, watcher: Watcher, *, changed: bool) -> float:
+        base = watcher.poll_interval
+        if not self.enabled:
+            return base
+        key = id(watcher)
+        current = self._intervals.get(key, base)
+        if changed:
+            current = base / 2
+        else:
+            current = min(current * self.backoff, base * self.max_factor)
+        self._intervals[key] = current
+        pace = self.pace()
+        delay = min(current, base * pace) if pace < 1.0 else current
+        delay = max(delay, self.min_interval)
+        if delay != base:
+            log.debug(
+                "Watcher %s next poll in %.0fs (changed=%s)",
+                watcher.vendor.value,
+                delay,
+                changed,
+            )
+        return delay
+
+
+class ItemScheduler:
+    """Per-item next-due times for watchers that fetch many items per cycle.
+
+    Each item's interval starts at ``base_interval`` and is divided by
+    ``1 + log2(1 + demand)``, where ``demand`` is the weighted wishlist count
+    for the item (cart wishlists count extra). Items nobody watches wait
+    ``idle_factor`` times longer. Volatility is an exponential average of
+    whether recent fetches changed the item, and it shortens the interval
+    by up to half. ``pace`` scales every interval, e.g. on release days.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[str],
+        base_interval: float,
+        *,
+        min_interval: float = 15.0,
+        idle_factor: float = 8.0,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.idle_factor = idle_factor
+        self.smoothing = smoothing
+        self.demand: Optional[DemandFn] = None
+        self.pace: Optional[Callable[[], float]] = None
+        self._seq = itertools.count()
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._volatility: Dict[str, float] = {}
+        for item in dict.fromkeys(items):
+            self._schedule(item, 0.0)
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def take_due(
+        self, now: Optional[float] = None, *, fill_to: int = 1
+    ) -> List[str]:
+        """Pop items due by ``now``; top up to a multiple of ``fill_to``.
+
+        Topping up lets batched APIs spend a partially filled request on the
+        items that are due soonest. Every taken item must go back through
+        ``record``.
+        """
+        now = time.monotonic() if now is None else now
+        taken: List[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            item = self._pop()
+            if item is not None:
+                taken.append(item)
+        if taken and fill_to > 1:
+            while len(taken) % fill_to and self._heap:
+                item = self._pop()
+                if item is not None:
+                    taken.append(item)
+        return taken
+
+    def record(
+        self, item: str, *, changed: bool, now: Optional[float] = None
+    ) -> None:
+        now = time.monotonic() if now is None else now
+        previous = self._volatility.get(item, 0.0)
+        volatility = previous + self.smoothing * ((1.0 if changed else 0.0) - previous)
+        self._volatility[item] = volatility
+        self._schedule(item, now + self.interval_for(item))
+
+    def interval_for(self, item: str) -> float:
+        demand = self.demand(item) if self.demand is not None else 1.0
+        if demand <= 0:
+            factor = self.idle_factor
+        else:
+            factor = 1.0 / (1.0 + math.log2(1.0 + demand))
+        factor *= 1.0 - self._volatility.get(item, 0.0) / 2
+        if self.pace is not None:
+            factor *= self.pace()
+        return max(self.min_interval, self.base_interval * factor)
+
+    def next_due_in(self, now: Optional[float] = None) -> Optional[float]:
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(self._heap[0][0] - now, 0.0)
+
+    def _schedule(self, item: str, due: float) -> None:
+        self._due[item] = due
+        heapq.heappush(self._heap, (due, next(self._seq), item))
+
+    def _pop(self) -> Optional[str]:
+        due, _, item = heapq.heappop(self._heap)
+        if self._due.get(item) != due:
+            return None
+        del self._due[item]
+        return item
+
+
+__all__ = ["AdaptivePollScheduler", "ItemScheduler", "ReleaseCalendar"]
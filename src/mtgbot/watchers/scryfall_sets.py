@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from typing import List, Optional
 
 import aiohttp
 
+from mtgbot import codec
 from mtgbot.models import MagicSet
 
 log = logging.getLogger(__name__)
@@ -32,6 +34,28 @@ RELEVANT_SET_TYPES = {
 }
 
 
+@dataclass(slots=True)
+class _ScryfallSet:
+    """The fields of a Scryfall set object this watcher reads."""
+
+    id: str
+    code: str
+    name: str
+    set_type: Optional[str] = None
+    released_at: Optional[str] = None
+    scryfall_uri: str = ""
+    icon_svg_uri: Optional[str] = None
+
+
+@dataclass(slots=True)
+class _ScryfallSetPage:
+    data: List[_ScryfallSet] = field(default_factory=list)
+    next_page: Optional[str] = None
+
+
+_PAGE_DECODER = codec.Decoder(_ScryfallSetPage)
+
+
 class ScryfallSetWatcher:
     def __init__(self, session: aiohttp.ClientSession) -> None:
         self._session = session
@@ -48,33 +72,35 @@ class ScryfallSetWatcher:
                     if resp.status != 200:
                         log.warning("Scryfall sets endpoint returned %s", resp.status)
                         break
-                    payload = await resp.json()
+                    page = _PAGE_DECODER.decode(await resp.read())
             except aiohttp.ClientError as exc:
                 log.warning("Failed to fetch Scryfall sets: %s", exc)
                 break
+            except ValueError as exc:
+                log.warning("Scryfall sets page was malformed: %s", exc)
+                break
 
-            data = payload.get("data", [])
-            for item in data:
-                set_type = item.get("set_type")
+            for item in page.data:
+                set_type = item.set_type
                 if set_type not in RELEVANT_SET_TYPES:
                     continue
-                released_at = _parse_date(item.get("released_at"))
+                released_at = _parse_date(item.released_at)
                 if released_at and released_at < cutoff:
                     # Skip sets released over a year ago to reduce noise.
                     continue
                 magic_set = MagicSet(
-                    set_id=item["id"],
-                    code=item["code"],
-                    name=item["name"],
+                    set_id=item.id,
+                    code=item.code,
+                    name=item.name,
                     set_type=set_type or "unknown",
                     released_at=released_at,
-                    scryfall_uri=item.get("scryfall_uri", ""),
-                    icon_svg_uri=item.get("icon_svg_uri"),
+                    scryfall_uri=item.scryfall_uri,
+                    icon_svg_uri=item.icon_svg_uri,
                     observed_at=today,
                 )
                 seen.append(magic_set)
 
-            url = payload.get("next_page")
+            url = page.next_page
 
         return seen
 
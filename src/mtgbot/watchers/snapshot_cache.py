@@ -0,0 +1,178 @@
+"""Compact watcher diff caches that survive restarts."""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import math
+import sys
+from array import array
+from typing import Dict, Iterator, NamedTuple, Optional, Set, Tuple
+
+from mtgbot.models import ListingSnapshot
+from mtgbot.storage.snapshots import SnapshotRepository
+
+log = logging.getLogger(__name__)
+
+_NO_PRICE = math.nan
+
+
+class DiffState(NamedTuple):
+    """The part of a previous snapshot that diffing needs."""
+
+    price: Optional[float]
+    available: bool
+
+    def as_snapshot(self, current: ListingSnapshot) -> ListingSnapshot:
+        """Rebuild the previous snapshot from ``current`` for an event payload."""
+        return dataclasses.replace(
+            current, price=self.price, available=self.available
+        )
+
+
+_new_state = tuple.__new__
+
+
+class SnapshotCache:
+    """Last-seen price and availability per key, stored column-wise.
+
+    Keys are interned and map to a slot in parallel ``array('d')`` prices
+    (NaN for no price) and ``bytearray`` availability flags. That is roughly
+    a dict entry plus 9 bytes per listing, instead of a ListingSnapshot with
+    its CardSku, strings and metadata dict. ``get`` returns a ``DiffState``
+    and assigning a snapshot records only its price and availability.
+
+    With a SnapshotRepository the persisted state is loaded on the first
+    ``load()`` call (the first poll), so a restart diffs against the
+    pre-restart state. Only slots whose price or availability changed are
+    written on ``flush()``.
+    """
+
+    __slots__ = (
+        "namespace",
+        "_repository",
+        "_loaded",
+        "_slots",
+        "_keys",
+        "_prices",
+        "_available",
+        "_dirty",
+        "changes",
+    )
+
+    def __init__(
+        self, namespace: str, repository: Optional[SnapshotRepository] = None
+    ) -> None:
+        self.namespace = namespace
+        self._repository = repository
+        self._loaded = repository is None
+        self._slots: Dict[str, int] = {}
+        self._keys: list[str] = []
+        self._prices = array("d")
+        self._available = bytearray()
+        self._dirty: Set[int] = set()
+        self.changes = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def slot(self, key: str) -> int:
+        """Column index for ``key``, or -1 when it has not been seen."""
+        return self._slots.get(key, -1)
+
+    def columns(self) -> Tuple[array, bytearray]:
+        """The raw price and availability columns, indexed by ``slot()``.
+
+        For read-only bulk access; drop any buffer views before the next
+        write, since appending to an exported array raises BufferError.
+        """
+        return self._prices, self._available
+
+    def get(self, key: str) -> Optional[DiffState]:
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        price = self._prices[slot]
+        # NaN marks "no price"; tuple.__new__ skips NamedTuple's Python-level
+        # constructor on this per-listing hot path.
+        return _new_state(
+            DiffState, (price if price == price else None, self._available[slot] == 1)
+        )
+
+    def __setitem__(self, key: str, snapshot: ListingSnapshot) -> None:
+        slot = self._slots.get(key)
+        if (
+            slot is not None
+            and self._prices[slot] == snapshot.price
+            and self._available[slot] == snapshot.available
+        ):
+            return
+        self.set(key, snapshot.price, snapshot.available)
+
+    def set(self, key: str, price: Optional[float], available: bool) -> bool:
+        """Store the state for ``key``; returns True when it changed."""
+        value = _NO_PRICE if price is None else float(price)
+        flag = 1 if available else 0
+        slot = self._slots.get(key)
+        if slot is None:
+            key = sys.intern(key)
+            slot = self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            self._prices.append(value)
+            self._available.append(flag)
+        else:
+            current = self._prices[slot]
+            same_price = current == value or (current != current and value != value)
+            if same_price and self._available[slot] == flag:
+                return False
+            self._prices[slot] = value
+            self._available[slot] = flag
+        self.changes += 1
+        if self._repository is not None:
+            self._dirty.add(slot)
+        return True
+
+    async def load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            persisted = await self._repository.load(self.namespace)
+        except Exception as exc:
+            log.warning("Could not load %s snapshot cache: %s", self.namespace, exc)
+            return
+        for key, price, available in persisted:
+            if key not in self._slots:
+                self.set(key, price, available)
+        self._dirty.clear()
+        log.info("Loaded %d %s snapshots", len(persisted), self.namespace)
+
+    async def flush(self) -> int:
+        if self._repository is None or not self._dirty:
+            return 0
+        slots, self._dirty = self._dirty, set()
+        rows = []
+        for slot in slots:
+            price = self._prices[slot]
+            rows.append(
+                (
+                    self._keys[slot],
+                    None if math.isnan(price) else price,
+                    bool(self._available[slot]),
+                )
+            )
+        try:
+            return await self._repository.save(self.namespace, rows)
+        except Exception as exc:
+            log.warning("Could not persist %s snapshots: %s", self.namespace, exc)
+            self._dirty |= slots
+            return 0
+
+
+__all__ = ["DiffState", "SnapshotCache"]
@@ -4,23 +4,38 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Deque, Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
 import aiohttp
 
+from mtgbot import codec
 from mtgbot.models import CardSku, InventoryEvent, ListingSnapshot, Vendor
-from mtgbot.watchers.base import Watcher
+from mtgbot.storage.snapshots import SnapshotRepository
+from mtgbot.watchers.base import BufferedWatcher, DemandFn
+from mtgbot.watchers.diff import EventNames, PriceThresholds, SnapshotDiffer
+from mtgbot.watchers.limits import FetchLimiter
+from mtgbot.watchers.scheduling import ItemScheduler
 
 log = logging.getLogger(__name__)
 
 
-class TcgplayerWatcher(Watcher):
+@dataclass(slots=True)
+class _TokenResponse:
+    access_token: Optional[str] = None
+    expires_in: int = 0
+
+
+_TOKEN_DECODER = codec.Decoder(_TokenResponse)
+
+
+class TcgplayerWatcher(BufferedWatcher):
     """Polls TCGplayer pricing endpoints for SKU availability."""
 
     AUTH_URL = "https://api.tcgplayer.com/token"
-    SKU_URL = "https://api.tcgplayer.com/pricing/sku/{sku_id}"
+    SKU_URL = "https://api.tcgplayer.com/pricing/sku/{sku_ids}"
+    MAX_SKU_BATCH = 100
 
     def __init__(
         self,
@@ -29,42 +44,89 @@ class TcgplayerWatcher(Watcher):
         public_key: str,
         private_key: str,
         sku_whitelist: Iterable[str],
+        limiter: Optional[FetchLimiter] = None,
+        batch_size: int = MAX_SKU_BATCH,
+        snapshot_store: Optional[SnapshotRepository] = None,
+        thresholds: Optional[PriceThresholds] = None,
     ) -> None:
         super().__init__(Vendor.TCGPLAYER)
         self._session = session
         self._public_key = public_key
         self._private_key = private_key
         self._skus = [sku for sku in sku_whitelist if sku]
+        self._limiter = limiter or FetchLimiter()
+        self._batch_size = max(1, min(batch_size, self.MAX_SKU_BATCH))
         self.poll_interval = 120.0
-        self._pending: Deque[InventoryEvent] = deque()
-        self._cache: Dict[str, ListingSnapshot] = {}
+        self._schedule = ItemScheduler(self._skus, self.poll_interval)
+        self._cache = self._snapshot_cache_for("tcgplayer", snapshot_store)
+        self._differ = SnapshotDiffer(
+            self._cache,
+            EventNames.prefixed("tcgplayer"),
+            key=lambda snapshot: snapshot.sku.oracle_id,
+            wants=self._wants,
+            thresholds=thresholds,
+        )
         self._token: Optional[str] = None
         self._token_expiry: datetime = datetime.now(timezone.utc)
         self._token_lock = asyncio.Lock()
+        self._auth_failed = False
 
-    async def poll(self) -> Optional[InventoryEvent]:
-        if not self._skus:
-            log.debug("TCGplayer watcher has no SKU whitelist configured")
+    def set_demand(
+        self,
+        demand: Optional[DemandFn],
+        *,
+        pace: Optional[Callable[[], float]] = None,
+    ) -> None:
+        self._schedule.demand = demand
+        self._schedule.pace = pace
+
+    def next_poll_hint(self) -> Optional[float]:
+        if self._auth_failed:
+            # Every SKU is still due, so defer to the adaptive poll delay
+            # rather than retrying the token endpoint straight away.
             return None
+        return self._schedule.next_due_in()
 
-        if self._pending:
-            return self._pending.popleft()
+    async def _collect(self) -> List[InventoryEvent]:
+        if not self._skus:
+            log.debug("TCGplayer watcher has no SKU whitelist configured")
+            return []
 
         token = await self._ensure_token()
+        self._auth_failed = not token
         if not token:
-            return None
-
-        for sku in self._skus:
-            payload = await self._fetch_sku(token, sku)
-            if not payload:
-                continue
-            snapshot = self._snapshot_from_payload(sku, payload)
-            events = self._diff_snapshot(snapshot)
-            self._pending.extend(events)
-
-        if self._pending:
-            return self._pending.popleft()
-        return None
+            return []
+
+        # A partial batch costs a full request, so top it up with the SKUs
+        # that are due next.
+        skus = self._schedule.take_due(fill_to=self._batch_size)
+        if not skus:
+            return []
+        before = {sku: self._cache.get(sku) for sku in skus}
+        try:
+            batches = [
+                skus[start : start + self._batch_size]
+                for start in range(0, len(skus), self._batch_size)
+            ]
+            results = await self._limiter.gather(
+                batches,
+                lambda batch: self._fetch_skus(token, batch),
+                url=lambda batch: self.SKU_URL.format(sku_ids=batch[0]),
+            )
+            payloads: Dict[str, dict] = {}
+            for batch_result in results:
+                if batch_result:
+                    payloads.update(batch_result)
+
+            snapshots = [
+                self._snapshot_from_payload(sku, payloads[sku])
+                for sku in skus
+                if payloads.get(sku)
+            ]
+            return self._differ.diff(snapshots)
+        finally:
+            for sku in skus:
+                self._schedule.record(sku, changed=self._cache.get(sku) != before[sku])
 
     async def _ensure_token(self) -> Optional[str]:
         async with self._token_lock:
@@ -85,13 +147,16 @@ class TcgplayerWatcher(Watcher):
                             "TCGplayer auth failed with status %s", resp.status
                         )
                         return None
-                    data = await resp.json()
+                    data = _TOKEN_DECODER.decode(await resp.read())
             except aiohttp.ClientError as exc:
                 log.warning("TCGplayer auth request failed: %s", exc)
                 return None
+            except ValueError as exc:
+                log.warning("TCGplayer auth response malformed: %s", exc)
+                return None
 
-            token = data.get("access_token")
-            expires = data.get("expires_in", 0)
+            token = data.access_token
+            expires = data.expires_in
             if not token:
                 log.warning("TCGplayer auth response missing token")
                 return None
@@ -99,8 +164,11 @@ class TcgplayerWatcher(Watcher):
             self._token_expiry = now + timedelta(seconds=int(expires) - 30)
             return token
 
-    async def _fetch_sku(self, token: str, sku_id: str) -> Optional[dict]:
-        url = self.SKU_URL.format(sku_id=sku_id)
+    async def _fetch_skus(
+        self, token: str, sku_ids: List[str]
+    ) -> Dict[str, dict]:
+        """Fetch pricing for a batch of SKUs, keyed by ``skuId``."""
+        url = self.SKU_URL.format(sku_ids=",".join(sku_ids))
         headers = {
             "Authorization": f"bearer {token}",
             "Accept": "application/json",
@@ -108,16 +176,29 @@ class TcgplayerWatcher(Watcher):
         try:
             async with self._session.get(url, headers=headers) as resp:
                 if resp.status != 200:
-                    log.debug("TCGplayer SKU %s returned %s", sku_id, resp.status)
-                    return None
-                data = await resp.json()
+                    log.debug(
+                        "TCGplayer SKU batch of %d returned %s",
+                        len(sku_ids),
+                        resp.status,
+                    )
+                    return {}
+                data = await codec.read_json(resp)
         except aiohttp.ClientError as exc:
-            log.debug("TCGplayer SKU fetch failed for %s: %s", sku_id, exc)
-            return None
-        results = data.get("results")
-        if not results:
-            return None
-        return results[0]
+            log.debug("TCGplayer SKU batch fetch failed: %s", exc)
+            return {}
+        except ValueError:
+            log.debug("TCGplayer SKU batch of %d returned invalid JSON", len(sku_ids))
+            return {}
+        payloads: Dict[str, dict] = {}
+        for result in data.get("results") or []:
+            sku_id = result.get("skuId")
+            if sku_id is None:
+                continue
+            payloads[str(sku_id)] = result
+        if len(sku_ids) == 1 and not payloads and data.get("results"):
+            # Single-SKU responses may omit skuId; fall back to position.
+            payloads[sku_ids[0]] = data["results"][0]
+        return payloads
 
     def _snapshot_from_payload(self, sku_id: str, payload: dict) -> ListingSnapshot:
         product_id = payload.get("productId")
@@ -156,41 +237,3 @@ class TcgplayerWatcher(Watcher):
                 "quantity": quantity,
             },
         )
-
-    def _diff_snapshot(self, snapshot: ListingSnapshot) -> List[InventoryEvent]:
-        key = snapshot.sku.oracle_id
-        previous = self._cache.get(key)
-        events: List[InventoryEvent] = []
-
-        if previous is None:
-            events.append(
-                InventoryEvent(
-                    snapshot=snapshot,
-                    previous_snapshot=None,
-                    event_type="tcgplayer_listing",
-                    delta_price=None,
-                )
-            )
-        else:
-            event_type = None
-            delta_price: Optional[float] = None
-            if snapshot.available and not previous.available:
-                event_type = "tcgplayer_restock"
-            elif snapshot.available != previous.available:
-                event_type = "tcgplayer_availability_change"
-            elif abs(snapshot.price - previous.price) >= 0.01:
-                event_type = "tcgplayer_price_change"
-                delta_price = snapshot.price - previous.price
-
-            if event_type:
-                events.append(
-                    InventoryEvent(
-                        snapshot=snapshot,
-                        previous_snapshot=previous,
-                        event_type=event_type,
-                        delta_price=delta_price,
-                    )
-                )
-
-        self._cache[key] = snapshot
-        return events
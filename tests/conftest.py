@@ -0,0 +1,40 @@
+from typing import Any, Optional
+
+import pytest
+
+from mtgbot.config import (
+    DatabaseSettings,
+    DiscordSettings,
+    PollingSettings,
+    ScheduleSettings,
+    Settings,
+    VendorSettings,
+)
+
+
+class FakeWishlists:
+    """Stands in for WishlistService where only role mentions are read."""
+
+    def resolve_role_mentions(self, tags: Any) -> Optional[str]:
+        return None
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return Settings(
+        discord=DiscordSettings(
+            token="",
+            application_id=None,
+            guild_id=None,
+            release_channel_id=1234,
+        ),
+        database=DatabaseSettings(None, None, ":memory:"),
+        polling=PollingSettings(),
+        vendors=VendorSettings([], [], None, None, [], None),
+        schedule=ScheduleSettings(),
+    )
+
+
+@pytest.fixture
+def wishlists() -> FakeWishlists:
+    return FakeWishlists()
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+from collections import Counter
+from typing import Dict
+
+import aiohttp
+from aiohttp import web
+
+from mtgbot.watchers.card_kingdom import CardKingdomWatcher
+from mtgbot.watchers.card_kingdom_parsers import parse_stream
+
+PAGE_SIZE = 3
+
+
+def _page(number: int, pages: int) -> str:
+    if number > pages:
+        return "<html><body><p>No results</p></body></html>"
+    rows = []
+    for offset in range(PAGE_SIZE):
+        index = (number - 1) * PAGE_SIZE + offset
+        rows.append(
+            f'<div class="productItemWrapper" data-product-id="{index}" '
+            f'data-product-sku="SKU{index}" data-price="{index + 0.99:.2f}">'
+            f'<div class="productCardHeader"><a href="/mtg/card-{index}">'
+            f"Card {index}</a></div>"
+            '<span class="productStatus">In Stock</span></div>'
+        )
+    return f"<html><body>{''.join(rows)}</body></html>"
+
+
+class Catalog:
+    def __init__(self, pages: int) -> None:
+        self.pages = pages
+        self.requests: Counter = Counter()
+        self.full_bodies: Counter = Counter()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        number = int(request.query.get("page", "1"))
+        self.requests[number] += 1
+        body = _page(number, self.pages)
+        etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        self.full_bodies[number] += 1
+        return web.Response(text=body, content_type="text/html", headers={"ETag": etag})
+
+
+async def _crawl(catalog: Catalog, check, **kwargs: int) -> None:
+    app = web.Application()
+    app.router.add_get(CardKingdomWatcher.PREORDER_PATH, catalog.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            watcher = CardKingdomWatcher(session, parser="stream", **kwargs)
+            watcher.BASE_URL = f"http://127.0.0.1:{port}"
+            await check(watcher)
+    finally:
+        await runner.cleanup()
+
+
+def test_crawl_stops_at_end_of_catalog_then_at_unchanged_page():
+    catalog = Catalog(pages=3)
+
+    async def check(watcher: CardKingdomWatcher) -> None:
+        events = await watcher.poll_batch()
+        assert len(events) == 3 * PAGE_SIZE
+        # Windows of two: pages 1-2, then 3-4 where page 4 is empty.
+        assert sorted(catalog.requests) == [1, 2, 3, 4]
+
+        catalog.requests.clear()
+        assert await watcher.poll_batch() == []
+        # Page 1 came back unchanged, so the crawl ended with its window.
+        assert sorted(catalog.requests) == [1, 2]
+        assert catalog.full_bodies[1] == 1
+
+    asyncio.run(_crawl(catalog, check, page_concurrency=2, max_pages=10))
+
+
+def test_max_pages_bounds_the_crawl():
+    catalog = Catalog(pages=10)
+
+    async def check(watcher: CardKingdomWatcher) -> None:
+        events = await watcher.poll_batch()
+        assert len(events) == 4 * PAGE_SIZE
+        assert sorted(catalog.requests) == [1, 2, 3, 4]
+
+    asyncio.run(_crawl(catalog, check, page_concurrency=3, max_pages=4))
+
+
+def test_page_that_failed_to_parse_is_fetched_again_in_full():
+    catalog = Catalog(pages=1)
+    calls: Dict[str, int] = {"parse": 0}
+
+    def flaky_parse(html: str):
+        calls["parse"] += 1
+        if calls["parse"] == 1:
+            raise ValueError("markup changed")
+        return parse_stream(html)
+
+    async def check(watcher: CardKingdomWatcher) -> None:
+        watcher._parse_nodes = flaky_parse
+        assert await watcher.poll_batch() == []
+        events = await watcher.poll_batch()
+        assert len(events) == PAGE_SIZE
+        assert catalog.full_bodies[1] == 2
+
+    asyncio.run(_crawl(catalog, check, page_concurrency=1, max_pages=5))
+
+
+def test_failed_page_keeps_events_from_the_rest_of_the_window():
+    catalog = Catalog(pages=2)
+    failed = []
+
+    def parse_failing_second_page(html: str):
+        if "card-3" in html and not failed:
+            failed.append(True)
+            raise TimeoutError("total timeout")
+        return parse_stream(html)
+
+    async def check(watcher: CardKingdomWatcher) -> None:
+        watcher._parse_nodes = parse_failing_second_page
+        events = await watcher.poll_batch()
+        assert sorted(event.snapshot.title for event in events) == [
+            "Card 0",
+            "Card 1",
+            "Card 2",
+        ]
+        # Page 2 was never committed, so the next cycle diffs it in full.
+        events = await watcher.poll_batch()
+        assert sorted(event.snapshot.title for event in events) == [
+            "Card 3",
+            "Card 4",
+            "Card 5",
+        ]
+        assert catalog.full_bodies == {1: 1, 2: 2}
+
+    asyncio.run(_crawl(catalog, check, page_concurrency=2, max_pages=5))
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+
+from mtgbot.watchers.card_kingdom_parsers import available_backends, parse_stream
+
+FIXTURE = Path(__file__).parent / "fixtures" / "card_kingdom_preorders.html"
+
+
+@pytest.fixture(scope="module")
+def page() -> str:
+    return FIXTURE.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("backend", sorted(available_backends()))
+def test_backends_match_stream_parser(page, backend):
+    assert available_backends()[backend](page) == parse_stream(page)
+
+
+def test_fixture_products(page):
+    nodes = parse_stream(page)
+    assert [node.attrs["data-product-id"] for node in nodes] == [
+        "301",
+        "302",
+        "303",
+        "304",
+        "305",
+    ]
+    # An element carrying several status classes is reported once.
+    assert nodes[0].status_texts == ["In Stock", "Ships 9/27Limit 4"]
+    assert nodes[3].status_texts == ["Preorder"]
+    assert nodes[1].title == "Duskmourn & FriendsCollectorBox"
+    assert (nodes[4].href, nodes[4].title) == (None, None)
+
+
+def test_empty_page_has_no_products():
+    for parse in available_backends().values():
+        assert parse("") == []
@@ -0,0 +1,101 @@
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+import pytest
+
+from mtgbot import codec
+from mtgbot.watchers.scryfall_sets import _PAGE_DECODER
+
+
+@dataclass(slots=True)
+class Price:
+    amount: float
+    currency: str = "USD"
+
+
+@dataclass(slots=True)
+class Listing:
+    sku: int
+    name: str
+    prices: List[Price] = field(default_factory=list)
+    note: Optional[str] = None
+    code: Union[int, str] = 0
+
+
+def test_round_trip_is_compact_utf8():
+    payload = {"name": "Æther Vial", "prices": [1.5, None], "ok": True}
+    body = codec.dumps(payload)
+    assert isinstance(body, bytes)
+    assert b" " not in body.replace("Æther Vial".encode(), b"")
+    assert codec.loads(body) == payload
+    assert codec.loads(body.decode()) == payload
+    assert codec.dumps_text(payload) == body.decode()
+
+
+def test_malformed_json_raises_value_error():
+    with pytest.raises(ValueError):
+        codec.loads(b'{"truncated": ')
+
+
+def test_stdlib_fallback_matches_active_backend():
+    payload = {"a": [1, 2.5, "x"], "b": {"c": None}}
+    assert json.loads(codec._json_dumps(payload)) == codec.loads(codec.dumps(payload))
+
+
+def test_decoder_builds_nested_dataclasses():
+    decoder = codec.Decoder(Listing)
+    listing = decoder.decode(
+        b'{"sku": 7, "name": "Box", "prices": [{"amount": 3}], "extra": 1,'
+        b' "code": "A1"}'
+    )
+    assert listing == Listing(sku=7, name="Box", prices=[Price(3.0)], code="A1")
+    assert isinstance(listing.prices[0].amount, float)
+
+
+def test_decoder_decodes_lists():
+    decoder = codec.Decoder(List[Price])
+    assert decoder.decode(b'[{"amount": 1.25, "currency": "EUR"}]') == [
+        Price(1.25, "EUR")
+    ]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"name": "missing sku"}',
+        b'{"sku": "7", "name": "wrong type"}',
+        b'{"sku": true, "name": "bool is not int"}',
+        b'{"sku": 1, "name": "x", "prices": {}}',
+        b"[]",
+    ],
+)
+def test_decoder_rejects_mismatches(body):
+    with pytest.raises(ValueError):
+        codec.Decoder(Listing).decode(body)
+
+
+def test_scryfall_page_decoder():
+    page = _PAGE_DECODER.decode(
+        codec.dumps(
+            {
+                "object": "list",
+                "has_more": False,
+                "data": [
+                    {
+                        "object": "set",
+                        "id": "abc",
+                        "code": "tst",
+                        "name": "Test Set",
+                        "released_at": "2026-11-14",
+                        "set_type": "expansion",
+                        "card_count": 280,
+                    }
+                ],
+            }
+        )
+    )
+    assert page.next_page is None
+    (magic_set,) = page.data
+    assert (magic_set.code, magic_set.released_at) == ("tst", "2026-11-14")
+    assert magic_set.icon_svg_uri is None
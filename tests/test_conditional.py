@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from mtgbot.watchers.conditional import ConditionalFetcher
+
+ETAG = '"v1"'
+
+
+async def _serve(handler_state: Dict[str, object], check):
+    seen: List[Dict[str, str]] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        seen.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == handler_state["etag"]:
+            return web.Response(status=304)
+        return web.Response(
+            body=handler_state["body"], headers={"ETag": handler_state["etag"]}
+        )
+
+    app = web.Application()
+    app.router.add_get("/feed", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            url = f"http://127.0.0.1:{port}/feed"
+            await check(ConditionalFetcher(session), url, seen)
+    finally:
+        await runner.cleanup()
+
+
+def test_validators_wait_for_commit():
+    state = {"etag": ETAG, "body": b'{"products": []}'}
+
+    async def check(fetcher, url, seen):
+        first = await fetcher.get(url)
+        assert first.text == '{"products": []}'
+        # The caller never committed (say the parse failed): fetch in full.
+        second = await fetcher.get(url)
+        assert "If-None-Match" not in seen[1]
+        assert second.text == '{"products": []}'
+        fetcher.commit(url)
+        third = await fetcher.get(url)
+        assert seen[2]["If-None-Match"] == ETAG
+        assert third.not_modified
+
+    asyncio.run(_serve(state, check))
+
+
+def test_uncommitted_body_is_not_reported_unchanged():
+    state = {"etag": ETAG, "body": b"garbage"}
+
+    async def check(fetcher, url, seen):
+        await fetcher.get(url)
+        state["etag"] = '"v2"'
+        again = await fetcher.get(url)
+        assert not again.not_modified
+        assert again.text == "garbage"
+        assert fetcher.unchanged_body_count == 0
+
+    asyncio.run(_serve(state, check))
+
+
+def test_stream_holds_validators_until_commit():
+    state = {"etag": ETAG, "body": b"x" * 1000}
+
+    async def check(fetcher, url, seen):
+        async with fetcher.stream(url) as resp:
+            assert await resp.read() == b"x" * 1000
+        async with fetcher.stream(url) as resp:
+            assert not resp.not_modified
+            await resp.read()
+        fetcher.commit(url)
+        async with fetcher.stream(url) as resp:
+            assert resp.not_modified
+
+    asyncio.run(_serve(state, check))
+
+
+def test_forget_drops_pending_validators():
+    state = {"etag": ETAG, "body": b"body"}
+
+    async def check(fetcher, url, seen):
+        await fetcher.get(url)
+        fetcher.forget(url)
+        fetcher.commit(url)
+        await fetcher.get(url)
+        assert "If-None-Match" not in seen[1]
+
+    asyncio.run(_serve(state, check))
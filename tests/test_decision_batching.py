@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from mtgbot.bot import DecisionEngine, decision_worker
+from mtgbot.metrics import ThroughputMeter
+from mtgbot.models import (
+    ActionType,
+    CardSku,
+    InventoryEvent,
+    ListingSnapshot,
+    Vendor,
+    WishlistEntry,
+)
+from mtgbot.notifications.discord_bot import MtgDiscordBot
+
+
+class FakeChannel:
+    def __init__(self) -> None:
+        self.sent: List[Dict[str, Any]] = []
+
+    async def send(self, **kwargs: Any) -> Dict[str, Any]:
+        self.sent.append(kwargs)
+        return kwargs
+
+
+def _event(oracle_id: str) -> InventoryEvent:
+    snapshot = ListingSnapshot(
+        vendor=Vendor.CARD_KINGDOM,
+        sku=CardSku(oracle_id=oracle_id, product_code=oracle_id, finish="nonfoil"),
+        title=f"Card {oracle_id}",
+        url=f"https://example.com/{oracle_id}",
+        price=5.0,
+        currency="USD",
+        available=True,
+        observed_at=datetime.now(timezone.utc),
+    )
+    return InventoryEvent(snapshot, None, "restock")
+
+
+def test_worker_sends_waiting_events_as_one_batch(settings, wishlists):
+    async def scenario() -> FakeChannel:
+        channel = FakeChannel()
+        bot = MtgDiscordBot(settings, wishlists)
+        calls: List[int] = []
+        send_decisions = bot.send_decisions
+
+        async def ready() -> None:
+            return None
+
+        async def record(decisions):
+            decisions = list(decisions)
+            calls.append(len(decisions))
+            return await send_decisions(decisions)
+
+        bot.wait_until_ready = ready
+        bot.get_channel = lambda channel_id: channel
+        bot.send_decisions = record
+
+        engine = DecisionEngine()
+        queue: asyncio.Queue[InventoryEvent] = asyncio.Queue()
+        for index in range(6):
+            oracle_id = f"card-{index}"
+            engine.register(
+                WishlistEntry(
+                    discord_user_id=100 + index,
+                    sku=CardSku(oracle_id=oracle_id, product_code="", finish="any"),
+                    max_price=10.0,
+                    action_preference=ActionType.NOTIFY,
+                )
+            )
+            queue.put_nowait(_event(oracle_id))
+
+        worker = asyncio.create_task(
+            decision_worker(queue, engine, bot, ThroughputMeter())
+        )
+        await queue.join()
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        assert calls == [6]
+        await bot.close()
+        return channel
+
+    channel = asyncio.run(scenario())
+    assert len(channel.sent) == 1
+    assert len(channel.sent[0]["embeds"]) == 6
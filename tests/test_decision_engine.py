@@ -0,0 +1,147 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from mtgbot.bot import CART_DEMAND_WEIGHT, DecisionEngine
+from mtgbot.models import (
+    ActionType,
+    CardSku,
+    InventoryEvent,
+    ListingSnapshot,
+    Vendor,
+    WishlistEntry,
+)
+
+
+def _entry(
+    user_id: int,
+    max_price: Optional[float],
+    vendors: Optional[List[Vendor]] = None,
+    oracle_id: str = "card",
+    action: ActionType = ActionType.NOTIFY,
+) -> WishlistEntry:
+    return WishlistEntry(
+        discord_user_id=user_id,
+        sku=CardSku(oracle_id=oracle_id, product_code="", finish="any"),
+        max_price=max_price,
+        action_preference=action,
+        preferred_vendors=vendors or [],
+    )
+
+
+def _event(price: float, vendor: Vendor = Vendor.CARD_KINGDOM) -> InventoryEvent:
+    snapshot = ListingSnapshot(
+        vendor=vendor,
+        sku=CardSku(oracle_id="card", product_code="card", finish="nonfoil"),
+        title="Card",
+        url="https://example.com/card",
+        price=price,
+        currency="USD",
+        available=True,
+        observed_at=datetime.now(timezone.utc),
+    )
+    return InventoryEvent(snapshot, None, "restock")
+
+
+def _matched(engine: DecisionEngine, event: InventoryEvent) -> List[int]:
+    return sorted(
+        decision.wishlist.discord_user_id for decision in engine.evaluate(event)
+    )
+
+
+def test_vendor_filtering():
+    engine = DecisionEngine()
+    engine.reset(
+        [
+            _entry(1, None),
+            _entry(2, None, [Vendor.CARD_KINGDOM]),
+            _entry(3, None, [Vendor.TCGPLAYER]),
+            _entry(4, None, [Vendor.TCGPLAYER, Vendor.CARD_KINGDOM]),
+        ]
+    )
+    assert _matched(engine, _event(5.0, Vendor.CARD_KINGDOM)) == [1, 2, 4]
+    assert _matched(engine, _event(5.0, Vendor.TCGPLAYER)) == [1, 3, 4]
+    assert _matched(engine, _event(5.0, Vendor.LOCAL_STORE)) == [1]
+
+
+def test_price_cap_boundary_and_uncapped_entries():
+    engine = DecisionEngine()
+    engine.reset(
+        [
+            _entry(1, 10.0),
+            _entry(2, 9.99),
+            _entry(3, None),
+            _entry(4, 10.0, [Vendor.CARD_KINGDOM]),
+        ]
+    )
+    assert _matched(engine, _event(10.0)) == [1, 3, 4]
+    assert _matched(engine, _event(10.01)) == [3]
+    assert _matched(engine, _event(0.0)) == [1, 2, 3, 4]
+    assert _matched(engine, _event(1e9)) == [3]
+
+
+def test_unwatched_card_yields_nothing():
+    engine = DecisionEngine()
+    engine.register(_entry(1, None, oracle_id="other"))
+    assert _matched(engine, _event(1.0)) == []
+
+
+def test_buckets_rebuild_after_watch_changes():
+    engine = DecisionEngine()
+    engine.register(_entry(1, 5.0))
+    engine.register(_entry(2, None, [Vendor.TCGPLAYER]))
+    assert _matched(engine, _event(4.0)) == [1]
+
+    # Raising a cap, switching vendors and adding a watcher all take effect.
+    engine.register(_entry(1, 20.0))
+    engine.register(_entry(2, None, [Vendor.CARD_KINGDOM]))
+    engine.register(_entry(3, 15.0))
+    assert _matched(engine, _event(10.0)) == [1, 2, 3]
+
+    engine.unregister(1, "card")
+    assert _matched(engine, _event(10.0)) == [2, 3]
+    engine.unregister(2, "card")
+    engine.unregister(3, "card")
+    assert _matched(engine, _event(10.0)) == []
+
+    engine.register(_entry(4, 10.0))
+    assert _matched(engine, _event(10.0)) == [4]
+
+
+def test_replacing_a_watch_updates_demand():
+    engine = DecisionEngine()
+    engine.register(_entry(1, None, action=ActionType.NOTIFY))
+    engine.register(_entry(1, 5.0, action=ActionType.CART))
+    assert engine.demand("card") == CART_DEMAND_WEIGHT
+    engine.register(_entry(1, 5.0, action=ActionType.NOTIFY))
+    assert engine.demand("card") == 1.0
+    engine.register(_entry(2, None, action=ActionType.CART))
+    engine.register(_entry(2, None, action=ActionType.CART))
+    assert engine.demand("card") == 1.0 + CART_DEMAND_WEIGHT
+
+
+def test_unregistering_last_watcher_clears_demand():
+    engine = DecisionEngine()
+    engine.register(_entry(1, None, action=ActionType.CART))
+    engine.register(_entry(2, None, oracle_id="other"))
+    engine.unregister(1, "card")
+    assert engine.demand("card") == 0.0
+    assert not engine.watches("card")
+    assert engine.demand("other") == 1.0
+
+    # A fresh watch starts from zero rather than stale leftovers.
+    engine.register(_entry(3, None))
+    assert engine.demand("card") == 1.0
+    assert engine.watches("card")
+
+
+def test_unregistering_unknown_user_changes_nothing():
+    engine = DecisionEngine()
+    engine.register(_entry(1, None, action=ActionType.CART))
+    engine.unregister(2, "card")
+    engine.unregister(1, "missing")
+    engine.unregister(2, "missing")
+    assert engine.demand("card") == CART_DEMAND_WEIGHT
+    assert engine.watches("card")
+    assert not engine.watches("missing")
+    assert engine.demand("missing") == 0.0
+    assert _matched(engine, _event(1.0)) == [1]
@@ -0,0 +1,140 @@
+import random
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import pytest
+
+from mtgbot.models import CardSku, ListingSnapshot, Vendor
+from mtgbot.watchers import diff
+from mtgbot.watchers.diff import (
+    EventNames,
+    PriceThreshold,
+    PriceThresholds,
+    SnapshotDiffer,
+)
+from mtgbot.watchers.snapshot_cache import SnapshotCache
+
+NAMES = EventNames.prefixed("test")
+
+
+def _snapshot(
+    key: str,
+    price: Optional[float],
+    available: bool,
+    vendor: Vendor = Vendor.CARD_KINGDOM,
+) -> ListingSnapshot:
+    return ListingSnapshot(
+        vendor=vendor,
+        sku=CardSku(oracle_id=key, product_code=key, finish="nonfoil"),
+        title=key,
+        url=f"https://example.com/{key}",
+        price=price,
+        currency="USD",
+        available=available,
+        observed_at=datetime.now(timezone.utc),
+    )
+
+
+def _differ(vectorize_min: int, thresholds=None) -> SnapshotDiffer:
+    return SnapshotDiffer(
+        SnapshotCache("test"),
+        NAMES,
+        key=lambda snapshot: snapshot.sku.oracle_id,
+        wants=lambda snapshot: True,
+        thresholds=thresholds,
+        vectorize_min=vectorize_min,
+    )
+
+
+def _summary(events) -> List[tuple]:
+    return [
+        (
+            event.snapshot.sku.oracle_id,
+            event.event_type,
+            event.delta_price,
+            event.previous_snapshot.price if event.previous_snapshot else None,
+        )
+        for event in events
+    ]
+
+
+def test_event_types():
+    differ = _differ(vectorize_min=10**9)
+    first = [
+        _snapshot("new", 5.0, True),
+        _snapshot("restock", 5.0, False),
+        _snapshot("gone", 5.0, True),
+        _snapshot("cheaper", 5.0, True),
+        _snapshot("same", 5.0, True),
+    ]
+    assert [event.event_type for event in differ.diff(first)] == [NAMES.new] * 5
+
+    second = [
+        _snapshot("restock", 5.0, True),
+        _snapshot("gone", 5.0, False),
+        _snapshot("cheaper", 4.0, True),
+        _snapshot("same", 5.0, True),
+    ]
+    assert _summary(differ.diff(second)) == [
+        ("restock", NAMES.restock, None, 5.0),
+        ("gone", NAMES.availability, None, 5.0),
+        ("cheaper", NAMES.price, -1.0, 5.0),
+    ]
+
+
+def test_thresholds_need_absolute_and_percent_move():
+    thresholds = PriceThresholds(
+        PriceThreshold(absolute=0.5, percent=10.0),
+        {"tcgplayer": PriceThreshold(absolute=0.01)},
+    )
+    differ = _differ(vectorize_min=10**9, thresholds=thresholds)
+    differ.diff(
+        [
+            _snapshot("small", 10.0, True),
+            _snapshot("big", 10.0, True),
+            _snapshot("tcg", 10.0, True, vendor=Vendor.TCGPLAYER),
+        ]
+    )
+    events = differ.diff(
+        [
+            _snapshot("small", 9.4, True),
+            _snapshot("big", 8.5, True),
+            _snapshot("tcg", 9.98, True, vendor=Vendor.TCGPLAYER),
+        ]
+    )
+    assert [event.snapshot.sku.oracle_id for event in events] == ["big", "tcg"]
+
+
+def test_threshold_settings_parse_default_and_vendor():
+    thresholds = PriceThresholds.from_settings(
+        {"default": (1.0, 5.0), "tcgplayer": (0.1, 0.0)}
+    )
+    assert thresholds.for_vendor("card_kingdom") == PriceThreshold(1.0, 5.0)
+    assert thresholds.for_vendor("tcgplayer") == PriceThreshold(0.1, 0.0)
+
+
+@pytest.mark.skipif(diff.np is None, reason="numpy not installed")
+def test_vectorized_matches_scalar():
+    rng = random.Random(7)
+    keys = [f"card-{index}" for index in range(300)]
+
+    def batch() -> List[ListingSnapshot]:
+        chosen = rng.sample(keys, 200)
+        return [
+            _snapshot(
+                key,
+                rng.choice([None, 1.0, 1.005, 2.0, 10.0]),
+                rng.random() < 0.5,
+            )
+            for key in chosen
+        ]
+
+    scalar = _differ(vectorize_min=10**9)
+    vectorized = _differ(vectorize_min=1)
+    for _ in range(5):
+        snapshots = batch()
+        assert _summary(vectorized.diff(snapshots)) == _summary(
+            scalar.diff(snapshots)
+        )
+    for key in keys:
+        assert vectorized._cache.get(key) == scalar._cache.get(key)
@@ -0,0 +1,141 @@
+import asyncio
+import gzip
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from mtgbot.watchers import local_store
+from mtgbot.watchers.feed_stream import FeedStreamParser
+from mtgbot.watchers.local_store import PhoenixLocalStoreWatcher
+
+
+def _feed(count: int) -> dict:
+    return {
+        "store": "Test Store",
+        "products": [
+            {"id": index, "name": f"Box {index}", "price": 10.5, "available": True}
+            for index in range(1, count + 1)
+        ],
+        "updated": "2026-01-01",
+    }
+
+
+def test_parser_handles_any_chunk_boundary():
+    body = json.dumps(_feed(3))
+    for size in (1, 2, 7, len(body)):
+        parser = FeedStreamParser("products")
+        items = []
+        for start in range(0, len(body), size):
+            items.extend(parser.feed(body[start : start + size]))
+        parser.close()
+        assert items == _feed(3)["products"]
+        assert parser.header == {"store": "Test Store", "updated": "2026-01-01"}
+
+
+def test_parser_rejects_truncated_feed():
+    parser = FeedStreamParser("products")
+    parser.feed('{"store": "x", "products": [{"id": 1}')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_parser_rejects_non_object():
+    with pytest.raises(ValueError):
+        FeedStreamParser().feed("[1, 2]")
+
+
+async def _collect(body: bytes, *, gzipped: bool, stream_min_bytes: int):
+    async def handler(request: web.Request) -> web.Response:
+        if gzipped:
+            return web.Response(
+                body=gzip.compress(body),
+                headers={"Content-Encoding": "gzip"},
+                content_type="application/json",
+            )
+        return web.Response(body=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/feed.json", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            watcher = PhoenixLocalStoreWatcher(
+                session,
+                [f"http://127.0.0.1:{port}/feed.json"],
+                stream_min_bytes=stream_min_bytes,
+            )
+            return await watcher.poll_batch()
+    finally:
+        await runner.cleanup()
+
+
+def test_small_feed_is_decoded_whole():
+    body = json.dumps(_feed(5)).encode()
+    events = asyncio.run(_collect(body, gzipped=False, stream_min_bytes=1 << 20))
+    assert len(events) == 5
+
+
+def test_gzip_feed_streams_by_decoded_size(monkeypatch):
+    body = json.dumps(_feed(2000)).encode()
+    assert len(gzip.compress(body)) < 64 * 1024 < len(body)
+
+    def whole_decode(data):
+        raise AssertionError("large feed was decoded in one go")
+
+    monkeypatch.setattr(local_store.codec, "loads", whole_decode)
+    events = asyncio.run(_collect(body, gzipped=True, stream_min_bytes=64 * 1024))
+    assert len(events) == 2000
+    assert events[0].snapshot.sku.oracle_id == "test-store-1"
+
+
+def test_stream_cut_off_keeps_events_already_diffed():
+    feed = _feed(40)
+    body = json.dumps(feed).encode()
+    cut = body.index(b'{"id": 21')
+    state = {"stall": True}
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        if not state["stall"]:
+            return web.Response(body=body, content_type="application/json")
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        for part in (body[: cut // 2], body[cut // 2 : cut]):
+            await response.write(part)
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(1)
+        return response
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/feed.json", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        timeout = aiohttp.ClientTimeout(total=0.3)
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                watcher = PhoenixLocalStoreWatcher(
+                    session,
+                    [f"http://127.0.0.1:{port}/feed.json"],
+                    stream_min_bytes=64,
+                )
+                cut_off = await watcher.poll_batch()
+                state["stall"] = False
+                rest = await watcher.poll_batch()
+                return cut_off, rest
+        finally:
+            await runner.cleanup()
+
+    cut_off, rest = asyncio.run(scenario())
+    assert cut_off
+    # Nothing is lost: the uncommitted feed is diffed in full next cycle.
+    ids = [event.snapshot.sku.oracle_id for event in cut_off + rest]
+    assert sorted(ids) == sorted(f"test-store-{index}" for index in range(1, 41))
@@ -0,0 +1,202 @@
+import asyncio
+import gzip
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from mtgbot import codec
+from mtgbot.tools.gamers_guild_feed import (
+    COLLECTION_PATH,
+    PAGE_LIMIT,
+    FeedCache,
+    NormalizedCache,
+    Product,
+    _delta_response,
+    _feed_response,
+    fetch_products,
+)
+
+
+def _product(product_id: str, price: float = 100.0) -> Product:
+    return Product(
+        product_id=product_id,
+        name=f"Box {product_id}",
+        price=price,
+        available=True,
+        url=f"https://gamersguildaz.com/products/{product_id}",
+        tags=["Magic: The Gathering"],
+        image=None,
+    )
+
+
+def _ids(payload: dict) -> list:
+    return [product["id"] for product in payload["products"]]
+
+
+def test_unchanged_refresh_keeps_version_and_etag():
+    cache = FeedCache()
+    assert cache.update([_product("a"), _product("b")])
+    version, etag = cache.version, cache.etag
+    assert not cache.update([_product("a"), _product("b")])
+    assert (cache.version, cache.etag) == (version, etag)
+    assert codec.loads(gzip.decompress(cache.bodies["gzip"])) == codec.loads(
+        cache.bodies["identity"]
+    )
+
+
+def test_delta_lists_changes_and_removals():
+    cache = FeedCache()
+    cache.update([_product("a"), _product("b")])
+    since = cache.version
+    cache.update([_product("a", price=90.0), _product("c")])
+
+    delta = cache.delta(since)
+    assert not delta["full"]
+    assert sorted(_ids(delta)) == ["a", "c"]
+    assert delta["removed"] == ["b"]
+    assert cache.delta(cache.version)["products"] == []
+
+
+def test_delta_is_full_when_client_is_too_far_behind():
+    cache = FeedCache(history=2)
+    for price in (1.0, 2.0, 3.0, 4.0):
+        cache.update([_product("a", price=price)])
+    delta = cache.delta(0)
+    assert delta["full"]
+    assert _ids(delta) == ["a"]
+
+
+def test_delta_is_full_after_server_restart():
+    cache = FeedCache()
+    cache.update([_product("a"), _product("b")])
+    # The client last saw version 40 from the previous server process.
+    delta = cache.delta(40)
+    assert delta["full"]
+    assert sorted(_ids(delta)) == ["a", "b"]
+    assert delta["removed"] == []
+
+
+def test_full_feed_revalidates_with_etag():
+    cache = FeedCache()
+    cache.update([_product("a")])
+    request = make_mocked_request(
+        "GET", "/feed", headers={"Accept-Encoding": "gzip"}
+    )
+    response = _feed_response(
+        request, cache.bodies, cache.etag, cache.last_modified, cache.version
+    )
+    assert response.status == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+
+    revalidate = make_mocked_request(
+        "GET", "/feed", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    response = _feed_response(
+        revalidate, cache.bodies, cache.etag, cache.last_modified, cache.version
+    )
+    assert response.status == 304
+
+
+def test_delta_etag_follows_content_and_does_not_match_full_feed():
+    first = FeedCache()
+    first.update([_product("a")])
+    delta = _delta_response(make_mocked_request("GET", "/feed?since=0"), first, 0)
+    delta_etag = delta.headers["ETag"]
+    assert first.etag[:-1] in delta_etag
+
+    # A restarted server at the same version but with other content.
+    restarted = FeedCache()
+    restarted.update([_product("b")])
+    assert restarted.version == first.version
+    request = make_mocked_request(
+        "GET", "/feed?since=0", headers={"If-None-Match": delta_etag}
+    )
+    assert _delta_response(request, restarted, 0).status == 200
+
+    # A delta ETag never revalidates the full feed.
+    request = make_mocked_request(
+        "GET", "/feed", headers={"If-None-Match": delta_etag}
+    )
+    response = _feed_response(
+        request, first.bodies, first.etag, first.last_modified, first.version
+    )
+    assert response.status == 200
+
+
+def _shopify_product(index: int, updated_at: str = "2026-10-01") -> Dict[str, Any]:
+    return {
+        "id": index,
+        "title": f"Booster Box {index}",
+        "handle": f"box-{index}",
+        # Every tenth product is not Magic and gets skipped.
+        "product_type": "Board Game" if index % 10 == 9 else "Magic Sealed",
+        "tags": "Preorder",
+        "updated_at": updated_at,
+        "variants": [{"price": "99.99", "available": True}],
+    }
+
+
+async def _fetch(
+    catalog: List[Dict[str, Any]],
+    *,
+    fail_page: Optional[int] = None,
+    normalized: Optional[NormalizedCache] = None,
+    concurrency: int = 3,
+) -> List[Product]:
+    async def handle(request: web.Request) -> web.Response:
+        page = int(request.query["page"])
+        limit = int(request.query["limit"])
+        if page == fail_page:
+            return web.Response(status=500)
+        chunk = catalog[(page - 1) * limit : page * limit]
+        return web.Response(
+            body=codec.dumps({"products": chunk}), content_type="application/json"
+        )
+
+    app = web.Application()
+    app.router.add_get(COLLECTION_PATH, handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            return await fetch_products(
+                session,
+                concurrency=concurrency,
+                normalized=normalized,
+                base_url=f"http://127.0.0.1:{port}",
+            )
+    finally:
+        await runner.cleanup()
+
+
+def test_fetch_products_reads_every_page_in_order():
+    catalog = [_shopify_product(index) for index in range(PAGE_LIMIT * 2 + 10)]
+    products = asyncio.run(_fetch(catalog))
+    expected = [str(raw["id"]) for raw in catalog if raw["id"] % 10 != 9]
+    assert [product.product_id for product in products] == expected
+
+
+def test_fetch_products_stops_at_a_failed_page():
+    catalog = [_shopify_product(index) for index in range(PAGE_LIMIT * 3)]
+    products = asyncio.run(_fetch(catalog, fail_page=2))
+    assert len(products) == PAGE_LIMIT - PAGE_LIMIT // 10
+
+
+def test_fetch_products_reuses_unchanged_products():
+    catalog = [_shopify_product(index) for index in range(20)]
+    normalized: NormalizedCache = {}
+    first = asyncio.run(_fetch(catalog, normalized=normalized))
+
+    catalog[0] = _shopify_product(0, updated_at="2026-10-02")
+    catalog[0]["title"] = "Renamed"
+    del catalog[1]
+    second = asyncio.run(_fetch(catalog, normalized=normalized))
+
+    assert second[0].name == "Renamed"
+    assert second[1] is first[2]
+    assert "1" not in normalized
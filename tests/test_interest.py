@@ -0,0 +1,33 @@
+from mtgbot.watchers.local_store import PhoenixLocalStoreWatcher
+
+FEED_URL = "https://store.example/feed.json"
+
+
+def _payload(available: bool) -> dict:
+    return {
+        "store": "Test Store",
+        "products": [
+            {"id": product_id, "price": 99.0, "available": available}
+            for product_id in ("watched", "other")
+        ],
+    }
+
+
+def test_unwatched_cards_are_diffed_but_not_emitted():
+    watcher = PhoenixLocalStoreWatcher(None, [FEED_URL])
+    watcher.set_interest(lambda oracle_id: oracle_id == "test-store-watched")
+
+    events = watcher._diff_feed(FEED_URL, _payload(available=False))
+    assert [event.snapshot.sku.oracle_id for event in events] == [
+        "test-store-watched"
+    ]
+    assert watcher.filtered_events == 1
+
+    # The unwatched card was still cached, so once it is watched its
+    # restock is reported as a restock rather than a new listing.
+    watcher.set_interest(None)
+    events = watcher._diff_feed(FEED_URL, _payload(available=True))
+    assert sorted(event.event_type for event in events) == [
+        "store_restock",
+        "store_restock",
+    ]
@@ -0,0 +1,41 @@
+import asyncio
+
+from mtgbot.watchers.limits import FetchLimiter
+
+
+def test_gather_keeps_other_results_when_one_fetch_fails():
+    limiter = FetchLimiter(4)
+
+    async def fetch(item: str) -> str:
+        if item == "bad":
+            raise RuntimeError("boom")
+        await asyncio.sleep(0)
+        return item.upper()
+
+    urls = ["https://a.example/1", "bad", "https://b.example/2"]
+    results = asyncio.run(limiter.gather(urls, fetch, url=lambda item: item))
+
+    assert results == ["HTTPS://A.EXAMPLE/1", None, "HTTPS://B.EXAMPLE/2"]
+    assert limiter.failures == 1
+
+
+def test_gather_respects_per_host_limit():
+    limiter = FetchLimiter(10, per_host=2)
+    active = 0
+    peak = 0
+
+    async def fetch(item: int) -> int:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return item
+
+    items = list(range(8))
+    results = asyncio.run(
+        limiter.gather(items, fetch, url=lambda item: "https://same.example/x")
+    )
+
+    assert results == items
+    assert peak == 2
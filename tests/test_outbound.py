@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from mtgbot.notifications.discord_bot import _OutboundMessage, MtgDiscordBot
+from mtgbot.notifications.outbound import OutboundScheduler, Priority
+
+
+def _recorder(log: List[Any], value: Any):
+    async def send() -> Any:
+        log.append(value)
+        return value
+
+    return send
+
+
+def test_sends_in_priority_order():
+    async def scenario() -> List[str]:
+        scheduler = OutboundScheduler(rate=10, per=1.0)
+        sent: List[str] = []
+        futures = [
+            await scheduler.submit(
+                "r", _recorder(sent, name), priority=getattr(Priority, name.upper())
+            )
+            for name in ("digest", "alert", "cart")
+        ]
+        runner = asyncio.create_task(scheduler.run())
+        await asyncio.gather(*futures)
+        runner.cancel()
+        return sent
+
+    assert asyncio.run(scenario()) == ["cart", "alert", "digest"]
+
+
+def test_empty_bucket_does_not_block_other_routes():
+    async def scenario() -> List[str]:
+        scheduler = OutboundScheduler(rate=1, per=60.0)
+        sent: List[str] = []
+        await scheduler.submit("a", _recorder(sent, "a1"), priority=Priority.CART)
+        await scheduler.submit("a", _recorder(sent, "a2"), priority=Priority.CART)
+        other = await scheduler.submit(
+            "b", _recorder(sent, "b1"), priority=Priority.DIGEST
+        )
+        runner = asyncio.create_task(scheduler.run())
+        await asyncio.wait_for(other, 1.0)
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        return sent
+
+    assert asyncio.run(scenario()) == ["a1", "b1"]
+
+
+def test_one_send_in_flight_per_route():
+    async def scenario():
+        scheduler = OutboundScheduler(rate=10, per=1.0)
+        order: List[str] = []
+        active: Dict[str, int] = {}
+        peak: Dict[str, int] = {}
+        overlapped = False
+
+        def slow(route: str, name: str):
+            async def send() -> None:
+                nonlocal overlapped
+                active[route] = active.get(route, 0) + 1
+                peak[route] = max(peak.get(route, 0), active[route])
+                overlapped = overlapped or sum(active.values()) > 1
+                order.append(name)
+                await asyncio.sleep(0.02)
+                active[route] -= 1
+
+            return send
+
+        futures = [
+            await scheduler.submit("a", slow("a", name), priority=priority)
+            for name, priority in (
+                ("a-alert-1", Priority.ALERT),
+                ("a-digest", Priority.DIGEST),
+                ("a-alert-2", Priority.ALERT),
+                ("a-cart", Priority.CART),
+            )
+        ]
+        futures += [
+            await scheduler.submit("b", slow("b", name)) for name in ("b1", "b2")
+        ]
+        runner = asyncio.create_task(scheduler.run())
+        await asyncio.gather(*futures)
+        runner.cancel()
+        return order, peak, overlapped
+
+    order, peak, overlapped = asyncio.run(scenario())
+    assert [name for name in order if name.startswith("a")] == [
+        "a-cart",
+        "a-alert-1",
+        "a-alert-2",
+        "a-digest",
+    ]
+    assert [name for name in order if name.startswith("b")] == ["b1", "b2"]
+    assert peak == {"a": 1, "b": 1}
+    assert overlapped
+
+
+def test_merge_key_replaces_pending_message():
+    async def scenario():
+        scheduler = OutboundScheduler()
+        sent: List[str] = []
+        old = await scheduler.submit("r", _recorder(sent, "old"), merge_key="k")
+        new = await scheduler.submit("r", _recorder(sent, "new"), merge_key="k")
+        runner = asyncio.create_task(scheduler.run())
+        results = await asyncio.gather(old, new)
+        runner.cancel()
+        return results, sent, scheduler.merged
+
+    results, sent, merged = asyncio.run(scenario())
+    assert results == [None, "new"]
+    assert sent == ["new"]
+    assert merged == 1
+
+
+def test_full_buffer_evicts_lower_priority():
+    async def scenario():
+        scheduler = OutboundScheduler(capacity=1)
+        sent: List[str] = []
+        digest = await scheduler.submit(
+            "r", _recorder(sent, "digest"), priority=Priority.DIGEST
+        )
+        cart = await scheduler.submit(
+            "r", _recorder(sent, "cart"), priority=Priority.CART
+        )
+        runner = asyncio.create_task(scheduler.run())
+        results = await asyncio.gather(digest, cart)
+        runner.cancel()
+        return results, scheduler.dropped
+
+    results, dropped = asyncio.run(scenario())
+    assert results == [None, "cart"]
+    assert dropped == 1
+
+
+def test_stale_messages_are_dropped():
+    async def scenario():
+        scheduler = OutboundScheduler(stale_after=0.0)
+        sent: List[str] = []
+        future = await scheduler.submit("r", _recorder(sent, "late"), stale=True)
+        await asyncio.sleep(0.01)
+        runner = asyncio.create_task(scheduler.run())
+        result = await future
+        runner.cancel()
+        return result, sent
+
+    assert asyncio.run(scenario()) == (None, [])
+
+
+class FailingChannel:
+    id = 42
+
+    async def send(self, **kwargs: Any) -> Any:
+        raise RuntimeError("discord down")
+
+
+def test_send_messages_returns_before_delivery_and_logs_errors(
+    caplog, settings, wishlists
+):
+    async def scenario() -> None:
+        scheduler = OutboundScheduler()
+        bot = MtgDiscordBot(settings, wishlists, outbound=scheduler)
+        request = _OutboundMessage(kwargs={"content": "hi"}, priority=Priority.ALERT)
+        (future,) = await bot._send_messages(FailingChannel(), [request])
+        assert not future.done()
+        runner = asyncio.create_task(scheduler.run())
+        await asyncio.gather(future, return_exceptions=True)
+        await asyncio.sleep(0)
+        runner.cancel()
+        await bot.close()
+
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(scenario())
+    assert "Discord delivery failed: discord down" in caplog.text
@@ -0,0 +1,201 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+from mtgbot.models import CardSku, InventoryEvent, ListingSnapshot, Vendor
+from mtgbot.queues import ShardedEventQueue
+
+
+def _snapshot(
+    oracle_id: str, price: float, available: bool = True
+) -> ListingSnapshot:
+    return ListingSnapshot(
+        vendor=Vendor.CARD_KINGDOM,
+        sku=CardSku(oracle_id=oracle_id, product_code=oracle_id, finish="nonfoil"),
+        title=oracle_id,
+        url=f"https://example.com/{oracle_id}",
+        price=price,
+        currency="USD",
+        available=available,
+        observed_at=datetime.now(timezone.utc),
+    )
+
+
+def _event(
+    oracle_id: str,
+    price: float,
+    event_type: str,
+    previous: Optional[float] = None,
+    *,
+    available: bool = True,
+    was_available: bool = True,
+) -> InventoryEvent:
+    return InventoryEvent(
+        snapshot=_snapshot(oracle_id, price, available),
+        previous_snapshot=(
+            _snapshot(oracle_id, previous, was_available)
+            if previous is not None
+            else None
+        ),
+        event_type=event_type,
+    )
+
+
+def test_same_card_always_lands_on_one_shard_in_order():
+    queue = ShardedEventQueue(4, capacity=40)
+    assert len(queue.shards) == 4
+
+    async def scenario() -> None:
+        for price in (3.0, 2.0, 1.0):
+            await queue.put(_event("card-a", price, "restock"))
+        for index in range(20):
+            await queue.put(_event(f"card-{index}", 1.0, "restock"))
+
+    asyncio.run(scenario())
+    assert queue.qsize() == 23
+    assert sum(1 for shard in queue.shards if shard.qsize()) > 1
+    shard = queue.shard_for("card-a")
+    prices = [
+        event.snapshot.price
+        for event in (shard.get_nowait() for _ in range(shard.qsize()))
+        if event.snapshot.sku.oracle_id == "card-a"
+    ]
+    assert prices == [3.0, 2.0, 1.0]
+
+
+def test_drop_oldest_discards_the_oldest_event():
+    queue = ShardedEventQueue(1, capacity=2, policy="drop_oldest")
+
+    async def scenario():
+        for name in ("a", "b", "c"):
+            await queue.put(_event(name, 1.0, "restock"))
+        (shard,) = queue.shards
+        return [shard.get_nowait().snapshot.sku.oracle_id for _ in range(2)]
+
+    assert asyncio.run(scenario()) == ["b", "c"]
+    assert queue.dropped == 1
+
+
+def test_coalesce_keeps_latest_price_change_with_combined_delta():
+    queue = ShardedEventQueue(1, policy="coalesce")
+
+    async def scenario() -> InventoryEvent:
+        await queue.put(_event("a", 9.0, "price_change", previous=10.0))
+        await queue.put(_event("a", 7.0, "price_change", previous=9.0))
+        (shard,) = queue.shards
+        assert shard.qsize() == 1
+        return shard.get_nowait()
+
+    event = asyncio.run(scenario())
+    assert event.event_type == "price_change"
+    assert event.snapshot.price == 7.0
+    assert event.previous_snapshot.price == 10.0
+    assert event.delta_price == -3.0
+    assert queue.coalesced == 1
+
+
+def test_coalesce_keeps_restock_headline_without_delta():
+    queue = ShardedEventQueue(1, policy="coalesce")
+
+    async def scenario() -> InventoryEvent:
+        await queue.put(_event("a", 9.0, "restock", previous=10.0))
+        await queue.put(_event("a", 8.0, "price_change", previous=9.0))
+        (shard,) = queue.shards
+        return shard.get_nowait()
+
+    event = asyncio.run(scenario())
+    assert event.event_type == "restock"
+    assert event.snapshot.price == 8.0
+    assert event.delta_price is None
+
+
+def test_blocked_put_merges_later_events_for_its_listing():
+    queue = ShardedEventQueue(1, capacity=1, policy="coalesce")
+
+    async def scenario():
+        (shard,) = queue.shards
+        await queue.put(_event("a", 1.0, "restock"))
+        blocked = asyncio.create_task(
+            queue.put(_event("b", 9.0, "price_change", previous=10.0))
+        )
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        # Another update for "b" arrives while the first is still waiting.
+        await queue.put(_event("b", 8.0, "price_change", previous=9.0))
+        first = shard.get_nowait()
+        await blocked
+        second = shard.get_nowait()
+        return first, second, shard.qsize()
+
+    first, second, remaining = asyncio.run(scenario())
+    assert first.snapshot.sku.oracle_id == "a"
+    assert second.snapshot.price == 8.0
+    assert second.delta_price == -2.0
+    assert remaining == 0
+    assert queue.coalesced == 1
+
+
+def _restock(oracle_id: str) -> InventoryEvent:
+    return _event(oracle_id, 5.0, "restock", previous=5.0, was_available=False)
+
+
+def _sold_out(oracle_id: str) -> InventoryEvent:
+    return _event(
+        oracle_id, 5.0, "availability_change", previous=5.0, available=False
+    )
+
+
+def test_coalesce_drops_availability_flips_that_cancel_out():
+    queue = ShardedEventQueue(1, policy="coalesce")
+
+    async def scenario():
+        await queue.put(_restock("a"))
+        await queue.put(_sold_out("a"))
+        await queue.put(_sold_out("b"))
+        await queue.put(_restock("b"))
+        (shard,) = queue.shards
+        assert shard.qsize() == 0
+        await asyncio.wait_for(shard.join(), 1.0)
+
+    asyncio.run(scenario())
+    assert queue.coalesced == 2
+
+
+def test_coalesce_keeps_restock_when_availability_nets_out_changed():
+    queue = ShardedEventQueue(1, policy="coalesce")
+
+    async def scenario():
+        await queue.put(_restock("a"))
+        # An out-of-order availability change that still ends available.
+        await queue.put(_event("a", 6.0, "availability_change", previous=5.0))
+        await queue.put(_event("n", 5.0, "new_listing"))
+        await queue.put(_sold_out("n"))
+        (shard,) = queue.shards
+        return [shard.get_nowait() for _ in range(shard.qsize())]
+
+    restock, new = asyncio.run(scenario())
+    assert (restock.event_type, restock.snapshot.price) == ("restock", 6.0)
+    assert new.event_type == "new_listing"
+    assert new.snapshot.available is False
+
+
+def test_cancelled_blocked_put_frees_its_slot():
+    queue = ShardedEventQueue(1, capacity=1, policy="coalesce")
+
+    async def scenario():
+        (shard,) = queue.shards
+        await queue.put(_event("a", 1.0, "restock"))
+        blocked = asyncio.create_task(queue.put(_restock("b")))
+        await asyncio.sleep(0)
+        await queue.put(_sold_out("b"))
+        shard.get_nowait()
+        shard.task_done()
+        await asyncio.wait_for(blocked, 1.0)
+        assert shard.qsize() == 0
+        await asyncio.wait_for(shard.join(), 1.0)
+        # The listing starts fresh once its parked event was cancelled.
+        await queue.put(_restock("b"))
+        return shard.get_nowait()
+
+    event = asyncio.run(scenario())
+    assert event.event_type == "restock"
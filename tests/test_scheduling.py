@@ -0,0 +1,112 @@
+import math
+from datetime import date
+
+from mtgbot.bot import CART_DEMAND_WEIGHT, DecisionEngine
+from mtgbot.models import ActionType, CardSku, Vendor, WishlistEntry
+from mtgbot.watchers.scheduling import (
+    AdaptivePollScheduler,
+    ItemScheduler,
+    ReleaseCalendar,
+)
+
+
+def _entry(user_id: int, oracle_id: str, action: ActionType) -> WishlistEntry:
+    return WishlistEntry(
+        discord_user_id=user_id,
+        sku=CardSku(oracle_id=oracle_id, product_code="", finish="any"),
+        max_price=None,
+        action_preference=action,
+    )
+
+
+def test_demand_shortens_and_idle_lengthens_intervals():
+    demand = {"hot": 3.0, "cold": 0.0}
+    scheduler = ItemScheduler(["hot", "cold"], 300.0, min_interval=1.0)
+    scheduler.demand = demand.get
+
+    assert scheduler.interval_for("hot") == 300.0 / (1 + math.log2(4))
+    assert scheduler.interval_for("cold") == 300.0 * scheduler.idle_factor
+
+
+def test_idle_factor_one_exempts_unmatched_items():
+    scheduler = ItemScheduler(["https://shop.example/p"], 420.0, idle_factor=1.0)
+    scheduler.demand = lambda item: 0.0
+    assert scheduler.interval_for("https://shop.example/p") == 420.0
+
+
+def test_take_due_and_record_reschedule_items():
+    scheduler = ItemScheduler(["a", "b", "c"], 100.0, min_interval=1.0)
+    assert scheduler.take_due(now=0.0) == ["a", "b", "c"]
+    assert scheduler.take_due(now=0.0) == []
+    scheduler.record("a", changed=True, now=0.0)
+    scheduler.record("b", changed=False, now=0.0)
+    # A changed item is volatile and comes back sooner.
+    assert scheduler.interval_for("a") < scheduler.interval_for("b")
+    # Without a demand function every item counts as one wishlist: 50s.
+    assert scheduler.interval_for("b") == 50.0
+    assert scheduler.take_due(now=45.0) == ["a"]
+    assert scheduler.next_due_in(now=45.0) == 5.0
+
+
+def test_take_due_fills_partial_batches():
+    scheduler = ItemScheduler(["a", "b", "c"], 100.0)
+    scheduler.take_due(now=0.0)
+    for item, now in (("a", 0.0), ("b", 10.0), ("c", 20.0)):
+        scheduler.record(item, changed=False, now=now)
+    # Only "a" is due; "b" rides along to fill the batch of two.
+    assert scheduler.take_due(now=50.0, fill_to=2) == ["a", "b"]
+
+
+def test_engine_demand_tracks_register_and_unregister():
+    engine = DecisionEngine()
+    engine.register(_entry(1, "card", ActionType.NOTIFY))
+    engine.register(_entry(2, "card", ActionType.CART))
+    assert engine.demand("card") == 1.0 + CART_DEMAND_WEIGHT
+
+    # Re-registering a user replaces their entry instead of adding to it.
+    engine.register(_entry(2, "card", ActionType.NOTIFY))
+    assert engine.demand("card") == 2.0
+
+    engine.unregister(1, "card")
+    assert engine.demand("card") == 1.0
+    engine.unregister(2, "card")
+    assert engine.demand("card") == 0.0
+    assert not engine.watches("card")
+
+    engine.reset([_entry(3, "other", ActionType.CART)])
+    assert engine.demand("other") == CART_DEMAND_WEIGHT
+    assert engine.demand("card") == 0.0
+
+
+class _Watcher:
+    poll_interval = 100.0
+    vendor = Vendor.CARD_KINGDOM
+
+
+def test_release_calendar_window():
+    calendar = ReleaseCalendar(window_days=1)
+    calendar.update([date(2026, 11, 14)])
+    assert calendar.is_hot(date(2026, 11, 13))
+    assert calendar.is_hot(date(2026, 11, 15))
+    assert not calendar.is_hot(date(2026, 11, 16))
+
+
+def test_quiet_cycles_back_off_and_changes_speed_up():
+    scheduler = AdaptivePollScheduler(min_interval=10.0, max_factor=4.0)
+    watcher = _Watcher()
+    delays = [scheduler.next_delay(watcher, changed=False) for _ in range(4)]
+    assert delays == [200.0, 400.0, 400.0, 400.0]
+    assert scheduler.next_delay(watcher, changed=True) == 50.0
+
+
+def test_release_window_caps_delay():
+    calendar = ReleaseCalendar()
+    calendar.update([date.today()])
+    scheduler = AdaptivePollScheduler(calendar, min_interval=10.0)
+    assert scheduler.pace() == 0.25
+    assert scheduler.next_delay(_Watcher(), changed=False) == 25.0
+
+
+def test_disabled_scheduler_keeps_poll_interval():
+    scheduler = AdaptivePollScheduler(enabled=False)
+    assert scheduler.next_delay(_Watcher(), changed=True) == 100.0
@@ -0,0 +1,52 @@
+import asyncio
+from dataclasses import replace
+from datetime import date
+from typing import List
+
+from mtgbot.models import MagicSet, SetMilestone
+from mtgbot.storage.database import Database
+from mtgbot.storage.sets import SetRepository
+
+
+def _sets(observed_at: date = date(2026, 10, 1)) -> List[MagicSet]:
+    return [
+        MagicSet(
+            set_id=f"set-{index}",
+            code=f"s{index}",
+            name=f"Set {index}",
+            set_type="expansion",
+            released_at=date(2026, 11, index + 1),
+            scryfall_uri=f"https://scryfall.com/sets/s{index}",
+            icon_svg_uri=None,
+            observed_at=observed_at,
+        )
+        for index in range(5)
+    ]
+
+
+def test_upsert_sets_counts_only_changed_rows(tmp_path):
+    async def scenario():
+        database = Database(str(tmp_path / "bot.db"), reader_pool_size=1)
+        repository = SetRepository(database)
+        await repository.init()
+        try:
+            sets = _sets()
+            written = [await repository.upsert_sets(sets)]
+            await repository.mark_notified("set-0", SetMilestone.ANNOUNCEMENT)
+            # A later sighting alone is not a change.
+            written.append(await repository.upsert_sets(_sets(date(2026, 10, 2))))
+            sets[3] = replace(sets[3], released_at=date(2026, 12, 1))
+            written.append(await repository.upsert_sets(sets))
+            written.append(await repository.upsert_sets([]))
+            states = {
+                state.magic_set.set_id: state for state in await repository.list_sets()
+            }
+        finally:
+            await database.close()
+        return written, states
+
+    written, states = asyncio.run(scenario())
+    assert written == [5, 0, 1, 0]
+    assert states["set-3"].magic_set.released_at == date(2026, 12, 1)
+    # Upserts never reset notification flags.
+    assert states["set-0"].notified_announcement
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+
+from mtgbot.models import CardSku, ListingSnapshot, Vendor
+from mtgbot.storage.database import Database
+from mtgbot.storage.snapshots import SnapshotRepository
+from mtgbot.watchers.snapshot_cache import DiffState, SnapshotCache
+
+
+def _snapshot(price: Optional[float], available: bool = True) -> ListingSnapshot:
+    return ListingSnapshot(
+        vendor=Vendor.CARD_KINGDOM,
+        sku=CardSku(oracle_id="a", product_code="a", finish="nonfoil"),
+        title="Card A",
+        url="https://example.com/a",
+        price=price,
+        currency="USD",
+        available=available,
+        observed_at=datetime.now(timezone.utc),
+    )
+
+
+def test_cache_keeps_price_and_availability_only():
+    cache = SnapshotCache("card_kingdom")
+    cache["a"] = _snapshot(4.5)
+    cache["b"] = _snapshot(None, available=False)
+
+    assert cache.get("a") == DiffState(4.5, True)
+    assert cache.get("b") == DiffState(None, False)
+    assert cache.get("missing") is None
+    assert len(cache) == 2 and "a" in cache
+
+
+def test_unchanged_set_is_not_counted():
+    cache = SnapshotCache("card_kingdom")
+    assert cache.set("a", None, True)
+    assert not cache.set("a", None, True)
+    assert cache.set("a", 2.0, True)
+    assert cache.changes == 2
+
+
+def test_state_survives_a_restart(tmp_path):
+    path = str(tmp_path / "bot.db")
+
+    async def first_run() -> int:
+        database = Database(path, reader_pool_size=1)
+        repository = SnapshotRepository(database)
+        await repository.init()
+        cache = SnapshotCache("card_kingdom", repository)
+        await cache.load()
+        cache["a"] = _snapshot(4.5)
+        cache["b"] = _snapshot(None, available=False)
+        written = await cache.flush()
+        # Nothing changed since the last flush.
+        assert await cache.flush() == 0
+        await database.close()
+        return written
+
+    async def second_run() -> SnapshotCache:
+        database = Database(path, reader_pool_size=1)
+        repository = SnapshotRepository(database)
+        await repository.init()
+        cache = SnapshotCache("card_kingdom", repository)
+        await cache.load()
+        other = SnapshotCache("tcgplayer", repository)
+        await other.load()
+        assert len(other) == 0
+        await database.close()
+        return cache
+
+    assert asyncio.run(first_run()) == 2
+    cache = asyncio.run(second_run())
+    assert cache.get("a") == DiffState(4.5, True)
+    assert cache.get("b") == DiffState(None, False)
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from mtgbot import codec
+from mtgbot.watchers.scheduling import AdaptivePollScheduler
+from mtgbot.watchers.tcgplayer import TcgplayerWatcher
+
+
+class Api:
+    def __init__(self, *, token_status: int = 200) -> None:
+        self.token_status = token_status
+        self.token_requests = 0
+        self.results: List[Dict[str, Any]] = []
+
+    async def token(self, request: web.Request) -> web.Response:
+        self.token_requests += 1
+        if self.token_status != 200:
+            return web.Response(status=self.token_status)
+        return web.Response(
+            body=codec.dumps({"access_token": "t", "expires_in": 3600}),
+            content_type="application/json",
+        )
+
+    async def pricing(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=codec.dumps({"results": self.results}),
+            content_type="application/json",
+        )
+
+
+async def _run(api: Api, skus: List[str], check) -> None:
+    app = web.Application()
+    app.router.add_post("/token", api.token)
+    app.router.add_get("/pricing/sku/{sku_ids}", api.pricing)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with aiohttp.ClientSession() as session:
+            watcher = TcgplayerWatcher(
+                session, public_key="pub", private_key="priv", sku_whitelist=skus
+            )
+            watcher.AUTH_URL = f"http://127.0.0.1:{port}/token"
+            watcher.SKU_URL = f"http://127.0.0.1:{port}/pricing/sku/{{sku_ids}}"
+            await check(watcher)
+    finally:
+        await runner.cleanup()
+
+
+def _result(sku_id: int, price: float) -> Dict[str, Any]:
+    return {"skuId": sku_id, "productName": f"SKU {sku_id}", "marketPrice": price}
+
+
+def test_failed_auth_falls_back_to_adaptive_delay():
+    api = Api(token_status=401)
+
+    async def check(watcher: TcgplayerWatcher) -> None:
+        scheduler = AdaptivePollScheduler(min_interval=10.0)
+        delays = []
+        for _ in range(3):
+            assert await watcher.poll_batch() == []
+            # Every SKU is still due, but the worker must not spin on /token.
+            assert watcher.next_poll_hint() is None
+            delays.append(scheduler.next_delay(watcher, changed=False))
+        assert api.token_requests == 3
+        assert delays[0] >= watcher.poll_interval
+        assert delays == sorted(delays)
+
+        api.token_status = 200
+        await watcher.poll_batch()
+        assert watcher.next_poll_hint() is not None
+
+    asyncio.run(_run(api, ["1", "2"], check))
+
+
+
+def test_batch_results_map_back_by_sku_id():
+    api = Api()
+    # Out of order, and SKU 2 is missing from the response.
+    api.results = [_result(3, 3.5), _result(1, 1.5)]
+
+    async def check(watcher: TcgplayerWatcher) -> None:
+        events = await watcher.poll_batch()
+        prices = {
+            event.snapshot.sku.oracle_id: event.snapshot.price for event in events
+        }
+        assert prices == {"1": 1.5, "3": 3.5}
+        assert {event.snapshot.title for event in events} == {"SKU 1", "SKU 3"}
+
+    asyncio.run(_run(api, ["1", "2", "3"], check))